@@ -4,14 +4,28 @@ from PyQt5.QtCore import *
 
 import sys
 import os
+import argparse
 from util.paths import *
+from util.lazyImport import LazyImport
+
+parser = argparse.ArgumentParser(description='Health Data')
+parser.add_argument('--import-times', action='store_true',
+                    help='print how long each window and heavy analysis dependency takes to import')
+parser.add_argument('--no-preload', action='store_true',
+                    help="don't read the integrations' data in the background at startup, only when first opened")
+# Anything else is left for Qt
+args, qtArgs = parser.parse_known_args()
+LazyImport.verbose = args.import_times
 
 # To avoid circular dependencies, the app must be initialized before any windows are launched
-app = QApplication(sys.argv)
-from windows.logWindow import LogWindow
-from windows.analyzeWindow import AnalyzeWindow
-from windows.heatmapWindow import HeatmapWindow
-from windows.settingsWindow import SettingsWindow
+app = QApplication(sys.argv[:1] + qtArgs)
+# Import the windows through LazyImport so that their cost shows up in the import report
+# Their analysis dependencies (scipy, matplotlib, seaborn) are only imported when first used
+LogWindow = LazyImport.importModule('windows.logWindow').LogWindow
+AnalyzeWindow = LazyImport.importModule('windows.analyzeWindow').AnalyzeWindow
+HeatmapWindow = LazyImport.importModule('windows.heatmapWindow').HeatmapWindow
+SettingsWindow = LazyImport.importModule('windows.settingsWindow').SettingsWindow
+from trackables.trackableManager import TrackableManager as TM
 
 
 # The driver program for the application
@@ -20,6 +34,9 @@ class UI(QMainWindow):
 
     def __init__(self):
         super().__init__()
+        # Start reading the integrations' data in the background while the windows are built
+        if not args.no_preload:
+            TM.instance().preloadSources()
 
         # Give the app a name and nice icon
         self.setWindowTitle('Health Data')
@@ -92,4 +109,9 @@ class UI(QMainWindow):
 
 if __name__ == '__main__':
     ui = UI()
-    sys.exit(app.exec_())
+    if args.import_times:
+        LazyImport.report()
+    exitCode = app.exec_()
+    if args.import_times:
+        LazyImport.report()
+    sys.exit(exitCode)
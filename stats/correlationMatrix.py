@@ -0,0 +1,86 @@
+from trackables.variableCategories.trackType import TrackType
+
+import numpy as np
+
+
+# Computes the relationship between every pair of trackables at once.
+# All trackables are aligned a single time into a dense days x trackables array (NaN where a trackable has no
+# processed value), and the pairwise sums needed for Pearson's r are then each a single matrix product
+# over the days, leaving out days where either trackable of a pair is missing
+class CorrelationMatrix:
+
+    # @brief aligns the processed daily scores of every trackable on one range of days
+    # Time trackables can't be correlated yet, so their columns are left empty
+    # @return tuple of (first day number of the rows, days x trackables array of scores)
+    @staticmethod
+    def alignTrackables(trackables):
+        columns = []
+        for t in trackables:
+            if t.getTrackType() == TrackType.TIME:
+                columns.append((np.empty(0, dtype=np.int64), np.empty(0)))
+                continue
+            days = np.asarray(t.getProcessedDates(), dtype='datetime64[D]').astype(np.int64)
+            columns.append((days, np.asarray(t.getProcessedScores(), dtype=np.float64)))
+
+        allDays = [days for days, _ in columns if len(days) > 0]
+        if len(allDays) == 0:
+            return 0, np.full((0, len(trackables)), np.nan)
+        firstDay = min(days.min() for days in allDays)
+        lastDay = max(days.max() for days in allDays)
+
+        data = np.full((lastDay - firstDay + 1, len(trackables)), np.nan)
+        for j, (days, scores) in enumerate(columns):
+            data[days - firstDay, j] = scores
+        return firstDay, data
+
+    # @brief Pearson's r between column i of data on each day and column j of data lagDays later
+    # Only days where both values are present contribute to each pair
+    # @param minCount pairs with fewer shared days than this are set to 0, as are pairs with a constant column
+    # @return square matrix of correlations between -1 and 1
+    @staticmethod
+    def pearson(data, lagDays=0, minCount=3):
+        numDays = data.shape[0]
+        lagDays = min(lagDays, numDays)
+        # Rows of the dependent (earlier) and independent (later) trackables
+        dep = data[:numDays - lagDays]
+        indep = data[lagDays:]
+
+        # Center each column so that the sums of squares don't lose precision
+        with np.errstate(invalid='ignore'):
+            means = np.nanmean(data, axis=0) if numDays > 0 else np.zeros(data.shape[1])
+        means = np.where(np.isnan(means), 0, means)
+        depValid, indepValid = ~np.isnan(dep), ~np.isnan(indep)
+        depMask, indepMask = depValid.astype(np.float64), indepValid.astype(np.float64)
+        dep0 = np.where(depValid, dep - means, 0)
+        indep0 = np.where(indepValid, indep - means, 0)
+
+        symmetric = lagDays == 0
+        counts = depMask.T @ indepMask
+        sumDep = dep0.T @ indepMask
+        sumIndep = depMask.T @ indep0
+        sumDepSq = (dep0 ** 2).T @ indepMask
+        sumIndepSq = depMask.T @ (indep0 ** 2)
+        sumProducts = dep0.T @ indep0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = sumProducts - sumDep * sumIndep / counts
+            varDep = sumDepSq - sumDep ** 2 / counts
+            varIndep = sumIndepSq - sumIndep ** 2 / counts
+            corrs = np.clip(cov / np.sqrt(varDep * varIndep), -1, 1)
+
+        tolerance = np.finfo(np.float64).eps * np.maximum(counts, 1)
+        invalid = (counts < minCount) | (varDep <= tolerance * np.maximum(sumDepSq, 1)) | \
+            (varIndep <= tolerance * np.maximum(sumIndepSq, 1)) | ~np.isfinite(corrs)
+        corrs[invalid] = 0
+
+        if symmetric:
+            # Without a lag the matrix is symmetric, so mirror the upper triangle to remove any rounding differences
+            upper = np.triu(corrs)
+            corrs = upper + np.triu(corrs, 1).T
+        return corrs
+
+    # @brief correlation matrix over the processed data of the given trackables
+    @staticmethod
+    def pearsonForTrackables(trackables, lagDays=0):
+        _, data = CorrelationMatrix.alignTrackables(trackables)
+        return CorrelationMatrix.pearson(data, lagDays)
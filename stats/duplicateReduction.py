@@ -0,0 +1,40 @@
+from enum import Enum
+
+from trackables.variableCategories.trackType import TrackType
+
+
+# Enum describing how multiple measurements recorded on the same date are combined into one
+class DuplicateReduction(Enum):
+    SUM = 1
+    MEAN = 2
+    MAX = 3
+    FIRST = 4
+    LAST = 5
+
+    # @brief counts are summed, while times can only be averaged
+    @staticmethod
+    def getDefault(trackType):
+        if trackType == TrackType.TIME:
+            return DuplicateReduction.MEAN
+        return DuplicateReduction.SUM
+
+    @staticmethod
+    def mapStringToEnum(reductionStr):
+        reductionMap = {'Sum': DuplicateReduction.SUM,
+                        'Mean': DuplicateReduction.MEAN,
+                        'Max': DuplicateReduction.MAX,
+                        'First': DuplicateReduction.FIRST,
+                        'Last': DuplicateReduction.LAST}
+        return reductionMap[reductionStr]
+
+    def toString(self):
+        if self == DuplicateReduction.SUM:
+            return 'Sum'
+        if self == DuplicateReduction.MEAN:
+            return 'Mean'
+        if self == DuplicateReduction.MAX:
+            return 'Max'
+        if self == DuplicateReduction.FIRST:
+            return 'First'
+        if self == DuplicateReduction.LAST:
+            return 'Last'
@@ -12,18 +12,21 @@ class Frequency(Enum):
     def mapFreqStringToEnum(freqStr):
         freqMap = {'Daily': Frequency.DAILY,
                    'Weekly': Frequency.WEEKLY,
-                   'Monthly': Frequency.MONTHLY}
+                   'Monthly': Frequency.MONTHLY,
+                   'Yearly': Frequency.YEARLY}
         return freqMap[freqStr]
 
     @staticmethod
     def list():
-        return [Frequency.DAILY, Frequency.WEEKLY, Frequency.MONTHLY]
+        return [Frequency.DAILY, Frequency.WEEKLY, Frequency.MONTHLY, Frequency.YEARLY]
 
     def toString(self):
         if self == Frequency.DAILY:
             return 'Daily'
         if self == Frequency.WEEKLY:
             return 'Weekly'
+        if self == Frequency.YEARLY:
+            return 'Yearly'
         else:
             return 'Monthly'
 
@@ -32,12 +35,14 @@ class Frequency(Enum):
             return 'Days'
         if self == Frequency.WEEKLY:
             return 'Weeks'
+        if self == Frequency.YEARLY:
+            return 'Years'
         else:
             return 'Months'
 
 
 # Enum describing what method to use when grouping multiple data points together
-# for trackables with WEEKLY or MONTHLY frequency
+# for trackables with WEEKLY, MONTHLY, or YEARLY frequency
 class GroupingMethod(Enum):
     AVERAGE = 1
     SUM = 2
@@ -1,55 +1,99 @@
-from statsmodels.tsa.stattools import grangercausalitytests
-import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 from stats.test import Test
+from util.lazyImport import LazyImport
 
+scipyStats = LazyImport.module('scipy.stats')
 
+
+# Granger causality F-test, matching the 'params_ftest' results of statsmodels' grangercausalitytests
 # https://www.statsmodels.org/stable/generated/statsmodels.tsa.stattools.grangercausalitytests.html#statsmodels.tsa.stattools.grangercausalitytests
-# Tests results are stored in a dictionary whose keys are the number of lags. For each lag the values are a tuple, with the first element a dictionary with
-# test statistic, pvalues, degrees of freedom, the second element are the OLS estimation results for the restricted model,
-# the unrestricted model and the restriction (contrast) matrix for the parameter f_test.
+# For each lag p the result is regressed on a constant and its own previous p values (restricted model), and also on
+# the cause's previous p values (unrestricted model).  F compares the sum of squared residuals of the two models.
+# Ordering the unrestricted design's columns as [constant, own lags, cause lags] means the first p + 1 columns of its
+# QR factorization are the factorization of the restricted design, so one QR per lag solves both models
 class GrangerTest(Test):
 
     def __init__(self):
         super().__init__('Granger', 'Granger Causality', False)
 
+    # @brief the largest lag that can be tested with the given number of measurements
+    # Each lag needs more than 3 * lag + 1 observations, like statsmodels requires
+    @staticmethod
+    def getMaxFeasibleLag(numObservations):
+        return max(0, (numObservations - 2) // 3)
+
+    # @brief builds the lagged design for a single lag using strided views over the series
+    # @return tuple of (result values being predicted, design matrix with columns [constant, own lags, cause lags])
+    @staticmethod
+    def makeDesign(result, cause, lag):
+        # Row t of each window view holds the values from t - lag to t, so reverse to put the most recent lag first
+        resultWindows = sliding_window_view(result, lag + 1)
+        causeWindows = sliding_window_view(cause, lag + 1)
+        target = resultWindows[:, -1]
+        ownLags = resultWindows[:, -2::-1]
+        causeLags = causeWindows[:, -2::-1]
+        design = np.column_stack([np.ones(len(target)), ownLags, causeLags])
+        return target, design
+
+    # @brief sums of squared residuals of the restricted and unrestricted models for one lag
+    @staticmethod
+    def getResidualSums(target, design, lag):
+        q, r = np.linalg.qr(design)
+        diag = np.abs(np.diag(r))
+        if diag.min(initial=np.inf) <= diag.max(initial=0) * len(target) * np.finfo(np.float64).eps:
+            # Rank deficient designs (e.g. constant data) use the least squares pseudo-inverse solution instead
+            def ssr(x):
+                coeffs = np.linalg.lstsq(x, target, rcond=None)[0]
+                return np.sum((target - x @ coeffs) ** 2)
+            return ssr(design[:, :lag + 1]), ssr(design)
+
+        projections = q.T @ target
+        total = target @ target
+        restrictedSSR = total - projections[:lag + 1] @ projections[:lag + 1]
+        unrestrictedSSR = total - projections @ projections
+        return max(restrictedSSR, 0.0), max(unrestrictedSSR, 0.0)
+
+    # @brief runs the F-test for every lag from minLag to maxLag
+    # @return list of (F, p, denominator degrees of freedom, numerator degrees of freedom) for each lag
+    @staticmethod
+    def runFTests(result, cause, minLag, maxLag):
+        result = np.asarray(result, dtype=np.float64)
+        cause = np.asarray(cause, dtype=np.float64)
+        tests = []
+        for lag in range(minLag, maxLag + 1):
+            target, design = GrangerTest.makeDesign(result, cause, lag)
+            restrictedSSR, unrestrictedSSR = GrangerTest.getResidualSums(target, design, lag)
+            dofDenom = len(target) - design.shape[1]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                fValue = ((restrictedSSR - unrestrictedSSR) / lag) / (unrestrictedSSR / dofDenom)
+            pValue = scipyStats.f.sf(fValue, lag, dofDenom)
+            tests.append((fValue, pValue, dofDenom, lag))
+        return tests
+
     # First attempt at running a statistical test to check for causation
     # alpha (probability of type I error that I choose)
     def runTestOverRange(self, dependentT, independentT, minLag=0, maxLag=3):
+        return GrangerTest.getEffectSizes(dependentT.getProcessedScores(), independentT.getProcessedScores(), minLag, maxLag)
 
-        # Need more than a handful of measurements to even attempt
-        # if (len(dependentT.getProcessedScores()) < 5):
-        #     return False, 'Not Enough Data To Run Test'
-
-        # Need to convert data into a single dataframe to run test
-        data = pd.DataFrame(
-            data={'Result': dependentT.getProcessedScores(),
-                  'Cause': independentT.getProcessedScores()},
-            index=dependentT.getProcessedDates())
+    # @brief eta^2 effect sizes and p-values for each lag from minLag to maxLag of the cause on the result
+    # @return a tuple containing a list of eta^2 and a list of p-values, or (False, message) if no lag can be tested
+    @staticmethod
+    def getEffectSizes(resultScores, causeScores, minLag, maxLag):
+        N = min(len(resultScores), len(causeScores))
 
-        gc_result = None
-        while True:
-            try:
-                # Can throw a ValueError if insufficient measurements
-                gc_result = grangercausalitytests(
-                    data, maxLag, addconst=True, verbose=False)
-                break
-            except ValueError:
-                # In that case don't try to look so far ahead -- requires fewer measurements to succeed
-                maxLag -= 1
-                if maxLag == 0:
-                    return False, 'Error Running Granger Causality Test'
+        # Don't try to look further ahead than the number of measurements allows
+        maxLag = min(maxLag, GrangerTest.getMaxFeasibleLag(N))
+        if maxLag == 0:
+            return False, 'Error Running Granger Causality Test'
 
         # Granger test can't be run for causation with 0 day lag
         # TODO: See if I can mimic this by shifting the data
+        minLag = max(1, minLag)
         eta2s = []
         p_values = []
-        minLag = max(1, minLag)
-        for lag in range(minLag, maxLag + 1):
-            # This will return a dictionary of maxLag entries containing the results for each lag time
-            # Tests give similar results, so blindly choose the 'params_ftest'
-            f_value, p_value, DOF_denom, DOF_num = gc_result[lag][0]['params_ftest']
-            N = len(data)
+        for f_value, p_value, DOF_denom, DOF_num in GrangerTest.runFTests(resultScores[:N], causeScores[:N], minLag, maxLag):
             # Eta-Squared value to measure effect size
             eta2 = f_value * (DOF_denom - 1) / (f_value *
                                                 (DOF_denom - 1) + (N - DOF_denom))
@@ -59,6 +103,8 @@ class GrangerTest(Test):
 
     # Gets the result from the granger test for a specific lag value
     def runValidTestForLag(self, dependentT, independentT, lag=1):
-        eta2s, p_values = self.runGrangerTestOverRange(
-            dependentT, independentT, maxLag=lag)
+        eta2s, p_values = self.runTestOverRange(
+            dependentT, independentT, minLag=lag, maxLag=lag)
+        if eta2s is False or len(eta2s) == 0:
+            return -1, -1
         return eta2s[-1], p_values[-1]
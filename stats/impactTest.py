@@ -1,80 +1,142 @@
 import numpy as np
+from abc import abstractmethod
 
 from stats.test import Test
 
 
+# Base for the heuristics that look at the direction each day's result changes in.
+# The heuristics are computed over np.diff / np.sign arrays for every lag at once, and p-values come from a
+# permutation null: the cause is shuffled numPermutations times and every shuffle is scored together as a
+# (shuffles x days) @ (days x lags) product for each chunk of shuffles
+class PermutationImpactTest(Test):
+
+    numPermutations = 2000
+    # Shuffles scored together, which bounds the (shuffles x days) arrays built for long histories
+    permutationChunkSize = 200
+
+    # @brief the heuristic for every lag from the cause and result arrays, using the same shuffles for each lag
+    # @param causes array of shape (numShuffles, days) of cause values, each row ordered differently
+    # @return array of shape (numShuffles, numLags)
+    @abstractmethod
+    def getStatistics(self, causes, resultChanges, lags):
+        ...
+
+    # @brief the cause values compared against the result's change on each day
+    @abstractmethod
+    def getCauseValues(self, indData):
+        ...
+
+    # @brief sums over k of causes[:, k] * values[k + lag] for each lag
+    # @return array of shape (numShuffles, numLags)
+    @staticmethod
+    def laggedProducts(causes, values, lags):
+        numDays = len(values)
+        shifted = np.zeros((numDays, len(lags)))
+        for col, lag in enumerate(lags):
+            shifted[:numDays - lag, col] = values[lag:]
+        return causes @ shifted
+
+    # @brief sums over k of causes[:, k] counting only the days that have a result lag days later
+    @staticmethod
+    def laggedCounts(causes, lags):
+        cumulative = np.concatenate([np.zeros((causes.shape[0], 1)), np.cumsum(causes, axis=1)], axis=1)
+        return cumulative[:, causes.shape[1] - np.asarray(lags)]
+
+    # @return a tuple containing a list of heuristics and a list of p-values for each lag from minLag to maxLag
+    def runTestOverRange(self, dependentT, independentT, minLag=0, maxLag=3):
+        self.runChecks(dependentT, independentT)
+        return self.runValidTestOverRange(dependentT, independentT, minLag, maxLag)
+
+    def runValidTestForLag(self, dependentT, independentT, lag=1):
+        correlations, ps = self.runValidTestOverRange(dependentT, independentT, lag, lag)
+        return correlations[0], ps[0]
+
+    def runValidTestOverRange(self, dependentT, independentT, minLag, maxLag):
+        indData = np.asarray(independentT.getSelectedDateScores(), dtype=np.float64)
+        depData = np.asarray(dependentT.getSelectedDateScores(), dtype=np.float64)
+        n = min(len(indData), len(depData))
+        return self.runPermutationTest(indData[:n], depData[:n], minLag, maxLag)
+
+    # @brief scores every lag against numPermutations shuffles of the cause
+    # Lags with fewer than 3 days to compare give a heuristic of 0 and a p-value of -1
+    # @return tuple of lists (heuristic, two-sided permutation p-value) for each lag
+    def runPermutationTest(self, indData, depData, minLag, maxLag, rng=None):
+        lags = np.arange(minLag, maxLag + 1)
+        correlations = np.zeros(len(lags))
+        ps = np.full(len(lags), -1.0)
+        numChanges = len(depData) - 1
+        validLags = numChanges - lags >= 2
+        if not validLags.any():
+            return list(correlations), list(ps)
+
+        rng = np.random.default_rng() if rng is None else rng
+        causeValues = self.getCauseValues(indData)
+        resultChanges = np.sign(np.diff(depData))
+        observed = self.getValidStatistics(causeValues[np.newaxis, :], resultChanges, lags[validLags])[0]
+
+        extremeCounts = np.zeros(len(observed), dtype=np.int64)
+        for start in range(0, self.numPermutations, self.permutationChunkSize):
+            numShuffles = min(self.permutationChunkSize, self.numPermutations - start)
+            shuffles = rng.permuted(np.tile(causeValues, (numShuffles, 1)), axis=1)
+            null = self.getValidStatistics(shuffles, resultChanges, lags[validLags])
+            extremeCounts += np.sum(np.abs(null) >= np.abs(observed) - 1e-12, axis=0)
+
+        correlations[validLags] = observed
+        # Include the observed ordering in the null so the p-value is never 0
+        ps[validLags] = (extremeCounts + 1) / (self.numPermutations + 1)
+        return list(correlations), list(ps)
+
+    # @brief getStatistics with any undefined heuristic (e.g. from dividing by 0) set to 0
+    def getValidStatistics(self, causes, resultChanges, lags):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.nan_to_num(self.getStatistics(causes, resultChanges, lags))
+
+
 # Welltory's heuristic to determine correlation -- counts the number of times that two variables change in the same diretion and looks for extremes
 # May not work for binary causes, since these have many days without a change
-class ContinuousImpactTest(Test):
+class ContinuousImpactTest(PermutationImpactTest):
 
     def __init__(self):
         super().__init__('Impact', 'Binary Impact', False)
 
-    def runValidTestForLag(self, dependentT, independentT, lag=1):
+    # The direction the cause changed in on each day
+    def getCauseValues(self, indData):
+        return np.sign(np.diff(indData))
 
+    def getStatistics(self, causes, resultChanges, lags):
         # Tracks the number of times cause and result change in the same direction
-        sameCounts = 0
-        indData = independentT.getSelectedDateScores()
-        depData = dependentT.getSelectedDateScores()
-
-        numTests = len(depData) - lag
-        if numTests < 3:
-            return (0, 0)
-
-        lastCause = indData[0]
-        lastResult = depData[lag]
-
-        for i in range(1, numTests):
-            thisCause = indData[i]
-            thisResult = depData[i + lag]
-            if np.sign(thisCause - lastCause) == np.sign(thisResult - lastResult):
-                sameCounts += 1
-
+        sameCounts = sum(PermutationImpactTest.laggedProducts((causes == direction).astype(np.float64),
+                                                              (resultChanges == direction).astype(np.float64), lags)
+                         for direction in [-1, 0, 1])
+        numTests = len(resultChanges) - lags
         sameProb = sameCounts / numTests
         # scale this to -1 for sameProb=0 and +1 for sameProb=1
-        correlation = (sameProb - 0.5) * 2
-        return correlation, -1
+        return (sameProb - 0.5) * 2
 
 
 # More useful heuristic for correlation when dealing with causes that have a signification portion of 0's
-class BinaryImpactTest(Test):
+class BinaryImpactTest(PermutationImpactTest):
 
     def __init__(self):
         super().__init__('Impact', 'Binary Impact', False)
 
-    def runValidTestForLag(self, dependentT, independentT, lag=1):
-
-        # Tracks the direction in which self.dependentT changes when self.independent is 1 vs 0
-        zeroCount = 0
-        nonzeroCount = 0
-        zeroChanges = 0
-        nonzeroChanges = 0
-
-        # Select measurements such that the cause happens lagDays days earlier than the result
-        indData = independentT.getSelectedDateScores()
-        depData = dependentT.getSelectedDateScores()
-
-        lastResult = depData[lag]
-
-        for i in range(1, len(depData) - lag):
-            thisCause = indData[i]
-            thisResult = depData[i + lag]
-            changeSign = np.sign(thisResult - lastResult)
+    # Whether the cause happened on each day that the result changed
+    def getCauseValues(self, indData):
+        return (indData[1:] != 0).astype(np.float64)
 
-            if thisCause == 0:
-                zeroCount += 1
-                zeroChanges += changeSign
-            else:
-                nonzeroCount += 1
-                nonzeroChanges += changeSign
+    def getStatistics(self, causes, resultChanges, lags):
+        # Tracks the direction in which the result changes when the cause is 1 vs 0
+        nonzeroChanges = PermutationImpactTest.laggedProducts(causes, resultChanges, lags)
+        zeroChanges = PermutationImpactTest.laggedProducts(1 - causes, resultChanges, lags)
+        nonzeroCount = PermutationImpactTest.laggedCounts(causes, lags)
+        zeroCount = PermutationImpactTest.laggedCounts(1 - causes, lags)
 
         # Probability between -1 and 1 dictating direction of change
-        scaledZeros = zeroChanges / zeroCount
-        scaledNonzeros = nonzeroChanges / nonzeroCount
+        scaledZeros = np.where(zeroCount > 0, zeroChanges / zeroCount, 0)
+        scaledNonzeros = np.where(nonzeroCount > 0, nonzeroChanges / nonzeroCount, 0)
 
         # Size of correlation depends on the relative probabilities
-        correlation = (scaledNonzeros - scaledZeros) / 2
-        return correlation, -1
+        return (scaledNonzeros - scaledZeros) / 2
 
 
 # Wrapper over whichver impact test is needed
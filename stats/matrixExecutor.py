@@ -0,0 +1,100 @@
+from stats.grangerTest import GrangerTest
+from stats.impactTest import BinaryImpactTest, ContinuousImpactTest
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+import multiprocessing
+import numpy as np
+import os
+
+
+# Runs a relationship test between every pair of columns of an aligned days x trackables array in a pool of
+# worker processes.  The array is copied into shared memory once and each worker attaches to it by name, so only
+# the (dependent, independent, lag) work items and the resulting values are sent between processes
+class MatrixExecutor:
+
+    def __init__(self, numWorkers=None):
+        # Leave a core free for the UI by default
+        self.numWorkers = numWorkers if numWorkers else max(1, (os.cpu_count() or 2) - 1)
+
+    # @brief fills the relationship matrix between every pair of columns
+    # @param data days x trackables array aligned by CorrelationMatrix.alignTrackables
+    # @param binaryColumns whether each column is a binary trackable, which decides the impact test used
+    # @param progressCallback called with (completed work items, total work items) as results arrive
+    # @param numPermutations shuffles used by impact tests -- the matrix only shows the heuristic, so none by default
+    # @return square matrix where entry (i, j) is the effect of trackable j on trackable i
+    def computeMatrix(self, data, testName, lagDays, binaryColumns, progressCallback=None, numPermutations=0):
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        numTrackables = data.shape[1]
+        workItems = [(i, j, lagDays) for i in range(numTrackables) for j in range(numTrackables)]
+        matrix = np.zeros((numTrackables, numTrackables))
+        if len(workItems) == 0:
+            return matrix
+
+        # Small jobs aren't worth starting processes for
+        if self.numWorkers <= 1 or len(workItems) <= self.numWorkers:
+            for completed, (i, j, lag) in enumerate(workItems, start=1):
+                matrix[i, j] = MatrixExecutor.runWorkItem(data, testName, i, j, lag, binaryColumns, numPermutations)
+                if progressCallback is not None:
+                    progressCallback(completed, len(workItems))
+            return matrix
+
+        # Several chunks per worker so that progress is reported steadily and uneven items balance out
+        numChunks = min(len(workItems), 4 * self.numWorkers)
+        chunks = [workItems[k::numChunks] for k in range(numChunks)]
+
+        sharedData = SharedMemory(create=True, size=max(data.nbytes, 1))
+        try:
+            np.ndarray(data.shape, dtype=np.float64, buffer=sharedData.buf)[:] = data
+            # Forking the GUI process copies Qt's threads and locks into the workers, so always start fresh interpreters
+            spawnContext = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=self.numWorkers, mp_context=spawnContext) as pool:
+                futures = [pool.submit(runWorkItems, sharedData.name, data.shape, testName, chunk, binaryColumns,
+                                       numPermutations) for chunk in chunks]
+                completed = 0
+                for future in as_completed(futures):
+                    results = future.result()
+                    for i, j, value in results:
+                        matrix[i, j] = value
+                    completed += len(results)
+                    if progressCallback is not None:
+                        progressCallback(completed, len(workItems))
+        finally:
+            sharedData.close()
+            sharedData.unlink()
+        return matrix
+
+    # @brief runs the named test of column j (the cause) on column i (the result) over the days both were measured
+    # Pairs that can't be tested are given 0, like trackables that can't be compared in the heatmap
+    @staticmethod
+    def runWorkItem(data, testName, i, j, lag, binaryColumns, numPermutations=0):
+        result, cause = data[:, i], data[:, j]
+        bothMeasured = np.flatnonzero(~np.isnan(result) & ~np.isnan(cause))
+        if len(bothMeasured) == 0:
+            return 0.0
+        result = result[bothMeasured[0]:bothMeasured[-1] + 1]
+        cause = cause[bothMeasured[0]:bothMeasured[-1] + 1]
+
+        if testName == 'Granger':
+            eta2s, _ = GrangerTest.getEffectSizes(result, cause, lag, lag)
+            value = eta2s[-1] if eta2s is not False and len(eta2s) > 0 else 0.0
+        else:
+            test = BinaryImpactTest() if binaryColumns[j] else ContinuousImpactTest()
+            test.numPermutations = numPermutations
+            value = test.runPermutationTest(cause, result, lag, lag)[0][0]
+        return float(np.nan_to_num(value))
+
+
+# @brief entry point for worker processes, which needs to be a module level function to be sent to the pool
+# Attaches to the shared array by name and runs each work item against it
+def runWorkItems(sharedName, shape, testName, workItems, binaryColumns, numPermutations):
+    sharedData = SharedMemory(name=sharedName)
+    try:
+        data = np.ndarray(shape, dtype=np.float64, buffer=sharedData.buf)
+        results = [(i, j, MatrixExecutor.runWorkItem(data, testName, i, j, lag, binaryColumns, numPermutations))
+                   for i, j, lag in workItems]
+        # The view has to be released before the shared memory can be closed
+        del data
+    finally:
+        sharedData.close()
+    return results
@@ -1,5 +1,11 @@
 from stats.test import Test
-from scipy.stats import linregress
+
+from util.lazyImport import LazyImport
+
+import numpy as np
+
+scipySignal = LazyImport.module('scipy.signal')
+scipyStats = LazyImport.module('scipy.stats')
 
 
 class PearsonTest(Test):
@@ -9,16 +15,81 @@ class PearsonTest(Test):
 
     # For now this is just univariate
     def runValidTestForLag(self, dependentT, independentT, lag=1):
-        backIdx = -lag if lag > 0 else len(
-            dependentT.getSelectedDateScores())
-        x_data = independentT.getSelectedDateScores()[lag:]
-        y_data = dependentT.getSelectedDateScores()[:backIdx]
-
-        try:
-            res = linregress(x_data, y_data)
-            r2, p = res[2] ** 2, res[3]
-            return r2, p
-
-        # This happens sometimes -- I don't really know why
-        except ValueError:
-            return -1, -1
+        r2s, ps = self.runValidTestOverRange(dependentT, independentT, lag, lag)
+        return r2s[0], ps[0]
+
+    # Evaluates every lag from the same pair of arrays instead of running a separate regression for each one
+    def runTestOverRange(self, dependentT, independentT, minLag=0, maxLag=3):
+        # Run the same checks as runTestForLag once for the whole range
+        self.runChecks(dependentT, independentT)
+        return self.runValidTestOverRange(dependentT, independentT, minLag, maxLag)
+
+    def runValidTestOverRange(self, dependentT, independentT, minLag, maxLag):
+        x_data = PearsonTest.toFloats(independentT.getSelectedDateScores())
+        y_data = PearsonTest.toFloats(dependentT.getSelectedDateScores())
+        r2s, _, ps = PearsonTest.runLagScan(x_data, y_data, minLag, maxLag)
+        return list(r2s), list(ps)
+
+    @staticmethod
+    def toFloats(scores):
+        scores = np.asarray(scores)
+        if np.issubdtype(scores.dtype, np.datetime64):
+            seconds = scores.astype('datetime64[s]')
+            return np.where(np.isnat(seconds), np.nan, seconds.astype(np.int64).astype(np.float64))
+        return scores.astype(np.float64)
+
+    # @brief sums of a[i + lag] * b[i] over i for every lag between minLag and maxLag, computed together
+    @staticmethod
+    def laggedSums(a, b, minLag, maxLag):
+        full = scipySignal.correlate(a, b, mode='full')
+        # Index len(b) - 1 of the full correlation corresponds to no lag
+        return full[len(b) - 1 + minLag:len(b) + maxLag]
+
+    # @brief linear regression of x[i + lag] against y[i] for every lag in [minLag, maxLag]
+    # Pairs where either value is NaN (e.g. when not filling missing data) are left out of that lag's regression
+    # @return tuple of arrays (r^2, slope, two-sided p-value).  r^2 and p are -1 where the regression
+    # can't be calculated, like linregress failing on constant data
+    @staticmethod
+    def runLagScan(x, y, minLag, maxLag):
+        n = min(len(x), len(y))
+        x, y = x[:n], y[:n]
+        # Lags at least as long as the data have no pairs to regress
+        numInvalid = max(0, maxLag - max(minLag - 1, n - 1))
+        maxLag = min(maxLag, n - 1)
+        if maxLag < minLag:
+            return np.full(numInvalid, -1.0), np.full(numInvalid, np.nan), np.full(numInvalid, -1.0)
+
+        xValid, yValid = ~np.isnan(x), ~np.isnan(y)
+        # Center on the overall means so that the sums of squares don't lose precision
+        x0 = np.where(xValid, x - np.mean(x[xValid]) if xValid.any() else x, 0)
+        y0 = np.where(yValid, y - np.mean(y[yValid]) if yValid.any() else y, 0)
+        xMask, yMask = xValid.astype(np.float64), yValid.astype(np.float64)
+
+        N = np.round(PearsonTest.laggedSums(xMask, yMask, minLag, maxLag))
+        Sx = PearsonTest.laggedSums(x0, yMask, minLag, maxLag)
+        Sy = PearsonTest.laggedSums(xMask, y0, minLag, maxLag)
+        Sxx = PearsonTest.laggedSums(x0 ** 2, yMask, minLag, maxLag)
+        Syy = PearsonTest.laggedSums(xMask, y0 ** 2, minLag, maxLag)
+        Sxy = PearsonTest.laggedSums(x0, y0, minLag, maxLag)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covXY = Sxy - Sx * Sy / N
+            varX = Sxx - Sx ** 2 / N
+            varY = Syy - Sy ** 2 / N
+            r = np.clip(covXY / np.sqrt(varX * varY), -1, 1)
+            slope = covXY / varX
+
+            dof = N - 2
+            tStat = r * np.sqrt(dof / ((1 - r) * (1 + r)))
+            p = 2 * scipyStats.t.sf(np.abs(tStat), np.maximum(dof, 1))
+
+        r2 = r ** 2
+        # Perfect correlations have p = 0, like linregress
+        p = np.where(np.abs(r) == 1, 0.0, p)
+        scale = np.maximum(np.abs(Sxx), 1) * np.finfo(np.float64).eps * np.maximum(N, 1)
+        invalid = (N < 3) | (varX <= scale) | ~np.isfinite(r)
+        r2[invalid] = -1
+        p[invalid] = -1
+        slope[invalid] = np.nan
+        return np.append(r2, np.full(numInvalid, -1.0)), np.append(slope, np.full(numInvalid, np.nan)), \
+            np.append(p, np.full(numInvalid, -1.0))
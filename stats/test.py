@@ -15,19 +15,22 @@ class Test(ABC):
         ...
 
     # Loudly fail if data is passed to test in bad format
-    def runTestForLag(self, dependentT, independentT, lag=1):
+    def runChecks(self, dependentT, independentT):
         depScores = dependentT.getProcessedScores()
         indepScores = independentT.getProcessedScores()
         assert(not isinstance(depScores[0], str) and not isinstance(
             indepScores[0], str))
         assert(TrackableGroup(dependentT, independentT).isValid())
+
+    def runTestForLag(self, dependentT, independentT, lag=1):
+        self.runChecks(dependentT, independentT)
         return self.runValidTestForLag(dependentT, independentT, lag=lag)
 
-    # @return a tuple containing a list of r^2 and a list of p-values for each lag tested
+    # @return a tuple containing a list of r^2 and a list of p-values for each lag tested from minLag to maxLag inclusive
     # Default implementation is to just collect each day's results separately
     def runTestOverRange(self, dependentT, independentT, minLag=0, maxLag=3):
         r2_s, p_s = [], []
-        for lag in range(minLag, maxLag):
+        for lag in range(minLag, maxLag + 1):
             res = self.runTestForLag(dependentT, independentT, lag)
             r2_s.append(res[0])
             p_s.append(res[1])
@@ -0,0 +1,77 @@
+from trackables.trackables.appleHealthImport import AppleHealthImporter
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+
+exportXML = '''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE HealthData [
+<!ELEMENT HealthData (ExportDate,Me,(Record|Workout)*)>
+]>
+<HealthData locale="en_US">
+ <ExportDate value="2021-01-03 09:00:00 -0500"/>
+ <Me HKCharacteristicTypeIdentifierDateOfBirth=""/>
+ <Record type="HKQuantityTypeIdentifierStepCount" sourceName="Phone" unit="count" startDate="2021-01-01 08:00:00 -0500" endDate="2021-01-01 08:10:00 -0500" value="100"/>
+ <Record type="HKQuantityTypeIdentifierStepCount" sourceName="Phone" unit="count" startDate="2021-01-01 12:00:00 -0500" endDate="2021-01-01 12:10:00 -0500" value="50"/>
+ <Record type="HKQuantityTypeIdentifierStepCount" sourceName="Watch" unit="count" startDate="2021-01-01 08:00:00 -0500" endDate="2021-01-01 08:10:00 -0500" value="120"/>
+ <Record type="HKQuantityTypeIdentifierStepCount" sourceName="Watch" unit="count" startDate="2021-01-02 08:00:00 -0500" endDate="2021-01-02 08:10:00 -0500" value="300"/>
+ <Record type="HKQuantityTypeIdentifierHeartRate" sourceName="Watch" unit="count/min" startDate="2021-01-01 08:00:00 -0500" endDate="2021-01-01 08:00:00 -0500" value="60">
+  <MetadataEntry key="HKMetadataKeyHeartRateMotionContext" value="0"/>
+ </Record>
+ <Record type="HKQuantityTypeIdentifierHeartRate" sourceName="Phone" unit="count/min" startDate="2021-01-01 09:00:00 -0500" endDate="2021-01-01 09:00:00 -0500" value="80"/>
+ <Record type="HKCategoryTypeIdentifierSleepAnalysis" sourceName="Watch" startDate="2021-01-02 23:00:00 -0500" endDate="2021-01-03 06:30:00 -0500" value="HKCategoryValueSleepAnalysisAsleepCore"/>
+ <Record type="HKQuantityTypeIdentifierDietaryEnergyConsumed" sourceName="Phone" unit="Cal" startDate="2021-01-01 12:00:00 -0500" endDate="2021-01-01 12:00:00 -0500" value="500"/>
+ <Correlation type="HKCorrelationTypeIdentifierFood" sourceName="Phone" startDate="2021-01-01 12:00:00 -0500" endDate="2021-01-01 12:00:00 -0500">
+  <Record type="HKQuantityTypeIdentifierDietaryEnergyConsumed" sourceName="Phone" unit="Cal" startDate="2021-01-01 12:00:00 -0500" endDate="2021-01-01 12:00:00 -0500" value="500"/>
+ </Correlation>
+ <Workout workoutActivityType="HKWorkoutActivityTypeRunning" duration="30"/>
+</HealthData>
+'''
+
+
+class TestAppleHealthImport(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.exportPath = os.path.join(self.tempDir, 'export.xml')
+        with open(self.exportPath, 'w') as file:
+            file.write(exportXML)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_AggregatesRecordsByDay(self):
+        progress = []
+        df = AppleHealthImporter.parseExport(self.exportPath, progress.append)
+
+        self.assertEqual(list(df.columns), ['Dietary Energy Consumed', 'Heart Rate', 'Sleep Analysis Asleep Core',
+                                            'Step Count'])
+        self.assertEqual([str(d.date()) for d in df.index], ['2021-01-01', '2021-01-02'])
+        # Steps use the source with the most each day, heart rate is averaged over every source
+        np.testing.assert_array_equal(df['Step Count'], [150, 300])
+        np.testing.assert_array_equal(df['Heart Rate'], [70, np.nan])
+        np.testing.assert_array_equal(df['Sleep Analysis Asleep Core'], [np.nan, 7.5])
+        self.assertEqual(progress[-1], 1.0)
+
+    def test_SkipsRecordsInCorrelations(self):
+        df = AppleHealthImporter.parseExport(self.exportPath, lambda fraction: None)
+        # The food's record repeats the one stored on its own
+        np.testing.assert_array_equal(df['Dietary Energy Consumed'], [500, np.nan])
+
+    def test_LoadsFromSnapshot(self):
+        snapshotDir = os.path.join(self.tempDir, 'snapshot')
+        df = AppleHealthImporter.load(self.exportPath, snapshotDir)
+        self.assertTrue(os.path.exists(os.path.join(snapshotDir, AppleHealthImporter.snapshotCategory)))
+
+        # The unchanged export isn't parsed again
+        with mock.patch.object(AppleHealthImporter, 'parseExport', side_effect=AssertionError):
+            cached = AppleHealthImporter.load(self.exportPath, snapshotDir)
+        np.testing.assert_array_equal(cached['Step Count'], df['Step Count'])
+        self.assertEqual(list(cached.index), list(df.index))
+
+
+if __name__ == '__main__':
+    unittest.main()
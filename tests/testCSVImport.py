@@ -0,0 +1,66 @@
+from trackables.trackables.csvImport import CSVImportSpec, CSVImporter
+from stats.duplicateReduction import DuplicateReduction
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+
+class TestCSVImport(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def writeExport(self, fileName, text):
+        path = os.path.join(self.tempDir, fileName)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def test_ReadsWideExportInChunks(self):
+        path = self.writeExport('fitbit.csv', 'Date,Steps,Floors,Notes\n'
+                                              '2021-01-02,"1,000",3,a\n'
+                                              '2021-01-01,500,--,b\n'
+                                              '2021-01-02,250,1,c\n'
+                                              '2021-01-03,,2,d\n')
+        spec = CSVImportSpec('Fitbit', path, 'Date', ['Steps', 'Floors'], dateFormat='%Y-%m-%d', thousands=',')
+        dates, names, wide = CSVImporter.read(spec, chunkSize=2)
+
+        self.assertEqual([str(d.date()) for d in dates], ['2021-01-01', '2021-01-02', '2021-01-03'])
+        self.assertEqual(names, ['Steps', 'Floors'])
+        # Days spread over several chunks are still combined, and missing values are skipped
+        np.testing.assert_array_equal(wide, [[500, np.nan], [1250, 4], [np.nan, 2]])
+
+    def test_ReadsLongExportWithTimes(self):
+        path = self.writeExport('whoop.tsv', 'Day\tTime\tMetric\tValue\n'
+                                             '01/01/2021\t22:00\tHRV\t40\n'
+                                             '01/01/2021\t07:00\tHRV\t60\n'
+                                             '01/01/2021\t08:00\tRecovery\t70\n'
+                                             '01/02/2021\t09:30\tHRV\t50\n'
+                                             '01/02/2021\t09:00\tHRV\t55\n')
+        spec = CSVImportSpec('Whoop', path, 'Day', ['Value'], nameColumn='Metric', timeColumn='Time',
+                             dateFormat='%m/%d/%Y', timeFormat='%H:%M', aggregation=DuplicateReduction.LAST)
+        dates, names, wide = CSVImporter.read(spec, chunkSize=2)
+
+        self.assertEqual(names, ['HRV', 'Recovery'])
+        # The last measurement of each day by time, not by position in the file
+        np.testing.assert_array_equal(wide, [[40, 70], [50, np.nan]])
+
+        spec.aggregation = DuplicateReduction.MEAN
+        _, _, wide = CSVImporter.read(spec, chunkSize=2)
+        np.testing.assert_array_equal(wide[:, 0], [50, 52.5])
+
+    def test_RoundTripsSettings(self):
+        spec = CSVImportSpec.fromDict({'Name': 'Garmin', 'Path': 'garmin.csv', 'Date Column': 'Date',
+                                       'Value Columns': ['Stress'], 'Aggregation': 'Max'})
+        self.assertEqual(spec.aggregation, DuplicateReduction.MAX)
+        self.assertEqual(CSVImportSpec.fromDict(spec.toDict()).toDict(), spec.toDict())
+
+
+if __name__ == '__main__':
+    unittest.main()
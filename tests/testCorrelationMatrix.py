@@ -0,0 +1,27 @@
+from stats.correlationMatrix import CorrelationMatrix
+
+import unittest
+import numpy as np
+
+
+class TestCorrelationMatrix(unittest.TestCase):
+
+    def test_MatchesPairwiseCorrcoef(self):
+        rng = np.random.default_rng(0)
+        data = rng.normal(size=(300, 6))
+        data[rng.random(data.shape) < 0.1] = np.nan
+
+        for lag in [0, 2]:
+            corrs = CorrelationMatrix.pearson(data, lagDays=lag)
+            dep, indep = data[:len(data) - lag, 1], data[lag:, 4]
+            valid = ~np.isnan(dep) & ~np.isnan(indep)
+            self.assertAlmostEqual(corrs[1, 4], np.corrcoef(dep[valid], indep[valid])[0, 1])
+        np.testing.assert_allclose(np.diag(CorrelationMatrix.pearson(data)), 1)
+
+    def test_ConstantColumnIsZero(self):
+        data = np.column_stack([np.arange(10.0), np.ones(10)])
+        self.assertEqual(CorrelationMatrix.pearson(data)[0, 1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+from stats.grangerTest import GrangerTest
+
+import unittest
+import numpy as np
+from scipy.stats import f as fDistribution
+
+
+class TestGrangerTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.cause = rng.normal(size=120)
+        self.result = 0.6 * np.roll(self.cause, 2) + rng.normal(size=120) + 10
+
+    # @brief the F-test for one lag from plain least squares fits of both models, built row by row
+    def referenceFTest(self, lag):
+        rows = range(lag, len(self.result))
+        target = np.array([self.result[t] for t in rows])
+        restricted = np.array([[1.0] + [self.result[t - k] for k in range(1, lag + 1)] for t in rows])
+        unrestricted = np.array([list(restricted[i]) + [self.cause[t - k] for k in range(1, lag + 1)]
+                                 for i, t in enumerate(rows)])
+
+        def ssr(design):
+            coeffs = np.linalg.lstsq(design, target, rcond=None)[0]
+            return np.sum((target - design @ coeffs) ** 2)
+
+        dofDenom = len(target) - unrestricted.shape[1]
+        fValue = ((ssr(restricted) - ssr(unrestricted)) / lag) / (ssr(unrestricted) / dofDenom)
+        return fValue, fDistribution.sf(fValue, lag, dofDenom), dofDenom
+
+    def test_FTestsMatchLeastSquares(self):
+        tests = GrangerTest.runFTests(self.result, self.cause, 1, 6)
+        self.assertEqual(len(tests), 6)
+        for lag, (fValue, pValue, dofDenom, dofNum) in zip(range(1, 7), tests):
+            expectedF, expectedP, expectedDof = self.referenceFTest(lag)
+            self.assertAlmostEqual(fValue, expectedF)
+            self.assertAlmostEqual(pValue, expectedP)
+            self.assertEqual(dofDenom, expectedDof)
+            self.assertEqual(dofNum, lag)
+
+    def test_EffectSizesMatchLeastSquares(self):
+        eta2s, pValues = GrangerTest.getEffectSizes(self.result, self.cause, 0, 4)
+        N = len(self.result)
+        self.assertEqual(len(eta2s), 4)
+        for lag in range(1, 5):
+            fValue, pValue, dofDenom = self.referenceFTest(lag)
+            eta2 = fValue * (dofDenom - 1) / (fValue * (dofDenom - 1) + (N - dofDenom))
+            self.assertAlmostEqual(eta2s[lag - 1], eta2)
+            self.assertAlmostEqual(pValues[lag - 1], pValue)
+        # The real lag has by far the strongest effect
+        self.assertEqual(int(np.argmax(eta2s)), 1)
+
+    def test_LagsAreCappedByObservations(self):
+        self.assertEqual(GrangerTest.getMaxFeasibleLag(11), 3)
+        eta2s, pValues = GrangerTest.getEffectSizes(self.result[:11], self.cause[:11], 1, 10)
+        self.assertEqual(len(eta2s), 3)
+        self.assertEqual(len(pValues), 3)
+
+        self.assertEqual(GrangerTest.getMaxFeasibleLag(4), 0)
+        self.assertEqual(GrangerTest.getEffectSizes(self.result[:4], self.cause[:4], 1, 3)[0], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
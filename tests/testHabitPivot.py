@@ -0,0 +1,26 @@
+from trackables.trackables.trackableFactories import HabitFactory
+
+import unittest
+import numpy as np
+import pandas as pd
+
+
+class TestHabitPivot(unittest.TestCase):
+
+    def test_PivotsHabitsIntoColumns(self):
+        habitDf = pd.DataFrame(data={
+            'HabitName': ['Run', 'Read', 'Run', 'Run', 'Read'],
+            'CalendarDate': ['01/02/2021', '01/01/2021', '01/03/2021', '01/02/2021', '01/03/2021'],
+            'Value': [1.0, 20.0, 1.0, 2.0, np.nan],
+        })
+        dates, names, wide = HabitFactory.pivotHabits(habitDf)
+
+        self.assertEqual(list(dates), list(pd.date_range('1/1/2021', '1/3/2021')))
+        self.assertEqual(names, ['Read', 'Run'])
+        # Repeated days are added together and days without a value are NaN
+        np.testing.assert_array_equal(wide, [[20, np.nan], [np.nan, 3], [np.nan, 1]])
+        self.assertTrue(wide[:, 1].flags['C_CONTIGUOUS'])
+
+
+if __name__ == '__main__':
+    unittest.main()
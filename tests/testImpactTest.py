@@ -0,0 +1,37 @@
+from stats.impactTest import ContinuousImpactTest, BinaryImpactTest
+
+import unittest
+import numpy as np
+
+
+class TestImpactTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_ContinuousMatchesDirectCount(self):
+        cause = self.rng.normal(size=100)
+        result = np.roll(cause, 2) + 0.3 * self.rng.normal(size=100)
+        correlations, ps = ContinuousImpactTest().runPermutationTest(cause, result, 0, 3, rng=self.rng)
+
+        causeChanges, resultChanges = np.sign(np.diff(cause)), np.sign(np.diff(result))
+        same = np.mean(causeChanges[:-2] == resultChanges[2:])
+        self.assertAlmostEqual(correlations[2], (same - 0.5) * 2)
+        self.assertLess(ps[2], 0.01)
+        self.assertEqual(len(ps), 4)
+
+    def test_BinaryFindsLaggedEffect(self):
+        cause = (self.rng.random(200) < 0.3).astype(float)
+        result = np.cumsum(self.rng.normal(size=200)) + 3 * np.roll(cause, 1)
+        correlations, ps = BinaryImpactTest().runPermutationTest(cause, result, 0, 2, rng=self.rng)
+
+        self.assertGreater(correlations[1], 0.3)
+        self.assertLess(ps[1], 0.01)
+
+    def test_TooFewDays(self):
+        correlations, ps = ContinuousImpactTest().runPermutationTest(np.arange(3.0), np.arange(3.0), 2, 2)
+        self.assertEqual((correlations[0], ps[0]), (0, -1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+from util.logWriter import LogWriter
+
+import unittest
+import tempfile
+import os
+import time
+
+
+class TestLogWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.writer = LogWriter(flushInterval=60)
+
+    def tearDown(self):
+        self.writer.stop()
+        self.tempDir.cleanup()
+
+    def test_BatchesUntilFlush(self):
+        path = os.path.join(self.tempDir.name, 'panel', 'Coffee.csv')
+        calls = []
+        self.writer.appendCsvRow(path, ['01/01/2021', '08:00', 1])
+        self.writer.call(calls.append, 'inserted')
+        self.writer.appendCsvRow(path, ['01/02/2021', '09:30', 'a, b'])
+        self.assertFalse(os.path.exists(path))
+
+        self.writer.flush()
+        with open(path, 'r') as f:
+            self.assertEqual(f.read(), '01/01/2021,08:00,1\n01/02/2021,09:30,"a, b"\n')
+        self.assertEqual(calls, ['inserted'])
+
+    def test_FailedCallsAreRetried(self):
+        calls = []
+
+        def insert(value):
+            if len(calls) == 0:
+                calls.append('failed')
+                raise RuntimeError('database is locked')
+            calls.append(value)
+
+        self.writer.call(insert, 'inserted')
+        self.writer.flush()
+        self.assertEqual(calls, ['failed'])
+        self.writer.flush()
+        self.assertEqual(calls, ['failed', 'inserted'])
+
+    def test_WriterThreadRetriesFailures(self):
+        writer = LogWriter(flushInterval=0.01)
+        writer.retryDelay = 0.01
+        calls = []
+
+        def insert(value):
+            if len(calls) == 0:
+                calls.append('failed')
+                raise RuntimeError('database is locked')
+            calls.append(value)
+
+        # Nothing else is logged, so the writer has to try again by itself
+        writer.call(insert, 'inserted')
+        deadline = time.time() + 5
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        writer.stop()
+        self.assertEqual(calls, ['failed', 'inserted'])
+
+    def test_StopWritesPending(self):
+        path = os.path.join(self.tempDir.name, 'history.txt')
+        self.writer.appendLine(path, 'Coffee logged')
+        self.writer.stop()
+        with open(path, 'r') as f:
+            self.assertEqual(f.read(), 'Coffee logged\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
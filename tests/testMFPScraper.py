@@ -0,0 +1,96 @@
+from trackables.MFPScraper import MFPScraper, defaultStartDate
+from trackables.trackables.myFitnessMeals import MealTable
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+
+
+class StubMeal:
+
+    def __init__(self, name, totals):
+        self.name = name
+        self.totals = totals
+
+
+class StubDay:
+
+    def __init__(self, meals):
+        self.meals = meals
+
+
+# Stands in for myfitnesspal.Client, failing the first request for each day in failingDays
+class StubClient:
+
+    def __init__(self, failingDays=()):
+        self.requests = []
+        self.failingDays = set(failingDays)
+        self.lock = threading.Lock()
+
+    def get_date(self, year, month, day):
+        with self.lock:
+            self.requests.append((year, month, day))
+            if day in self.failingDays:
+                self.failingDays.remove(day)
+                raise ConnectionError('Stub failure')
+        return StubDay([
+            StubMeal('Breakfast', {'calories': 300, 'carbohydrates': 40, 'fat': 10, 'protein': 15, 'sodium': 200,
+                                   'sugar': 5}),
+            StubMeal('Snacks', {}),
+        ])
+
+
+class TestMFPScraper(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.sheetPath = os.path.join(self.tempDir, 'MFPData.csv')
+        self.cacheDir = os.path.join(self.tempDir, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def makeScraper(self, client):
+        return MFPScraper(client, self.sheetPath, self.cacheDir, numWorkers=3, backoffSeconds=0)
+
+    def test_ResumesFromLastScrapedDay(self):
+        client = StubClient(failingDays=['04'])
+        self.assertEqual(self.makeScraper(client).updateSheet(defaultStartDate + timedelta(days=4), batchDays=2), 5)
+        # The failed day is retried and the empty meal is skipped
+        self.assertEqual(len(client.requests), 6)
+
+        client = StubClient()
+        self.assertEqual(self.makeScraper(client).updateSheet(defaultStartDate + timedelta(days=6)), 2)
+        # The days are requested concurrently, so in any order
+        self.assertEqual(sorted(client.requests), [('2020', '06', '08'), ('2020', '06', '09')])
+
+        table = MealTable.fromCSV(self.sheetPath)
+        self.assertEqual(len(table), 7)
+        self.assertEqual(str(table.days[-1]), '2020-06-09')
+        self.assertEqual(table.getNutrient('Calories').sum(), 2100)
+
+    def test_ErrorKeepsEarlierDays(self):
+        client = StubClient(failingDays=['05'])
+        scraper = MFPScraper(client, self.sheetPath, self.cacheDir, numWorkers=2, maxRetries=0)
+        with self.assertRaises(ConnectionError):
+            scraper.updateSheet(defaultStartDate + timedelta(days=5), batchDays=2)
+
+        self.assertEqual(len(MealTable.fromCSV(self.sheetPath)), 2)
+        # Days after the failing window are never requested
+        self.assertNotIn(('2020', '06', '07'), client.requests)
+
+    def test_ReadsFetchedDaysFromCache(self):
+        endDate = defaultStartDate + timedelta(days=2)
+        self.makeScraper(StubClient()).updateSheet(endDate)
+        os.remove(self.sheetPath)
+
+        client = StubClient()
+        self.assertEqual(self.makeScraper(client).updateSheet(endDate), 3)
+        self.assertEqual(client.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
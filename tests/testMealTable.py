@@ -0,0 +1,63 @@
+from trackables.trackables.myFitnessMeals import MealTable, MFPManager
+import trackables.trackables.myFitnessMeals as myFitnessMeals
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+
+class TestMealTable(unittest.TestCase):
+
+    def makeTable(self):
+        df = pd.DataFrame(data={
+            'Meal': ['Lunch', 'Breakfast', 'Breakfast', 'Dinner'],
+            'Date': ['2021-01-02', '2021-01-01', '2021-01-01', '2021-01-02'],
+            'Time': ['1900-01-01 12:30:00', '1900-01-01', '1900-01-01 08:15:00', None],
+        })
+        for k, nutrient in enumerate(MealTable.nutrients):
+            df[nutrient] = [1.0 + k, 2.0, 3.0, np.nan]
+        return MealTable.fromFrame(df)
+
+    def test_SortsMealsByDate(self):
+        table = self.makeTable()
+        self.assertEqual(list(table.days.astype(str)), ['2021-01-01', '2021-01-01', '2021-01-02', '2021-01-02'])
+        self.assertEqual([table.mealNames[c] for c in table.mealCodes], ['Breakfast', 'Breakfast', 'Lunch', 'Dinner'])
+        # Midnight is saved without the time and unknown times are -1
+        np.testing.assert_array_equal(table.minutes, [0, 495, 750, -1])
+        self.assertEqual(table.getMeal(1).time, '08:15')
+
+    def test_SumsEachMealSlotOfEachDay(self):
+        table = self.makeTable()
+        days, totals, counts = table.getSlotTotals()
+        breakfast, lunch, dinner = (table.mealNames.index(n) for n in ['Breakfast', 'Lunch', 'Dinner'])
+
+        self.assertEqual(len(days), 2)
+        self.assertEqual(totals[0, breakfast, 0], 5.0)
+        self.assertEqual(totals[1, lunch, 0], 1.0)
+        # Meals missing a nutrient aren't counted
+        self.assertEqual(counts[1, dinner, 0], 0)
+        np.testing.assert_array_equal(table.getNutrient('Calories')[table.getMealMask('Breakfast')], [2.0, 3.0])
+
+    def test_MealsWithoutNamesGetTheirOwnSlot(self):
+        df = pd.DataFrame(data={'Meal': ['Breakfast', None, 'Lunch'], 'Date': ['2021-01-01'] * 3, 'Time': [None] * 3})
+        for nutrient in MealTable.nutrients:
+            df[nutrient] = [100.0, 50.0, 200.0]
+        table = MealTable.fromFrame(df)
+        _, totals, _ = table.getSlotTotals()
+
+        self.assertEqual(totals[0, table.mealNames.index('Lunch'), 0], 200.0)
+        self.assertEqual(totals[0, table.mealNames.index(MealTable.unknownMealName), 0], 50.0)
+        self.assertEqual(table.getMeal(1).mealName, MealTable.unknownMealName)
+
+
+    def test_NoTrackablesWithoutSpreadsheet(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            with mock.patch.object(myFitnessMeals, 'MFPDataPath', os.path.join(tempDir, 'MFPData.csv')):
+                self.assertEqual(MFPManager().getTrackables(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
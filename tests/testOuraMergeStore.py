@@ -0,0 +1,60 @@
+from trackables.trackables.ouraMergeStore import OuraExportStream, OuraMergeStore
+
+import unittest
+import tempfile
+import os
+import json
+import pandas as pd
+
+
+class TestOuraMergeStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.snapshotDir = os.path.join(self.tempDir.name, 'snapshots')
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def writeExport(self, name, days, score=0):
+        path = os.path.join(self.tempDir.name, name)
+        records = [{'summary_date': str(day.date()), 'period_id': 0, 'score': score + i,
+                    'hr_5min': [50, 1.5e3, -2]} for i, day in enumerate(days)]
+        with open(path, 'w') as f:
+            json.dump({'sleep': records, 'activity': [], 'version': 1.25, 'readiness': records[:1]}, f, indent=1)
+        return path
+
+    def test_StreamMatchesJSONLoad(self):
+        path = self.writeExport('oura_2021-01-01.json', pd.date_range('1/1/2021', periods=50))
+        with open(path, 'r') as f:
+            expected = json.load(f)
+
+        # Tiny chunks split records and numbers across reads
+        records = list(OuraExportStream(path, chunkSize=7).iterRecords())
+        self.assertEqual([r for c, r in records if c == 'sleep'], expected['sleep'])
+        self.assertEqual([r for c, r in records if c == 'readiness'], expected['readiness'])
+        self.assertEqual(len(records), 51)
+
+    def test_MergesOverlappingExports(self):
+        first = self.writeExport('oura_2021-01-10.json', pd.date_range('1/1/2021', '1/10/2021'))
+        second = self.writeExport('oura_2021-01-15.json', pd.date_range('1/1/2021', '1/15/2021'), score=100)
+
+        store = OuraMergeStore(self.snapshotDir)
+        self.assertTrue(store.update([first]))
+        self.assertTrue(store.update([first, second]))
+        sleep = store.getFrame('sleep')
+        self.assertEqual(len(sleep), 15)
+        self.assertTrue(sleep.index.is_monotonic_increasing)
+        # Days before the last stored one are kept, the last stored day and newer days come from the newer export
+        self.assertEqual(list(sleep['score'][:9]), list(range(9)))
+        self.assertEqual(list(sleep['score'][9:]), list(range(109, 115)))
+        self.assertIsNone(store.getFrame('activity'))
+
+        # A new store reads the merged records back without reading the exports again
+        reloaded = OuraMergeStore(self.snapshotDir)
+        self.assertFalse(reloaded.update([first, second]))
+        pd.testing.assert_frame_equal(reloaded.getFrame('sleep'), sleep, check_index_type=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+from stats.pearsonTest import PearsonTest
+
+import unittest
+import numpy as np
+from scipy.stats import linregress
+
+
+class TestPearsonTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = rng.normal(size=200)
+        self.y = 0.5 * np.roll(self.x, -3) + rng.normal(size=200) + 100
+
+    def test_LagScanMatchesLinregress(self):
+        r2s, slopes, ps = PearsonTest.runLagScan(self.x, self.y, 0, 10)
+        self.assertEqual(len(r2s), 11)
+        for lag in [0, 3, 10]:
+            res = linregress(self.x[lag:], self.y[:len(self.y) - lag])
+            self.assertAlmostEqual(r2s[lag], res.rvalue ** 2)
+            self.assertAlmostEqual(slopes[lag], res.slope)
+            self.assertAlmostEqual(ps[lag], res.pvalue)
+
+    def test_NaNPairsAreDropped(self):
+        x, y = np.copy(self.x), np.copy(self.y)
+        x[10], y[40] = np.nan, np.nan
+        r2s, _, ps = PearsonTest.runLagScan(x, y, 3, 3)
+
+        xLagged, yLagged = x[3:], y[:-3]
+        valid = ~np.isnan(xLagged) & ~np.isnan(yLagged)
+        res = linregress(xLagged[valid], yLagged[valid])
+        self.assertAlmostEqual(r2s[0], res.rvalue ** 2)
+        self.assertAlmostEqual(ps[0], res.pvalue)
+
+
+if __name__ == '__main__':
+    unittest.main()
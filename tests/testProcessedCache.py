@@ -0,0 +1,64 @@
+from trackables.processedCache import ProcessedCache
+from trackables.trackables.trackables import UserContinuousTrackable
+from stats.fillStrategy import FillStrategy
+from stats.frequency import Frequency, GroupingMethod
+
+import unittest
+import pandas as pd
+import numpy as np
+
+
+class TestProcessedCache(unittest.TestCase):
+
+    def test_EvictsLeastRecentlyUsed(self):
+        cache = ProcessedCache(maxBytes=3 * 160)
+        for i in range(3):
+            cache.put(i, np.zeros(10), np.zeros(10))
+        cache.get(0)
+        cache.put(3, np.zeros(10), np.zeros(10))
+
+        self.assertIsNotNone(cache.get(0))
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache), 3)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_SwitchingFrequencyUsesCache(self):
+        dates = pd.date_range(start='1/1/2020', end='3/31/2020')
+        df = pd.DataFrame(data={'Score': np.arange(len(dates), dtype=float)}, index=dates)
+        t = UserContinuousTrackable('t', df)
+
+        t.updateCalculation(Frequency.DAILY, GroupingMethod.AVERAGE, FillStrategy.ZEROS, dates)
+        t.updateCalculation(Frequency.WEEKLY, GroupingMethod.SUM, FillStrategy.ZEROS, dates)
+        weekly = t.getProcessedScores().copy()
+        t.updateCalculation(Frequency.DAILY, GroupingMethod.AVERAGE, FillStrategy.ZEROS, dates)
+        t.updateCalculation(Frequency.WEEKLY, GroupingMethod.SUM, FillStrategy.ZEROS, dates)
+
+        self.assertEqual(t.processedCache.hits, 2)
+        np.testing.assert_allclose(t.getProcessedScores(), weekly)
+
+        # New entries change the raw data version so nothing stale is returned
+        t.addEntry(100, '03/31/2020', None)
+        t.updateCalculation(Frequency.WEEKLY, GroupingMethod.SUM, FillStrategy.ZEROS, dates)
+        self.assertEqual(t.getProcessedScores()[-1], weekly[-1] + 100)
+
+    def test_CopyForAnalysisLeavesOriginal(self):
+        dates = pd.date_range(start='1/1/2020', end='3/31/2020')
+        df = pd.DataFrame(data={'Score': np.arange(len(dates), dtype=float)}, index=dates)
+        t = UserContinuousTrackable('t', df)
+        daily = t.getProcessedScores().copy()
+
+        working = t.copyForAnalysis()
+        working.updateCalculation(Frequency.WEEKLY, GroupingMethod.SUM, FillStrategy.ZEROS, dates)
+        self.assertEqual(t.frequency, Frequency.DAILY)
+        np.testing.assert_allclose(t.getProcessedScores(), daily)
+
+        t.adoptCalculation(working)
+        self.assertEqual(t.frequency, Frequency.WEEKLY)
+        np.testing.assert_allclose(t.getProcessedScores(), working.getProcessedScores())
+        # The cache is shared, so the original reuses the copy's calculation
+        t.updateCalculation(Frequency.WEEKLY, GroupingMethod.SUM, FillStrategy.ZEROS, dates)
+        self.assertEqual(t.processedCache.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+from trackables.rangeStats import RangeStats
+from trackables.trackables.trackables import UserContinuousTrackable
+from stats.fillStrategy import FillStrategy
+
+import unittest
+import pandas as pd
+import numpy as np
+
+
+class TestRangeStats(unittest.TestCase):
+
+    def setUp(self):
+        self.dates = pd.date_range(start='1/1/2020', end='12/31/2021')
+        self.scores = 1000 + np.random.rand(len(self.dates))
+
+    def test_MatchesNumpyOverRange(self):
+        stats = RangeStats(self.dates, self.scores)
+        start, end = pd.Timestamp('3/15/2020'), pd.Timestamp('9/1/2021')
+        expected = self.scores[(self.dates >= start) & (self.dates <= end)]
+
+        self.assertEqual(stats.getCount(start, end), len(expected))
+        self.assertAlmostEqual(stats.getSum(start, end), np.sum(expected))
+        self.assertAlmostEqual(stats.getMean(start, end), np.mean(expected))
+        self.assertAlmostEqual(stats.getStdev(start, end), np.std(expected))
+
+    def test_ExtendReplacesLastDay(self):
+        stats = RangeStats(self.dates[:10], self.scores[:10])
+        # Re-append the last day with a different value alongside two new days
+        stats.extend(self.dates[9:12], [5.0, 6.0, 7.0])
+        expected = np.concatenate([self.scores[:9], [5.0, 6.0, 7.0]])
+
+        self.assertEqual(stats.size, 12)
+        self.assertAlmostEqual(stats.getMean(self.dates[0], self.dates[11]), np.mean(expected))
+
+    def test_NaNInRange(self):
+        scores = np.copy(self.scores)
+        scores[20] = np.nan
+        stats = RangeStats(self.dates, scores)
+
+        # NaN entries are skipped, like np.mean over a Series
+        expected = pd.Series(scores[:31])
+        self.assertAlmostEqual(stats.getMean(self.dates[0], self.dates[30]), np.mean(expected))
+        self.assertAlmostEqual(stats.getStdev(self.dates[0], self.dates[30]), np.std(expected))
+        self.assertAlmostEqual(stats.getSum(self.dates[0], self.dates[30]), np.sum(expected))
+        self.assertEqual(stats.getCount(self.dates[0], self.dates[30]), 30)
+        self.assertTrue(np.isnan(stats.getMean(self.dates[20], self.dates[20])))
+
+    def test_TrackableMeanWithMissingDates(self):
+        keep = np.arange(len(self.dates)) % 3 != 0
+        df = pd.DataFrame(data={'Score': self.scores[keep]}, index=self.dates[keep])
+        t = UserContinuousTrackable('t', df)
+        dateRange = pd.date_range('2/1/2020', '5/1/2020')
+        processed = t.processedData.loc[dateRange[0]:dateRange[-1]]['Score']
+
+        self.assertAlmostEqual(t.getMeanOverDateRange(dateRange), np.mean(processed))
+        self.assertAlmostEqual(t.getStdevOverDateRange(dateRange), np.std(processed))
+
+    def test_UnfilledTrackableWithGaps(self):
+        dates = pd.date_range('1/1/2020', '1/31/2020')
+        keep = np.arange(len(dates)) % 3 != 2
+        df = pd.DataFrame(data={'Score': np.arange(len(dates), dtype=np.float64)[keep]}, index=dates[keep])
+        t = UserContinuousTrackable('t', df)
+        t.setFillStrategy(FillStrategy.NONE)
+        t.fillEmptyDates()
+        processed = t.processedData.loc[dates[0]:dates[-1]]['Score']
+
+        self.assertTrue(processed.isna().any())
+        self.assertEqual(t.getMeanStrOverDateRange(dates), '{:.2f}'.format(np.mean(processed)))
+        self.assertAlmostEqual(t.getStdevOverDateRange(dates), np.std(processed))
+
+    def test_AddEntryMatchesFullRefill(self):
+        df = pd.DataFrame(data={'Score': [1.0, 2.0, 3.0]}, index=pd.to_datetime(['1/5/2020', '1/9/2020', '1/20/2020']))
+        t = UserContinuousTrackable('t', df)
+        t.setFillStrategy(FillStrategy.FORWARD)
+        t.fillEmptyDates()
+        t.getRangeStats()
+        for date in ['01/25/2020', '01/12/2020', '01/09/2020', '01/26/2020']:
+            t.addEntry(4.0, date, None)
+
+        expected = UserContinuousTrackable('expected', t.rawData)
+        expected.setFillStrategy(FillStrategy.FORWARD)
+        expected.fillEmptyDates()
+        np.testing.assert_array_equal(t.getProcessedDates(), expected.getProcessedDates())
+        np.testing.assert_allclose(t.getProcessedScores(), expected.getProcessedScores())
+        self.assertAlmostEqual(t.getSumOverDateRange(self.dates[:31]), np.sum(expected.getProcessedScores()))
+
+
+if __name__ == '__main__':
+    unittest.main()
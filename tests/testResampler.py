@@ -0,0 +1,67 @@
+from trackables.resampler import Resampler
+from trackables.trackables.trackables import UserContinuousTrackable
+from stats.frequency import Frequency, GroupingMethod
+from stats.duplicateReduction import DuplicateReduction
+
+import unittest
+import pandas as pd
+import numpy as np
+
+
+class TestResampler(unittest.TestCase):
+
+    def test_WeeksStartOnMonday(self):
+        # 01/01/2020 was a Wednesday
+        dates = pd.date_range(start='1/1/2020', end='1/13/2020')
+        starts = Resampler.getBucketStarts(dates, Frequency.WEEKLY)
+        self.assertEqual(pd.Timestamp(starts[0]), pd.Timestamp('12/30/2019'))
+        self.assertEqual(pd.Timestamp(starts[5]), pd.Timestamp('1/6/2020'))
+        self.assertEqual(pd.Timestamp(starts[-1]), pd.Timestamp('1/13/2020'))
+
+    def test_PartialWeeksOnlyUseMeasuredDays(self):
+        dates = pd.date_range(start='1/1/2020', end='1/13/2020')
+        scores = np.arange(len(dates), dtype=float)
+        index, means = Resampler.resample(dates, scores, Frequency.WEEKLY, GroupingMethod.AVERAGE)
+        _, sums = Resampler.resample(dates, scores, Frequency.WEEKLY, GroupingMethod.SUM)
+
+        self.assertEqual(list(index), list(pd.to_datetime(['12/30/2019', '1/6/2020', '1/13/2020'])))
+        np.testing.assert_allclose(means, [2, 8, 12])
+        np.testing.assert_allclose(sums, [10, 56, 12])
+
+    def test_NaNPropagatesToBucket(self):
+        dates = pd.date_range(start='1/1/2020', end='3/31/2020')
+        scores = np.ones(len(dates))
+        scores[40] = np.nan     # Somewhere in February
+        index, sums = Resampler.resample(dates, scores, Frequency.MONTHLY, GroupingMethod.SUM)
+
+        self.assertEqual(list(index), list(pd.to_datetime(['1/1/2020', '2/1/2020', '3/1/2020'])))
+        self.assertEqual(sums[0], 31)
+        self.assertTrue(np.isnan(sums[1]))
+        self.assertEqual(sums[2], 31)
+
+    def test_YearlyTrackable(self):
+        dates = pd.date_range(start='6/1/2019', end='2/1/2021')
+        df = pd.DataFrame(data={'Score': np.full(len(dates), 2.0)}, index=dates)
+        t = UserContinuousTrackable('t', df)
+        t.setFrequency(Frequency.YEARLY, GroupingMethod.SUM)
+
+        self.assertEqual(list(t.getProcessedDates()), list(pd.to_datetime(['1/1/2019', '1/1/2020', '1/1/2021'])))
+        np.testing.assert_allclose(t.getProcessedScores(), [2 * 214, 2 * 366, 2 * 32])
+
+    def test_CombineDuplicates(self):
+        dates = pd.to_datetime(['1/2/2020', '1/1/2020', '1/2/2020', '1/2/2020'])
+        uniqueDates, sums, _ = Resampler.combineDuplicates(dates, [1.0, 2.0, 3.0, 5.0], DuplicateReduction.SUM)
+        _, lasts, _ = Resampler.combineDuplicates(dates, [1.0, 2.0, 3.0, 5.0], DuplicateReduction.LAST)
+
+        self.assertEqual(list(uniqueDates), list(pd.to_datetime(['1/1/2020', '1/2/2020'])))
+        np.testing.assert_allclose(sums, [2, 9])
+        np.testing.assert_allclose(lasts, [2, 5])
+
+        # Times are averaged rather than skipped
+        times = pd.to_datetime(['1/2/2020 22:00', '1/1/2020 23:00', '1/2/2020 23:00']).to_numpy()
+        _, means, _ = Resampler.combineDuplicates(dates[:3], times, DuplicateReduction.MEAN)
+        self.assertEqual(pd.Timestamp(means[1]), pd.Timestamp('1/2/2020 22:30'))
+
+
+if __name__ == '__main__':
+    unittest.main()
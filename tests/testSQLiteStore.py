@@ -0,0 +1,55 @@
+from util.sqliteStore import SQLiteStore
+
+import unittest
+import tempfile
+import os
+import numpy as np
+
+
+class TestSQLiteStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(os.path.join(self.tempDir.name, 'test.sqlite'))
+
+    def tearDown(self):
+        self.store.close()
+        self.tempDir.cleanup()
+
+    def test_ReadsRangeSortedByDate(self):
+        self.store.addEntry('Habits', 'Coffee', '01/03/2021', '09:00', 2)
+        self.store.addEntry('Habits', 'Coffee', '01/01/2021', '08:30', 1)
+        self.store.addEntry('Habits', 'Coffee', '01/05/2021', None, 3)
+        self.store.addEntry('Habits', 'Tea', '01/02/2021', None, 5)
+
+        dates, times, values, _ = self.store.readRange('Habits', 'Coffee', startDate='01/02/2021')
+        np.testing.assert_array_equal(dates, np.array(['2021-01-03', '2021-01-05'], dtype='datetime64[D]'))
+        self.assertEqual(list(times), ['09:00', None])
+        np.testing.assert_array_equal(values, [2, 3])
+        self.assertEqual(len(self.store.readRange('Habits', 'Missing')[0]), 0)
+
+    def test_EditsAndDeletesEntries(self):
+        first = self.store.addEntry('Habits', 'Coffee', '01/01/2021', None, 1)
+        second = self.store.addEntry('Habits', 'Coffee', '01/02/2021', None, 2)
+        self.store.updateEntry(first, value=4)
+        self.store.deleteEntry(second)
+
+        dates, _, values, ids = self.store.readRange('Habits', 'Coffee')
+        np.testing.assert_array_equal(values, [4])
+        self.assertEqual(list(ids), [first])
+
+    def test_ImportsSpreadsheetOnce(self):
+        csvPath = os.path.join(self.tempDir.name, 'Coffee.csv')
+        with open(csvPath, 'w') as f:
+            f.write('Date,Time,Servings\n01/02/2021,10:15,2\n01/01/2021,08:00,1\n')
+
+        self.store.createTrackable('Habits', 'Coffee', csvPath)
+        self.store.createTrackable('Habits', 'Coffee', csvPath)
+        dates, times, values, _ = self.store.readRange('Habits', 'Coffee')
+        np.testing.assert_array_equal(dates, np.array(['2021-01-01', '2021-01-02'], dtype='datetime64[D]'))
+        self.assertEqual(list(times), ['08:00', '10:15'])
+        np.testing.assert_array_equal(values, [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
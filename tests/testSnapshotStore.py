@@ -0,0 +1,49 @@
+from util.snapshotStore import SnapshotStore
+
+import unittest
+import tempfile
+import os
+import json
+import pandas as pd
+
+
+class TestSnapshotStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.snapshotDir = os.path.join(self.tempDir.name, 'snapshots')
+        self.sourcePath = os.path.join(self.tempDir.name, 'oura_2021-01-01T00-00-00.json')
+        entries = [{'summary_date': '2021-01-0{}'.format(i), 'score': 70 + i, 'efficiency': None if i == 2 else 0.5,
+                    'bedtime_start': '2021-01-0{}T23:00:00+02:00'.format(i), 'hr_5min': [50, 51, i]}
+                   for i in range(1, 4)]
+        with open(self.sourcePath, 'w') as f:
+            json.dump({'sleep': entries}, f)
+
+        df = pd.DataFrame(data=entries).rename(columns={'summary_date': 'Date'})
+        df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d')
+        self.df = df.set_index('Date')
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_RoundTrip(self):
+        self.assertIsNone(SnapshotStore.load('sleep', SnapshotStore.makeKey(self.sourcePath), self.snapshotDir))
+        SnapshotStore.save('sleep', SnapshotStore.makeKey(self.sourcePath), self.df, self.snapshotDir)
+        loaded = SnapshotStore.load('sleep', SnapshotStore.makeKey(self.sourcePath), self.snapshotDir)
+
+        self.assertEqual(list(loaded.columns), list(self.df.columns))
+        self.assertTrue((loaded.index == self.df.index).all())
+        pd.testing.assert_series_equal(loaded['score'], self.df['score'], check_index_type=False)
+        pd.testing.assert_series_equal(loaded['efficiency'], self.df['efficiency'], check_index_type=False)
+        self.assertEqual(list(loaded['bedtime_start']), list(self.df['bedtime_start']))
+        self.assertEqual(list(loaded['hr_5min'].iloc[2]), [50, 51, 3])
+
+    def test_ChangedSourceInvalidates(self):
+        SnapshotStore.save('sleep', SnapshotStore.makeKey(self.sourcePath), self.df, self.snapshotDir)
+        with open(self.sourcePath, 'a') as f:
+            f.write(' ')
+        self.assertIsNone(SnapshotStore.load('sleep', SnapshotStore.makeKey(self.sourcePath), self.snapshotDir))
+
+
+if __name__ == '__main__':
+    unittest.main()
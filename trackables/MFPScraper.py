@@ -1,85 +1,147 @@
 import pandas as pd
+import csv
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import myfitnesspal
 
-from util.paths import MFPDataPath as sheetPath
-
-# Get account info
-client = myfitnesspal.Client('totothekitty')
-
-
-# Identifiers for the data I want from MFP
-params = ["Carbohydrates", "Sugar", "Fat",  "Protein", "Calories"]
-
-
-def getMealsFromDate(date):
-    thisDaysNutritionData = client.get_date(
-        date.strftime('%Y'), date.strftime('%m'), date.strftime('%d'))
-    meals = thisDaysNutritionData.meals
-    # Don't include any meals that weren't logged, since these contribute nothing
-    return [m for m in meals if m.totals != {}]
-
-
-# Returns an empty dictionary if the meal is not logged
-def getNutritionFromMeal(meal):
-    # Returns a list of all of the nutritional info gathered from components in the meal
-    nutritionValues = meal.totals
-    return nutritionValues
+from util.paths import MFPDataPath as sheetPath, mfpCacheDir
+
+# Account to scrape
+username = 'totothekitty'
+
+# Identifiers for the data I want from MFP, in the order of the spreadsheet's columns
+params = ['Calories', 'Carbohydrates', 'Fat', 'Protein', 'Sodium', 'Sugar']
+columns = ['Meal', 'Date', 'Time'] + params
+
+# The first day scraped when there's no spreadsheet yet
+defaultStartDate = datetime.strptime('06/03/2020', '%m/%d/%Y').date()
+
+
+# Scrapes every logged meal from MyFitnessPal into the spreadsheet at MFPDataPath.
+# Picks up from the day after the last one already in the spreadsheet and only appends the new rows.  Missing days
+# are fetched concurrently by a bounded pool of workers that share one client (and so one session), retrying with
+# exponential backoff.  The logged meals of each fetched day (their names and totals, not the whole response) are
+# cached on disk so that an interrupted scrape never fetches the same day twice.  Only finished days (before today)
+# are scraped, since rows are never rewritten once appended.
+# The client only needs get_date(year, month, day) returning an object with a list of meals, each having a name and
+# a dict of totals, so a local stand-in can be passed instead of a myfitnesspal.Client
+class MFPScraper:
+
+    def __init__(self, client=None, sheetPath=sheetPath, cacheDir=mfpCacheDir, numWorkers=4, maxRetries=3,
+                 backoffSeconds=1.0):
+        self.client = client
+        self.clientLock = threading.Lock()
+        self.sheetPath = sheetPath
+        self.cacheDir = cacheDir
+        self.numWorkers = numWorkers
+        self.maxRetries = maxRetries
+        self.backoffSeconds = backoffSeconds
+
+    def getClient(self):
+        with self.clientLock:
+            if self.client is None:
+                import myfitnesspal
+                self.client = myfitnesspal.Client(username)
+        return self.client
+
+    # @brief the first day that isn't in the spreadsheet yet
+    def getStartDate(self):
+        try:
+            dates = pd.read_csv(self.sheetPath, usecols=['Date'])['Date']
+        except (FileNotFoundError, ValueError, pd.errors.EmptyDataError):
+            return defaultStartDate
+        dates = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce').dropna()
+        if len(dates) == 0:
+            return defaultStartDate
+        return dates.max().date() + timedelta(days=1)
+
+    def getCachePath(self, date):
+        return os.path.join(self.cacheDir, date.strftime('%Y-%m-%d') + '.json')
+
+    # @brief the day's logged meals as a list of {'name': ..., 'totals': {...}}, from the cache if it was fetched
+    # before
+    def getMealsFromDate(self, date):
+        cachePath = self.getCachePath(date)
+        try:
+            with open(cachePath, 'r') as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            pass
+
+        meals = self.fetchMeals(date)
+        if not os.path.exists(self.cacheDir):
+            os.makedirs(self.cacheDir, exist_ok=True)
+        # Written to a temporary file first so that an interrupted write never leaves a partial day in the cache
+        tempPath = cachePath + '.tmp'
+        with open(tempPath, 'w') as file:
+            json.dump(meals, file)
+        os.replace(tempPath, cachePath)
+        return meals
+
+    def fetchMeals(self, date):
+        for attempt in range(self.maxRetries + 1):
+            try:
+                day = self.getClient().get_date(date.strftime('%Y'), date.strftime('%m'), date.strftime('%d'))
+                # Don't include any meals that weren't logged, since these contribute nothing
+                return [{'name': m.name, 'totals': dict(m.totals)} for m in day.meals if m.totals != {}]
+            except Exception as e:
+                if attempt == self.maxRetries:
+                    raise
+                print('Retrying {} after error: {}'.format(date, e))
+                time.sleep(self.backoffSeconds * 2 ** attempt)
+
+    @staticmethod
+    def getRows(date, meals):
+        # Meal times aren't scraped, so every meal is at midnight as before
+        return [[m['name'], date.strftime('%Y-%m-%d'), '1900-01-01'] +
+                [m['totals'].get(param.lower(), '') for param in params] for m in meals]
+
+    def appendRows(self, rows):
+        writeHeader = not os.path.exists(self.sheetPath) or os.path.getsize(self.sheetPath) == 0
+        with open(self.sheetPath, 'a', newline='') as file:
+            writer = csv.writer(file)
+            if writeHeader:
+                writer.writerow(columns)
+            writer.writerows(rows)
+
+    # @brief scrapes every finished day that isn't in the spreadsheet yet and appends its meals
+    # @param endDate last day to scrape, defaulting to yesterday
+    # @param batchDays days fetched together before their rows are appended, so an interrupted scrape keeps what it has
+    # @return the number of meals appended
+    def updateSheet(self, endDate=None, batchDays=30):
+        if endDate is None:
+            endDate = datetime.now().date() - timedelta(days=1)
+        date = self.getStartDate()
+        if date > endDate:
+            print('My Fitness Pal data is already up to date')
+            return 0
+
+        dates = [date + timedelta(days=i) for i in range((endDate - date).days + 1)]
+        print('Scraping {} days from My Fitness Pal'.format(len(dates)), end='')
+        numMeals = 0
+        with ThreadPoolExecutor(max_workers=self.numWorkers) as executor:
+            # Days are submitted batchDays at a time so that an error stops the scrape without fetching the rest
+            for start in range(0, len(dates), batchDays):
+                window = dates[start:start + batchDays]
+                rows = []
+                try:
+                    # Results come back in date order, so the spreadsheet stays sorted and anything appended is complete
+                    for day, meals in zip(window, executor.map(self.getMealsFromDate, window)):
+                        rows += MFPScraper.getRows(day, meals)
+                        print('.', end='')
+                finally:
+                    # Keep the days fetched before an error
+                    self.appendRows(rows)
+                    numMeals += len(rows)
+        print('Done!')
+        return numMeals
 
 
 def updateSheet():
-
-    # Over which dates are we collecting the data -- pick up where we left off
-    startDateString = "06/03/2020"
-    date = datetime.strptime(startDateString, "%m/%d/%Y").date()
-    today = datetime.now().date()
-    assert(date < today)
-
-    meals = []
-    mealDates = []
-    print('Scraping Data From My Fitness Pal', end='')
-    # Pulls measurements from each day
-    while date <= today:
-        # for param in params:
-        todaysMeals = getMealsFromDate(date)
-        meals += todaysMeals
-        mealDates += [date] * len(todaysMeals)
-        # Increment the day that we're looking at
-        date += timedelta(days=1)
-        print('.', end='')
-
-    # Create the dataframe and add these values to it -- track everything by meal
-    nameList = [m.name for m in meals]
-    calorieList = [getNutritionFromMeal(m)['calories'] for m in meals]
-    fatList = [getNutritionFromMeal(m)['fat'] for m in meals]
-    carbList = [getNutritionFromMeal(m)['carbohydrates'] for m in meals]
-    proteinList = [getNutritionFromMeal(m)['protein'] for m in meals]
-    sodiumList = [getNutritionFromMeal(m)['sodium'] for m in meals]
-    sugarList = [getNutritionFromMeal(m)['sugar'] for m in meals]
-    timeList = [datetime.strptime('00:00', '%H:%M')] * len(nameList)
-
-    data = {
-        'Meal': nameList,
-        'Date': mealDates,
-        'Time': timeList,
-        'Calories': calorieList,
-        'Carbohydrates': carbList,
-        'Fat': fatList,
-        'Protein': proteinList,
-        'Sodium': sodiumList,
-        'Sugar': sugarList
-    }
-
-    print('Done!')
-    df = pd.DataFrame(data=data, columns=list(data.keys()))
-
-    try:
-        os.remove(sheetPath)
-    except FileNotFoundError:
-        pass
-    finally:
-        df.to_csv(sheetPath, index=None)
+    return MFPScraper().updateSheet()
 
 
 if __name__ == '__main__':
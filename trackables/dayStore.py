@@ -0,0 +1,264 @@
+import numpy as np
+import pandas as pd
+
+from stats.duplicateReduction import DuplicateReduction
+
+
+# Compact columnar storage holding at most one value per day.
+# Days are stored as an int32 offset from the epoch (01/01/1970) plus a contiguous value array covering
+# every day between the first and last measurement, and a bitmap marking which of those days were measured.
+# Looking up a date is index arithmetic (day - startDay) rather than a label lookup in a DatetimeIndex.
+# Times are stored as seconds since the epoch so that they can share the same float representation.
+# The arrays are over-allocated so that appending new days is amortized O(1)
+class DayStore:
+
+    def __init__(self, dates=None, values=None, dtype=np.float64, isTime=False):
+        # Times need full float64 precision to represent seconds
+        self.dtype = np.float64 if isTime else dtype
+        self.isTime = isTime
+        self.startDay = np.int32(0)
+        self.length = 0
+        self.values = np.empty(0, dtype=self.dtype)
+        self.validBits = np.empty(0, dtype=np.uint8)
+        # Number of values averaged into each day that has had entries added to it, used to keep means exact
+        self.entryCounts = {}
+
+        if dates is not None and len(dates) > 0:
+            self.setData(dates, values)
+
+    @staticmethod
+    def toDays(dates):
+        return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+    @staticmethod
+    def daysToDates(days):
+        return np.asarray(days, dtype=np.int64).astype('datetime64[D]').astype('datetime64[ns]')
+
+    # ======================= Conversion between stored floats and scores ====================
+
+    # @brief converts scores (numbers or timestamps) into the floats that are stored
+    def encode(self, values):
+        if self.isTime:
+            timestamps = pd.to_datetime(pd.Series(values)).to_numpy().astype('datetime64[s]')
+            seconds = timestamps.astype(np.int64).astype(np.float64)
+            seconds[np.isnat(timestamps)] = np.nan
+            return seconds
+        return np.asarray(values, dtype=np.float64)
+
+    # @brief converts stored floats back into scores, returning datetime64 values for times
+    def decode(self, values):
+        if self.isTime:
+            return pd.to_datetime(values, unit='s').to_numpy().astype('datetime64[ns]')
+        return values
+
+    # ================================ Building the store =================================
+
+    # @brief replaces the contents of the store
+    # @param dates must be unique -- duplicates should be combined before storing
+    def setData(self, dates, values):
+        days = DayStore.toDays(dates)
+        encoded = self.encode(values)
+        self.entryCounts = {}
+        if len(days) == 0:
+            self.startDay = np.int32(0)
+            self.length = 0
+            self.values = np.empty(0, dtype=self.dtype)
+            self.validBits = np.empty(0, dtype=np.uint8)
+            return
+        if not np.all(np.isfinite(encoded)):
+            keep = ~np.isnan(encoded)
+            days, encoded = days[keep], encoded[keep]
+            if len(days) == 0:
+                self.setData([], [])
+                return
+
+        self.startDay = np.int32(days.min())
+        self.length = int(days.max() - self.startDay + 1)
+        idxs = days - self.startDay
+
+        self.values = np.full(self.length, np.nan, dtype=self.dtype)
+        self.values[idxs] = encoded
+        valid = np.zeros(self.length, dtype=bool)
+        valid[idxs] = ~np.isnan(encoded)
+        self.setValidMask(valid)
+
+    def setValidMask(self, valid):
+        self.validBits = np.packbits(valid, bitorder='little')
+
+    # @brief grows the buffers geometrically so that they can hold at least size days
+    def reserve(self, size):
+        capacity = len(self.values)
+        if size <= capacity:
+            return
+        newCapacity = max(size, 2 * capacity)
+        values = np.full(newCapacity, np.nan, dtype=self.dtype)
+        values[:self.length] = self.values[:self.length]
+        validBits = np.zeros((newCapacity + 7) // 8, dtype=np.uint8)
+        validBits[:len(self.validBits)] = self.validBits
+        self.values = values
+        self.validBits = validBits
+
+    # ==================================== Lookups ======================================
+
+    def isEmpty(self):
+        return self.length == 0
+
+    def getStartDay(self):
+        return int(self.startDay)
+
+    def getEndDay(self):
+        return int(self.startDay) + self.length - 1
+
+    def getStartDate(self):
+        return pd.Timestamp(DayStore.daysToDates([self.getStartDay()])[0])
+
+    def getEndDate(self):
+        return pd.Timestamp(DayStore.daysToDates([self.getEndDay()])[0])
+
+    # @brief returns whether each day in the half-open index range [lo, hi) was measured
+    def getValidMask(self, lo=0, hi=None):
+        hi = self.length if hi is None else hi
+        if hi <= lo:
+            return np.zeros(0, dtype=bool)
+        # Only unpack the bytes covering the requested range
+        firstByte = lo // 8
+        lastByte = (hi + 7) // 8
+        bits = np.unpackbits(self.validBits[firstByte:lastByte], bitorder='little').astype(bool)
+        return bits[lo - 8 * firstByte:hi - 8 * firstByte]
+
+    # @brief returns the stored values and validity for every day between startDay and endDay inclusive
+    # Days outside of the stored range are returned as NaN and invalid
+    def getDayRange(self, startDay, endDay):
+        numDays = max(0, endDay - startDay + 1)
+        values = np.full(numDays, np.nan, dtype=np.float64)
+        valid = np.zeros(numDays, dtype=bool)
+
+        lo = max(startDay - self.getStartDay(), 0)
+        hi = min(endDay - self.getStartDay() + 1, self.length)
+        if hi > lo:
+            outLo = lo + self.getStartDay() - startDay
+            outHi = outLo + hi - lo
+            values[outLo:outHi] = self.values[lo:hi]
+            valid[outLo:outHi] = self.getValidMask(lo, hi)
+        values[~valid] = np.nan
+        return values, valid
+
+    # @brief number of measured days between startDay and endDay inclusive
+    def countValid(self, startDay, endDay):
+        lo = max(startDay - self.getStartDay(), 0)
+        hi = min(endDay - self.getStartDay() + 1, self.length)
+        return int(np.count_nonzero(self.getValidMask(lo, hi)))
+
+    # @brief day numbers of every measured day
+    def getValidDays(self):
+        return np.flatnonzero(self.getValidMask()) + self.getStartDay()
+
+    def getValidDates(self):
+        return pd.DatetimeIndex(DayStore.daysToDates(self.getValidDays()))
+
+    # @brief stored floats for every measured day
+    def getValidValues(self):
+        return self.values[:self.length][self.getValidMask()].astype(np.float64)
+
+    def isValid(self, day):
+        idx = day - self.getStartDay()
+        if idx < 0 or idx >= self.length:
+            return False
+        return bool(self.validBits[idx >> 3] & (1 << (idx & 7)))
+
+    # @brief the last measured day strictly before the given day, or None if there isn't one
+    # Searches backwards a block at a time so that the cost depends on the size of the gap, not the history
+    def getValidDayBefore(self, day, blockSize=256):
+        hi = min(day - self.getStartDay(), self.length)
+        while hi > 0:
+            lo = max(hi - blockSize, 0)
+            validIdxs = np.flatnonzero(self.getValidMask(lo, hi))
+            if len(validIdxs) > 0:
+                return lo + int(validIdxs[-1]) + self.getStartDay()
+            hi = lo
+        return None
+
+    # @brief the first measured day strictly after the given day, or None if there isn't one
+    def getValidDayAfter(self, day, blockSize=256):
+        lo = max(day - self.getStartDay() + 1, 0)
+        while lo < self.length:
+            hi = min(lo + blockSize, self.length)
+            validIdxs = np.flatnonzero(self.getValidMask(lo, hi))
+            if len(validIdxs) > 0:
+                return lo + int(validIdxs[0]) + self.getStartDay()
+            lo = hi
+        return None
+
+    # @brief the value of the last measured day strictly before the given day, or NaN if there isn't one
+    def getValueBefore(self, day):
+        validDay = self.getValidDayBefore(day)
+        return self.values[validDay - self.getStartDay()] if validDay is not None else np.nan
+
+    # @brief the value of the first measured day strictly after the given day, or NaN if there isn't one
+    def getValueAfter(self, day):
+        validDay = self.getValidDayAfter(day)
+        return self.values[validDay - self.getStartDay()] if validDay is not None else np.nan
+
+    # @brief memory used by the stored arrays in bytes
+    def nbytes(self):
+        return self.values.nbytes + self.validBits.nbytes
+
+    # ==================================== Updates ======================================
+
+    # @brief adds a value for a single day, combining it with an existing measurement using reduction
+    # Days on or after the start only touch the end of the buffers, so this is amortized O(1).
+    # Days before the first measurement require the whole store to be shifted
+    # @return the day number that was updated
+    def addValue(self, date, value, reduction=DuplicateReduction.SUM):
+        day = int(DayStore.toDays([date])[0])
+        encoded = self.encode([value])[0]
+        if np.isnan(encoded):
+            return day
+        if self.isEmpty():
+            self.setData([date], [value])
+            return day
+
+        if day < self.getStartDay():
+            values, valid = self.getDayRange(day, self.getEndDay())
+            self.startDay = np.int32(day)
+            self.length = len(values)
+            self.values = values.astype(self.dtype)
+            self.setValidMask(valid)
+        elif day > self.getEndDay():
+            newLength = day - self.getStartDay() + 1
+            self.reserve(newLength)
+            self.values[self.length:newLength] = np.nan
+            self.length = newLength
+
+        idx = day - self.getStartDay()
+        if self.isValid(day):
+            self.values[idx] = self.combine(day, self.values[idx], encoded, reduction)
+        else:
+            self.values[idx] = encoded
+            self.validBits[idx >> 3] |= np.uint8(1 << (idx & 7))
+        return day
+
+    # @brief combines a new value with the value already stored for the day
+    def combine(self, day, existing, new, reduction):
+        if reduction == DuplicateReduction.SUM:
+            return existing + new
+        elif reduction == DuplicateReduction.MEAN:
+            # Days stored by setData are counted as a single value
+            count = self.entryCounts.get(day, 1)
+            self.entryCounts[day] = count + 1
+            return existing + (new - existing) / (count + 1)
+        elif reduction == DuplicateReduction.MAX:
+            return max(existing, new)
+        elif reduction == DuplicateReduction.FIRST:
+            return existing
+        elif reduction == DuplicateReduction.LAST:
+            return new
+        raise ValueError('Cannot combine values with unsupported reduction {}'.format(reduction))
+
+    # ===================================== Export ======================================
+
+    # @brief produces a DataFrame with a 'Score' column for each measured day
+    # Only intended for export and compatibility -- analysis should work with the arrays directly
+    def toFrame(self):
+        dates = self.getValidDates()
+        return pd.DataFrame(data={'Score': self.decode(self.getValidValues())}, index=dates)
@@ -0,0 +1,77 @@
+from collections import OrderedDict
+import threading
+
+
+# Least-recently-used cache of a trackable's processed series.
+# Entries are keyed by everything that determines the processed data -- frequency, grouping method,
+# fill strategy, the requested date range and the version of the raw data -- so switching back to a
+# previous selection reuses the stored arrays instead of filling and resampling again.
+# Entries are evicted oldest first once the arrays stored exceed maxBytes.
+# The cache is shared with the copies analysed on a background thread, so it's guarded by a lock
+class ProcessedCache:
+
+    def __init__(self, maxBytes=8 * 2**20):
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.currentBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    # @brief builds the key identifying a processed series
+    # @param dateRange the dates that were filled, or None when only the measured dates are used
+    @staticmethod
+    def makeKey(frequency, grouping, fillStrategy, dateRange, rawVersion):
+        if dateRange is None or len(dateRange) == 0:
+            start, end = None, None
+        else:
+            start, end = dateRange[0], dateRange[-1]
+        return (frequency, grouping, fillStrategy, start, end, rawVersion)
+
+    # @brief returns the stored (dates, scores) for the key, or None if they aren't cached
+    # The returned arrays are shared with the cache and must not be modified in place
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, dates, scores):
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            size = dates.nbytes + scores.nbytes
+            # Don't let a single series larger than the budget flush everything else out
+            if size > self.maxBytes:
+                return
+            self.entries[key] = (dates, scores)
+            self.currentBytes += size
+            while self.currentBytes > self.maxBytes:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        with self.lock:
+            dates, scores = self.entries.pop(key)
+            self.currentBytes -= dates.nbytes + scores.nbytes
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.currentBytes = 0
+
+    def setMaxBytes(self, maxBytes):
+        with self.lock:
+            self.maxBytes = maxBytes
+            while self.currentBytes > self.maxBytes and self.entries:
+                self.remove(next(iter(self.entries)))
+
+    def getHitRate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def __len__(self):
+        return len(self.entries)
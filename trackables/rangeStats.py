@@ -0,0 +1,116 @@
+import numpy as np
+
+
+# Cumulative sums over a trackable's day index so that the sum, mean, standard deviation and count over
+# any range of dates are answered with a couple of array lookups instead of re-slicing the data.
+# Arrays have a leading 0 so that the total over positions [lo, hi) is cum[hi] - cum[lo]
+class RangeStats:
+
+    def __init__(self, dates, scores):
+        days = RangeStats.toDays(dates)
+        scores = np.asarray(scores, dtype=np.float64)
+
+        # Values are stored relative to the first measurement so the sum of squares doesn't lose precision
+        finite = scores[~np.isnan(scores)]
+        self.offset = finite[0] if len(finite) > 0 else 0.0
+
+        self.size = 0
+        self.days = np.empty(0, dtype=np.int64)
+        self.cumSum = np.zeros(1)
+        self.cumSumSq = np.zeros(1)
+        self.cumCount = np.zeros(1, dtype=np.int64)
+        self.isContiguous = True
+        self.extend(days, scores)
+
+    @staticmethod
+    def toDays(dates):
+        return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+    # @brief appends the given dates and scores to the end of the index
+    # Any existing entries on or after the first new date are replaced, so a value that was combined into the
+    # last day can be re-appended.  This only touches the new entries rather than the whole history
+    def extend(self, dates, scores):
+        days = RangeStats.toDays(dates)
+        scores = np.asarray(scores, dtype=np.float64)
+        if len(days) == 0:
+            return
+        self.truncate(days[0])
+
+        isNaN = np.isnan(scores)
+        centered = np.where(isNaN, 0, scores - self.offset)
+        newSize = self.size + len(days)
+        self.reserve(newSize)
+
+        self.days[self.size:newSize] = days
+        self.cumSum[self.size + 1:newSize + 1] = self.cumSum[self.size] + np.cumsum(centered)
+        self.cumSumSq[self.size + 1:newSize + 1] = self.cumSumSq[self.size] + np.cumsum(centered ** 2)
+        self.cumCount[self.size + 1:newSize + 1] = self.cumCount[self.size] + np.cumsum(~isNaN)
+        self.size = newSize
+
+        # When there is one entry per day, a date's position can be found with arithmetic alone
+        self.isContiguous = self.days[self.size - 1] - self.days[0] == self.size - 1
+
+    # @brief drops every entry on or after the given day number
+    def truncate(self, day):
+        self.size = int(np.searchsorted(self.days[:self.size], day, side='left'))
+        self.isContiguous = self.size == 0 or self.days[self.size - 1] - self.days[0] == self.size - 1
+
+    # @brief grows the underlying buffers geometrically so repeated appends are amortized O(1)
+    def reserve(self, size):
+        capacity = len(self.days)
+        if size <= capacity:
+            return
+        newCapacity = max(size, 2 * capacity)
+
+        def grow(arr, length):
+            newArr = np.zeros(length, dtype=arr.dtype)
+            newArr[:len(arr)] = arr
+            return newArr
+
+        self.days = grow(self.days, newCapacity)
+        self.cumSum = grow(self.cumSum, newCapacity + 1)
+        self.cumSumSq = grow(self.cumSumSq, newCapacity + 1)
+        self.cumCount = grow(self.cumCount, newCapacity + 1)
+
+    # @brief converts an inclusive date range to the half-open range of positions [lo, hi) it covers
+    def getPositionRange(self, startDate, endDate):
+        startDay, endDay = RangeStats.toDays([startDate, endDate])
+        if self.size == 0:
+            return 0, 0
+        if self.isContiguous:
+            firstDay = self.days[0]
+            lo = int(np.clip(startDay - firstDay, 0, self.size))
+            hi = int(np.clip(endDay - firstDay + 1, 0, self.size))
+        else:
+            lo = int(np.searchsorted(self.days[:self.size], startDay, side='left'))
+            hi = int(np.searchsorted(self.days[:self.size], endDay, side='right'))
+        return lo, max(lo, hi)
+
+    # @brief number of non-NaN entries between startDate and endDate inclusive
+    def getCount(self, startDate, endDate):
+        lo, hi = self.getPositionRange(startDate, endDate)
+        return int(self.cumCount[hi] - self.cumCount[lo])
+
+    # @brief the sum, mean and standard deviation skip NaN entries (days that weren't filled), matching np.sum,
+    # np.mean and np.std over a pandas Series of the same data
+    def getSum(self, startDate, endDate):
+        lo, hi = self.getPositionRange(startDate, endDate)
+        count = self.cumCount[hi] - self.cumCount[lo]
+        return (self.cumSum[hi] - self.cumSum[lo]) + self.offset * count
+
+    def getMean(self, startDate, endDate):
+        lo, hi = self.getPositionRange(startDate, endDate)
+        count = self.cumCount[hi] - self.cumCount[lo]
+        if count == 0:
+            return np.nan
+        return (self.cumSum[hi] - self.cumSum[lo]) / count + self.offset
+
+    # Population standard deviation, like np.std
+    def getStdev(self, startDate, endDate):
+        lo, hi = self.getPositionRange(startDate, endDate)
+        count = self.cumCount[hi] - self.cumCount[lo]
+        if count == 0:
+            return np.nan
+        mean = (self.cumSum[hi] - self.cumSum[lo]) / count
+        variance = (self.cumSumSq[hi] - self.cumSumSq[lo]) / count - mean ** 2
+        return np.sqrt(max(variance, 0.0))
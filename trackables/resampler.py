@@ -0,0 +1,123 @@
+from stats.frequency import Frequency, GroupingMethod
+from stats.duplicateReduction import DuplicateReduction
+
+import numpy as np
+import pandas as pd
+
+
+# Groups daily measurements into calendar-anchored buckets: weeks starting on Monday (W-MON),
+# months starting on the 1st (MS) and years starting on January 1st.
+# Every date is labelled with an integer bucket id so that all of the buckets can be reduced together
+# in a single bincount pass instead of slicing each week or month out of a DataFrame
+class Resampler:
+
+    # @brief returns the first day of the bucket that each date falls into as datetime64[D] values
+    @staticmethod
+    def getBucketStarts(dates, frequency):
+        days = np.asarray(dates, dtype='datetime64[D]')
+        if frequency == Frequency.DAILY:
+            return days
+        elif frequency == Frequency.WEEKLY:
+            # 01/01/1970 was a Thursday, so offset by 3 days to count the days past Monday
+            daysPastMonday = (days.astype(np.int64) + 3) % 7
+            return days - daysPastMonday.astype('timedelta64[D]')
+        elif frequency == Frequency.MONTHLY:
+            return days.astype('datetime64[M]').astype('datetime64[D]')
+        elif frequency == Frequency.YEARLY:
+            return days.astype('datetime64[Y]').astype('datetime64[D]')
+        raise ValueError('Cannot resample data with unsupported frequency {}'.format(frequency))
+
+    # @brief labels each date with the index of the bucket that it falls into
+    # @return tuple of (sorted start date of each bucket, bucket id for each date)
+    @staticmethod
+    def getBucketIds(dates, frequency):
+        starts = Resampler.getBucketStarts(dates, frequency)
+        bucketStarts, bucketIds = np.unique(starts, return_inverse=True)
+        return bucketStarts, bucketIds.reshape(-1)
+
+    # @brief reduces every bucket at once
+    # @return tuple of (sum of each bucket, mean of each bucket, whether each bucket contains a NaN)
+    # Sums and means are NaN for any bucket that contains a NaN so that missing data isn't treated as 0
+    @staticmethod
+    def aggregate(bucketIds, scores, numBuckets):
+        scores = np.asarray(scores, dtype=np.float64)
+        isNan = np.isnan(scores)
+        sums = np.bincount(bucketIds, weights=np.where(isNan, 0, scores), minlength=numBuckets)
+        counts = np.bincount(bucketIds, minlength=numBuckets)
+        nanMask = np.bincount(bucketIds, weights=isNan, minlength=numBuckets) > 0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        sums[nanMask] = np.nan
+        means[nanMask] = np.nan
+        return sums, means, nanMask
+
+    # @brief splits values into a list containing one array per bucket, ordered by bucket id
+    # Used for data like times that can't be reduced with arithmetic
+    @staticmethod
+    def splitByBucket(bucketIds, values):
+        order = np.argsort(bucketIds, kind='stable')
+        splitIdxs = np.flatnonzero(np.diff(bucketIds[order])) + 1
+        return np.split(np.asarray(values)[order], splitIdxs)
+
+    # @brief groups the scores measured on each date by frequency, combining each bucket with the grouping method
+    # Each bucket is labelled by its anchored start date, even if the measurements begin part way through it.
+    # Only the days with measurements contribute to a bucket, which is equivalent to padding the first bucket
+    # with its own mean (when averaging) or with zeros (when summing)
+    # @return tuple of (DatetimeIndex of bucket start dates, grouped scores)
+    @staticmethod
+    def resample(dates, scores, frequency, grouping=GroupingMethod.AVERAGE):
+        bucketStarts, bucketIds = Resampler.getBucketIds(dates, frequency)
+        sums, means, _ = Resampler.aggregate(bucketIds, scores, len(bucketStarts))
+        values = means if grouping == GroupingMethod.AVERAGE else sums
+        return pd.DatetimeIndex(bucketStarts.astype('datetime64[ns]')), values
+
+    # @brief collapses every group of rows with the same date into one with a single sorted pass
+    # Times (datetime64 values) are reduced as integer nanoseconds so that they can be averaged too
+    # @return tuple of (sorted unique dates as datetime64[ns], reduced values, index of the first row of each date)
+    @staticmethod
+    def combineDuplicates(dates, values, reduction=DuplicateReduction.SUM):
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        values = np.asarray(values)
+        order = np.argsort(dates, kind='stable')
+        dates, values = dates[order], values[order]
+
+        groupStarts = np.flatnonzero(np.concatenate([[True], dates[1:] != dates[:-1]])) if len(dates) > 0 \
+            else np.empty(0, dtype=np.int64)
+        uniqueDates = dates[groupStarts]
+        if len(groupStarts) == len(dates):
+            return uniqueDates, values, order
+
+        isTime = np.issubdtype(values.dtype, np.datetime64)
+        numbers = values.astype('datetime64[ns]').astype(np.int64).astype(np.float64) if isTime \
+            else values.astype(np.float64)
+
+        if reduction == DuplicateReduction.SUM:
+            combined = np.add.reduceat(numbers, groupStarts)
+        elif reduction == DuplicateReduction.MEAN:
+            counts = np.diff(np.append(groupStarts, len(numbers)))
+            combined = np.add.reduceat(numbers, groupStarts) / counts
+        elif reduction == DuplicateReduction.MAX:
+            combined = np.maximum.reduceat(numbers, groupStarts)
+        elif reduction == DuplicateReduction.FIRST:
+            combined = numbers[groupStarts]
+        elif reduction == DuplicateReduction.LAST:
+            combined = numbers[np.append(groupStarts[1:], len(numbers)) - 1]
+        else:
+            raise ValueError('Cannot combine duplicate dates with unsupported reduction {}'.format(reduction))
+
+        if isTime:
+            combined = np.round(combined).astype(np.int64).astype('datetime64[ns]')
+        return uniqueDates, combined, order[groupStarts]
+
+    # @brief returns a copy of df (indexed by date) with one row per date, combining the 'Score' column using reduction
+    # Any other columns keep the value from the first row of each date
+    @staticmethod
+    def combineDuplicateRows(df, reduction=DuplicateReduction.SUM):
+        if not df.index.has_duplicates:
+            return df
+        uniqueDates, combined, firstRows = Resampler.combineDuplicates(df.index, df['Score'].to_numpy(), reduction)
+        combinedDf = df.iloc[firstRows].copy()
+        combinedDf.index = pd.DatetimeIndex(uniqueDates, name=df.index.name)
+        combinedDf['Score'] = combined
+        return combinedDf
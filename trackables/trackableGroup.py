@@ -1,4 +1,3 @@
-from trackables.trackables.trackable import Trackable
 import numpy as np
 import pandas as pd
 
@@ -21,10 +20,9 @@ class TrackableGroup:
         self.lastFillStrats = None
 
     # @brief This is the meat and potatoes function where a trackable with correct properties is computed for analysis
+    # Each trackable caches its own processed series, so switching between previous selections is cheap
+    # even when useCache is False
     def updateCalculation(self, freq, groupMethods, fillStrats, dateRange, useCache=False):
-        if len(self.getTrackables()) > 1:
-            Trackable.alignDatesTrimming(self.getTrackables())
-
         sameDates = self.lastDateRange is not None and len(self.lastDateRange) == len(dateRange) and np.all(self.lastDateRange == dateRange)
         if useCache and sameDates and freq == self.frequency and groupMethods == self.grouping and fillStrats == self.lastFillStrats:
             return
@@ -49,6 +47,26 @@ class TrackableGroup:
 
             t.updateCalculation(freq, group, strat, dateRange)
 
+    # @brief returns a group of copies of these trackables that can be recalculated on another thread,
+    # so that a newer request never has to wait for an older one to stop
+    def copyForAnalysis(self):
+        independentT = self.independentT.copyForAnalysis() if self.independentT is not None else None
+        working = TrackableGroup(self.dependentT.copyForAnalysis(), independentT)
+        working.frequency = self.frequency
+        working.grouping = self.grouping
+        working.lastDateRange = self.lastDateRange
+        working.lastFillStrats = self.lastFillStrats
+        return working
+
+    # @brief takes the calculation done by a group made with copyForAnalysis
+    def adoptCalculation(self, working):
+        for t, workingT in zip(self.getTrackables(), working.getTrackables()):
+            t.adoptCalculation(workingT)
+        self.frequency = working.frequency
+        self.grouping = working.grouping
+        self.lastDateRange = working.lastDateRange
+        self.lastFillStrats = working.lastFillStrats
+
     # Returns all of the associated trackables without preference for order
     def getTrackables(self):
         if self.independentT is None:
@@ -62,6 +80,6 @@ class TrackableGroup:
 
     # If there is more than 1 trackable in this group, returns the date range that corresponds to their overlap
     def getBoundsForDateRange(self):
-        lowDate = max([t.rawData.index[0] for t in self.getTrackables()])
-        highDate = min([t.rawData.index[-1] for t in self.getTrackables()])
+        lowDate = max([t.getStartDate() for t in self.getTrackables()])
+        highDate = min([t.getEndDate() for t in self.getTrackables()])
         return pd.date_range(start=lowDate, end=highDate)
@@ -1,9 +1,15 @@
 from trackables.trackables.trackables import UserBinaryTrackable, UserContinuousTrackable
 from trackables.variableCategories.trackType import TrackType
 from trackables.trackables.ouraData import Oura
-from trackables.trackables.trackableFactories import OuraFactory, HabitFactory
+from trackables.trackables.trackableFactories import OuraFactory, HabitFactory, AppleHealthFactory, CSVFactory
 from trackables.trackables.myFitnessMeals import MFPManager
-import util.settings as set
+from trackables.trackableSource import TrackableSource
+from util.paths import habitDataPath, appleHealthExportPath
+import util.settings as settingsModule
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
 
 
 class TrackableManager:
@@ -20,53 +26,115 @@ class TrackableManager:
     class __TrackableManager:
 
         def __init__(self):
+            # Each integration and panel is registered as a source whose trackables are only loaded on first access,
+            # so that startup doesn't pay for integrations that aren't opened
+            self.sources = {}
 
             # Deal with the optional integrations first
-            self.trackables = []
-            if 'Oura Ring' in set.settings.integrations:
-                self.ouraTrackables = OuraFactory.getAllTrackables()
-                self.trackables += self.ouraTrackables
-            if 'MyFitnessPal' in set.settings.integrations:
-                self.MFPManager = MFPManager()
-                self.MFPTrackables = self.MFPManager.getTrackables()
-                self.trackables += self.MFPTrackables
-            if 'HabitBull' in set.settings.integrations:
-                self.habitTrackables = HabitFactory.loadAllHabits()
-                self.trackables += self.habitTrackables
+            if 'Oura Ring' in settingsModule.settings.integrations:
+                self.sources['Oura'] = TrackableSource(
+                    'Oura', OuraFactory.getAllTrackables, lambda: Oura.instance().ouraJSONExists())
+            if 'MyFitnessPal' in settingsModule.settings.integrations:
+                self.sources['MyFitnessPal'] = TrackableSource('MyFitnessPal', self.loadMFPTrackables)
+            if 'HabitBull' in settingsModule.settings.integrations:
+                self.sources['HabitBull'] = TrackableSource(
+                    'HabitBull', HabitFactory.loadAllHabits, lambda: os.path.exists(habitDataPath))
+            if 'Apple Health' in settingsModule.settings.integrations:
+                self.sources['Apple Health'] = TrackableSource(
+                    'Apple Health', AppleHealthFactory.loadAllTrackables, lambda: os.path.exists(appleHealthExportPath))
+            # Exports configured in the settings are read by the generic CSV importer
+            for spec in settingsModule.settings.csvImports:
+                self.sources[spec.name] = TrackableSource(
+                    spec.name, lambda spec=spec: CSVFactory.loadAllTrackables(spec),
+                    lambda spec=spec: os.path.exists(spec.getPath()))
+            # Sources read from files rather than logged with the panels
+            self.integrationNames = set(self.sources)
 
             # Adds trackables from the user-logged panels
-            for panel in [x[1] for x in set.settings.categoryData]:
-                panelTrackables = panel.getTrackables()
-                self.trackables += panelTrackables
-
-            # Dictionary associating each panel's name with its corresponding trackables
-            self.loggedTrackableDict = {p.panelName: p.getTrackables()
-                                        for p in [x[1] for x in set.settings.categoryData]}
+            for panel in [x[1] for x in settingsModule.settings.categoryData]:
+                self.sources[panel.panelName] = TrackableSource(panel.panelName, panel.getTrackables)
 
             # Look through each of the panel contained in the settings file for the trackable methods
-            self.trackNameDict = {t.name: t for t in self.trackables}
+            # Filled in as each source is loaded
+            self.trackNameDict = {}
+            self.registeredSources = set()
+
+        def loadMFPTrackables(self):
+            self.MFPManager = MFPManager()
+            return self.MFPManager.getTrackables()
+
+        # @brief the trackables of the given source, loading them if they haven't been already
+        # Waits for the source if it's being loaded in the background
+        def getSourceTrackables(self, source):
+            trackables = source.getTrackables()
+            if source.name not in self.registeredSources:
+                self.registeredSources.add(source.name)
+                for t in trackables:
+                    self.trackNameDict[t.name] = t
+            return trackables
+
+        # @brief starts loading every integration that hasn't been loaded on a pool of threads and returns straight away
+        # Reading the files and parsing them with pandas releases the GIL for much of the work, so the integrations
+        # load concurrently while the UI is being built.  Anything asking for a source's trackables waits for its load,
+        # and the time taken by each source is printed as it finishes.
+        # The panels' sources are left to load on first use, since their trackables come from the panels' widgets
+        # which belong to the GUI thread
+        def preloadSources(self, numWorkers=None):
+            unloaded = [s for s in self.sources.values() if s.name in self.integrationNames and not s.isLoaded()]
+            if len(unloaded) == 0:
+                return
+            start = time.perf_counter()
+
+            def report(source, future):
+                if future.exception() is not None:
+                    print('Loading {} failed: {}'.format(source.name, future.exception()))
+                else:
+                    print('Loaded {} trackables from {} in {:.2f}s ({:.2f}s since startup)'.format(
+                        len(source.trackables), source.name, source.loadSeconds, time.perf_counter() - start))
+
+            pool = ThreadPoolExecutor(max_workers=numWorkers if numWorkers else len(unloaded),
+                                      thread_name_prefix='TrackableLoader')
+            for source in unloaded:
+                pool.submit(source.getTrackables).add_done_callback(
+                    lambda future, source=source: report(source, future))
+            # Let the loads finish in the background
+            pool.shutdown(wait=False)
+
+        # Every trackable from all of the sources, ordered by source
+        @property
+        def trackables(self):
+            return self.getAllTrackables()
 
         def addTrackableToPanel(self, category, trackableName, trackType):
             if trackType == TrackType.BINARY:
                 newTrackable = UserBinaryTrackable(trackableName)
             else:
                 newTrackable = UserContinuousTrackable(trackableName)
-            self.trackables.append(newTrackable)
+            # keep the panel's source in sync with settings.categoryData
+            self.getSourceTrackables(self.sources[category]).append(newTrackable)
             self.trackNameDict[newTrackable.name] = newTrackable
-            # keep self.loggedTrackableDict in sync with settings.categoryData
-            self.loggedTrackableDict[category].append(newTrackable)
 
         def removeTrackableFromPanel(self, category, trackableName):
+            if category in self.sources.keys():
+                self.getSourceTrackables(self.sources[category])
             if trackableName in self.trackNameDict.keys():
-                trackToRemove = self.trackNameDict[trackableName]
-                self.trackables.remove(trackToRemove)
-                self.trackNameDict.pop(trackableName)
-                if category in self.loggedTrackableDict.keys() and trackToRemove in self.loggedTrackableDict[category]:
-                    # keep self.loggedTrackableDict in sync with settings.categoryData
-                    self.loggedTrackableDict[category].remove(trackToRemove)
+                trackToRemove = self.trackNameDict.pop(trackableName)
+                for source in self.sources.values():
+                    if source.isLoaded() and trackToRemove in source.trackables:
+                        # keep the panel's source in sync with settings.categoryData
+                        source.trackables.remove(trackToRemove)
 
         # Searching the name dict field for the trackable with the given name
+        # Sources that haven't been loaded yet are loaded one at a time until it's found
         def getTrackableFromName(self, name):
+            if name not in self.trackNameDict:
+                # Logged panels are the quickest to load and are looked up the most
+                unloaded = [s for s in self.sources.values() if s.name not in self.registeredSources]
+                unloaded.sort(key=lambda s: s.name in self.integrationNames)
+                for source in unloaded:
+                    self.getSourceTrackables(source)
+                    if name in self.trackNameDict:
+                        break
             try:
                 return self.trackNameDict[name]
             except KeyError:
@@ -81,20 +149,19 @@ class TrackableManager:
                 ouraCategory, name))
 
         def getTrackablesOfCategory(self, category):
-            if category == 'HabitBull':
-                return self.habitTrackables
-            elif category == 'MyFitnessPal':
-                return self.MFPTrackables
-            elif category == 'Oura':
-                return self.ouraTrackables
-            else:
-                return self.loggedTrackableDict[category]
+            return self.getSourceTrackables(self.sources[category])
 
         def getOuraTrackablesOfCategory(self, ouraCategory):
+            # Oura only creates its trackables once, so wait for them if they're being loaded in the background
+            if 'Oura' in self.sources:
+                self.getSourceTrackables(self.sources['Oura'])
             return Oura.instance().getTrackablesOfCategory(ouraCategory)
 
         def getAllTrackables(self):
-            return self.trackables
+            allTrackables = []
+            for source in self.sources.values():
+                allTrackables += self.getSourceTrackables(source)
+            return allTrackables
 
         # Wrappers over previous getters that filter unanalyzable trackables for use in analysis
         def getAnalyzableTrackablesOfCategory(self, category):
@@ -104,21 +171,29 @@ class TrackableManager:
             return list(filter(lambda t: t.isAnalyzable(), self.getOuraTrackablesOfCategory(ouraCategory)))
 
         def getAllAnalyzableTrackables(self):
-            return list(filter(lambda t: t.isAnalyzable(), self.trackables))
+            return list(filter(lambda t: t.isAnalyzable(), self.getAllTrackables()))
 
         def getOuraCategories(self):
             return ['readiness', 'sleep', 'activity']
 
         def getCategories(self):
-            allCats = set.settings.categoryNames
+            allCats = settingsModule.settings.categoryNames
             if 'Oura Ring' in allCats and not self.foundOuraData():
                 allCats.remove('Oura Ring')
             if 'HabitBull' in allCats and not self.foundHabitData():
                 allCats.remove('HabitBull')
+            if 'Apple Health' in allCats and not self.foundAppleHealthData():
+                allCats.remove('Apple Health')
+            for spec in settingsModule.settings.csvImports:
+                if spec.name in allCats and not self.sources[spec.name].hasData():
+                    allCats.remove(spec.name)
             return allCats
 
         def foundOuraData(self):
-            return len(self.ouraTrackables) > 0
+            return 'Oura' in self.sources and self.sources['Oura'].hasData()
 
         def foundHabitData(self):
-            return len(self.habitTrackables) > 0
+            return 'HabitBull' in self.sources and self.sources['HabitBull'].hasData()
+
+        def foundAppleHealthData(self):
+            return 'Apple Health' in self.sources and self.sources['Apple Health'].hasData()
@@ -0,0 +1,40 @@
+import threading
+import time
+
+
+# Lightweight stand-in for the trackables from one integration or logging panel.
+# Registering a source only stores how to load its trackables, so nothing is read until the source's trackables
+# are first asked for, e.g. when its category is opened for analysis or a trackable is looked up by name
+class TrackableSource:
+
+    # @param loader function returning the source's trackables
+    # @param hasDataCheck cheap function telling whether there is any data to load, e.g. whether the export exists,
+    # or None to load the trackables when asked
+    def __init__(self, name, loader, hasDataCheck=None):
+        self.name = name
+        self.loader = loader
+        self.hasDataCheck = hasDataCheck
+        self.trackables = None
+        # Seconds taken to load the trackables, once they have been
+        self.loadSeconds = None
+        # Sources may be loaded in the background, so other threads asking for the trackables wait for that load
+        self.lock = threading.Lock()
+
+    def isLoaded(self):
+        return self.trackables is not None
+
+    # @brief the source's trackables, loading them the first time
+    def getTrackables(self):
+        with self.lock:
+            if self.trackables is None:
+                start = time.perf_counter()
+                # Factories may give None for trackables they can't support
+                self.trackables = [t for t in (self.loader() or []) if t is not None]
+                self.loadSeconds = time.perf_counter() - start
+        return self.trackables
+
+    # @brief whether the source has any trackables, without loading them if it can be avoided
+    def hasData(self):
+        if self.trackables is None and self.hasDataCheck is not None:
+            return self.hasDataCheck()
+        return len(self.getTrackables()) > 0
@@ -0,0 +1,10 @@
+from trackables.trackables.trackable import Trackable
+from abc import ABC
+
+
+# Subclass of Trackable that deals with the daily values imported from an Apple Health export
+class AppleHealthTrackable(Trackable, ABC):
+
+    def __init__(self, name, df):
+        # Records are combined into one value per day when they're imported
+        super().__init__(name, df)
@@ -0,0 +1,182 @@
+"""
+Streaming importer for the export.xml written by Apple Health's "Export All Health Data"
+Exports are routinely several gigabytes, so the XML is parsed incrementally and every record is folded into daily
+totals as soon as it's read, keeping memory use independent of the size of the export
+"""
+from util.snapshotStore import SnapshotStore
+from util.paths import appleHealthSnapshotDir
+
+import os
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+
+# Reads every <Record> of an export into one value per day for each kind of record, e.g. 'Step Count' or
+# 'Heart Rate'.  Quantities that accumulate over the day (steps, distances, energy, nutrition) are added together,
+# while measurements (heart rate, body mass) are averaged.  Category records such as sleep analysis have no numeric
+# value, so each of their values becomes its own trackable measuring the hours spent in it, e.g.
+# 'Sleep Analysis Asleep Core'.  When several devices record the same quantity (the phone and the watch both count
+# steps), the device with the largest daily total is used rather than adding them together.
+# The daily values are stored as a snapshot keyed by the export, so an export is only parsed once
+class AppleHealthImporter:
+
+    snapshotCategory = 'daily'
+    # Records between progress reports
+    progressInterval = 200000
+
+    # Quantities that are added together over the day, without their 'HKQuantityTypeIdentifier' prefix
+    cumulativeTypes = {
+        'StepCount', 'DistanceWalkingRunning', 'DistanceCycling', 'DistanceSwimming', 'DistanceWheelchair',
+        'DistanceDownhillSnowSports', 'ActiveEnergyBurned', 'BasalEnergyBurned', 'FlightsClimbed',
+        'AppleExerciseTime', 'AppleStandTime', 'AppleMoveTime', 'PushCount', 'SwimmingStrokeCount',
+        'NumberOfTimesFallen', 'TimeInDaylight', 'NikeFuel', 'NumberOfAlcoholicBeverages',
+    }
+
+    # @brief the daily values of the export, reading them from the snapshot if the export hasn't changed
+    # @return DataFrame indexed by 'Date' with a column for each kind of record
+    @staticmethod
+    def load(exportPath, snapshotDir=None):
+        snapshotDir = appleHealthSnapshotDir if snapshotDir is None else snapshotDir
+        key = SnapshotStore.makeKey(exportPath)
+        df = SnapshotStore.load(AppleHealthImporter.snapshotCategory, key, snapshotDir)
+        if df is None:
+            df = AppleHealthImporter.parseExport(exportPath)
+            SnapshotStore.save(AppleHealthImporter.snapshotCategory, key, df, snapshotDir)
+        return df
+
+    # @brief parses the export into daily values for every kind of record
+    # @param progress function given the fraction of the file that's been read, or None to print the percentage
+    @staticmethod
+    def parseExport(exportPath, progress=None):
+        if progress is None:
+            progress = AppleHealthImporter.printProgress
+        totalBytes = max(os.path.getsize(exportPath), 1)
+        aggregator = DailyAggregator()
+
+        with open(exportPath, 'rb') as file:
+            # A record's attributes are complete when it starts, so the (metadata) elements inside it aren't needed.
+            # Ends are only needed to know when a Correlation is over
+            events = ET.iterparse(file, events=('start', 'end'))
+            _, root = next(events)
+            numRecords = 0
+            # The records grouped in a Correlation (e.g. the nutrients of a food) are also in the export on their own,
+            # so they're skipped to avoid counting them twice
+            correlationDepth = 0
+            for event, elem in events:
+                if elem.tag == 'Correlation':
+                    correlationDepth += 1 if event == 'start' else -1
+                    continue
+                if event != 'start' or elem.tag != 'Record' or correlationDepth > 0:
+                    continue
+                AppleHealthImporter.addRecord(aggregator, elem.attrib)
+                # Drop every element parsed so far so the tree never grows
+                root.clear()
+                numRecords += 1
+                if numRecords % AppleHealthImporter.progressInterval == 0:
+                    progress(file.tell() / totalBytes)
+        progress(1.0)
+        return aggregator.toFrame()
+
+    @staticmethod
+    def addRecord(aggregator, attrib):
+        recordType, startDate = attrib.get('type'), attrib.get('startDate')
+        if recordType is None or startDate is None:
+            return
+        source = attrib.get('sourceName', '')
+        value = attrib.get('value')
+        # Days are kept as written in the export, in the time zone the record was made
+        day = startDate[:10]
+
+        if recordType.startswith('HKQuantityTypeIdentifier'):
+            typeName = recordType[len('HKQuantityTypeIdentifier'):]
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return
+            isCumulative = typeName in AppleHealthImporter.cumulativeTypes or typeName.startswith('Dietary')
+            aggregator.add(AppleHealthImporter.getTrackableName(typeName), source, day, value, isCumulative)
+
+        elif recordType.startswith('HKCategoryTypeIdentifier'):
+            typeName = recordType[len('HKCategoryTypeIdentifier'):]
+            hours = AppleHealthImporter.getHours(startDate, attrib.get('endDate'))
+            if hours is None:
+                return
+            # e.g. 'HKCategoryValueSleepAnalysisAsleepCore' -> 'AsleepCore'
+            label = (value or '').replace('HKCategoryValue', '', 1)
+            label = label[len(typeName):] if label.startswith(typeName) else label
+            name = AppleHealthImporter.getTrackableName(typeName + label)
+            aggregator.add(name, source, day, hours, True)
+
+    @staticmethod
+    def getHours(startDate, endDate):
+        try:
+            start = datetime.strptime(startDate, '%Y-%m-%d %H:%M:%S %z')
+            end = datetime.strptime(endDate, '%Y-%m-%d %H:%M:%S %z')
+        except (TypeError, ValueError):
+            return None
+        return (end - start).total_seconds() / 3600
+
+    # @brief splits the camel case name of a record type into words, e.g. 'StepCount' -> 'Step Count'
+    @staticmethod
+    def getTrackableName(typeName):
+        return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])', ' ', typeName)
+
+    @staticmethod
+    def printProgress(fraction):
+        print('Importing Apple Health export: {:.0f}%'.format(100 * fraction))
+
+
+# Running totals for each trackable of each source on each day
+class DailyAggregator:
+
+    def __init__(self):
+        # Trackable name -> whether its values are added together over the day
+        self.isCumulative = {}
+        # (trackable name, source) -> {day: [sum, count]}
+        self.totals = {}
+
+    def add(self, name, source, day, value, isCumulative):
+        self.isCumulative[name] = isCumulative
+        days = self.totals.get((name, source))
+        if days is None:
+            days = self.totals[(name, source)] = {}
+        total = days.get(day)
+        if total is None:
+            days[day] = [value, 1]
+        else:
+            total[0] += value
+            total[1] += 1
+
+    # @brief one value per day for each trackable, combining the sources
+    # @return DataFrame indexed by 'Date' with a column for each trackable, sorted by name, NaN on missing days
+    def toFrame(self):
+        allDays = sorted({day for days in self.totals.values() for day in days})
+        dayIdxs = {day: i for i, day in enumerate(allDays)}
+        names = sorted(self.isCumulative)
+        columns = {}
+        for name in names:
+            sums = np.zeros(len(allDays))
+            counts = np.zeros(len(allDays))
+            for (totalName, source), days in self.totals.items():
+                if totalName != name:
+                    continue
+                idxs = np.fromiter((dayIdxs[day] for day in days), dtype=np.int64, count=len(days))
+                sourceSums = np.fromiter((total[0] for total in days.values()), dtype=np.float64, count=len(days))
+                sourceCounts = np.fromiter((total[1] for total in days.values()), dtype=np.float64, count=len(days))
+                if self.isCumulative[name]:
+                    # Use the source that recorded the most, since sources often record the same activity
+                    better = sourceSums > sums[idxs]
+                    sums[idxs[better]] = sourceSums[better]
+                    counts[idxs] = np.maximum(counts[idxs], 1)
+                else:
+                    sums[idxs] += sourceSums
+                    counts[idxs] += sourceCounts
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = sums if self.isCumulative[name] else sums / counts
+            columns[name] = np.where(counts > 0, values, np.nan)
+
+        index = pd.DatetimeIndex(pd.to_datetime(allDays, format='%Y-%m-%d'), name='Date')
+        return pd.DataFrame(data=columns, index=index, columns=names)
@@ -0,0 +1,183 @@
+"""
+Configurable importer for the CSV and TSV exports of other wearables and apps (Fitbit, Garmin, Whoop, ...)
+Each export is described by a CSVImportSpec in the settings, so supporting a new one doesn't need a bespoke factory
+"""
+from stats.duplicateReduction import DuplicateReduction
+from util.paths import integrationDir
+
+import os
+import numpy as np
+import pandas as pd
+
+
+# Describes how to read one export: which columns hold the date (and optionally the time) of each measurement, and
+# which hold the values.  Exports come in two layouts:
+#   - wide, with a column per measurement (e.g. Fitbit's 'Steps', 'Distance', ...), given by valueColumns
+#   - long, with one row per measurement, given by nameColumn holding the measurement's name and a single value column
+# Measurements on the same day are combined with the given DuplicateReduction
+class CSVImportSpec:
+
+    def __init__(self, name, path, dateColumn, valueColumns, nameColumn=None, timeColumn=None, dateFormat=None,
+                 timeFormat=None, aggregation=DuplicateReduction.SUM, delimiter=None, thousands=None):
+        if nameColumn is not None and len(valueColumns) != 1:
+            raise ValueError('CSV import {} has a name column, so it needs exactly one value column'.format(name))
+        self.name = name
+        self.path = path
+        self.dateColumn = dateColumn
+        self.valueColumns = valueColumns
+        self.nameColumn = nameColumn
+        self.timeColumn = timeColumn
+        # None to infer the format from the first date, which is still parsed in one vectorized pass
+        self.dateFormat = dateFormat
+        self.timeFormat = timeFormat
+        self.aggregation = aggregation
+        # Defaults to tabs for .tsv files and commas otherwise
+        self.delimiter = delimiter
+        # e.g. ',' for exports that write 1,234 steps
+        self.thousands = thousands
+
+    # @brief reads the spec from its entry in the settings file
+    @staticmethod
+    def fromDict(data):
+        return CSVImportSpec(
+            data['Name'], data['Path'], data['Date Column'], data['Value Columns'],
+            nameColumn=data.get('Name Column'),
+            timeColumn=data.get('Time Column'),
+            dateFormat=data.get('Date Format'),
+            timeFormat=data.get('Time Format'),
+            aggregation=DuplicateReduction.mapStringToEnum(data.get('Aggregation', 'Sum')),
+            delimiter=data.get('Delimiter'),
+            thousands=data.get('Thousands Separator'),
+        )
+
+    # @brief the spec's entry in the settings file, leaving out options that weren't set
+    def toDict(self):
+        data = {
+            'Name': self.name,
+            'Path': self.path,
+            'Date Column': self.dateColumn,
+            'Date Format': self.dateFormat,
+            'Time Column': self.timeColumn,
+            'Time Format': self.timeFormat,
+            'Name Column': self.nameColumn,
+            'Value Columns': self.valueColumns,
+            'Aggregation': self.aggregation.toString(),
+            'Delimiter': self.delimiter,
+            'Thousands Separator': self.thousands,
+        }
+        return {key: value for key, value in data.items() if value is not None}
+
+    # @brief the export's path, where relative paths are within the integrations folder
+    def getPath(self):
+        return self.path if os.path.isabs(self.path) else os.path.join(integrationDir, self.path)
+
+    def getDelimiter(self):
+        if self.delimiter is not None:
+            return self.delimiter
+        return '\t' if self.path.lower().endswith('.tsv') else ','
+
+    def getColumns(self):
+        columns = [self.dateColumn] + [c for c in (self.timeColumn, self.nameColumn) if c is not None]
+        return columns + self.valueColumns
+
+    # Everything but the values is read as text so that nothing is left for pandas to guess while reading
+    def getDtypes(self):
+        dtypes = {c: str for c in (self.dateColumn, self.timeColumn, self.nameColumn) if c is not None}
+        dtypes.update({c: np.float64 for c in self.valueColumns})
+        return dtypes
+
+
+# Reads an export described by a CSVImportSpec into one value per day for each measurement.
+# The file is read chunkSize rows at a time and each chunk is reduced to one partial result per day and measurement
+# before the next is read, so memory use depends on the number of days measured rather than the size of the file
+class CSVImporter:
+
+    chunkSize = 200000
+    # Values that exports write for missing measurements, in addition to pandas' defaults
+    naValues = ['--', '-']
+
+    # @return tuple of (sorted unique dates, measurement names, days x measurements array with NaN where not measured)
+    # Names are in the order of the value columns for wide exports and sorted for long exports
+    @staticmethod
+    def read(spec, chunkSize=None):
+        reader = pd.read_csv(spec.getPath(), sep=spec.getDelimiter(), usecols=spec.getColumns(),
+                             dtype=spec.getDtypes(), thousands=spec.thousands, na_values=CSVImporter.naValues,
+                             chunksize=chunkSize if chunkSize else CSVImporter.chunkSize)
+        partials = [CSVImporter.reduceChunk(spec, chunk) for chunk in reader]
+        return CSVImporter.combinePartials(spec, partials)
+
+    # @brief the chunk's measurements as parallel arrays of days, names, values and a key giving their order in time
+    @staticmethod
+    def getMeasurements(spec, chunk):
+        dates = pd.to_datetime(chunk[spec.dateColumn], format=spec.dateFormat, errors='coerce')
+        order = dates.to_numpy().astype('datetime64[ns]').astype(np.int64)
+        if spec.timeColumn is not None:
+            times = pd.to_datetime(chunk[spec.timeColumn], format=spec.timeFormat, errors='coerce')
+            timeOfDay = (times - times.dt.normalize()).to_numpy().astype('timedelta64[ns]').astype(np.int64)
+            order = order + np.where(times.isna().to_numpy(), 0, timeOfDay)
+        days = dates.dt.normalize().to_numpy()
+
+        if spec.nameColumn is not None:
+            names = chunk[spec.nameColumn].to_numpy()
+            values = chunk[spec.valueColumns[0]].to_numpy(dtype=np.float64)
+        else:
+            # Flatten the value columns so each row gives one measurement per column
+            numColumns = len(spec.valueColumns)
+            names = np.tile(np.array(spec.valueColumns, dtype=object), len(chunk))
+            values = chunk[spec.valueColumns].to_numpy(dtype=np.float64).reshape(-1)
+            days, order = np.repeat(days, numColumns), np.repeat(order, numColumns)
+
+        valid = ~np.isnan(values) & ~np.isnat(days) & pd.notna(names)
+        return days[valid], names[valid], values[valid], order[valid]
+
+    # @brief reduces the chunk to one row per day and measurement holding what's needed to combine it with the
+    # partial results of other chunks
+    @staticmethod
+    def reduceChunk(spec, chunk):
+        days, names, values, order = CSVImporter.getMeasurements(spec, chunk)
+        df = pd.DataFrame(data={'Date': days, 'Name': names, 'Value': values, 'Order': order})
+        aggregation = spec.aggregation
+        if aggregation in (DuplicateReduction.FIRST, DuplicateReduction.LAST):
+            df = df.sort_values('Order', kind='stable')
+        groups = df.groupby(['Date', 'Name'], sort=False)
+
+        if aggregation == DuplicateReduction.SUM:
+            return groups[['Value']].sum()
+        if aggregation == DuplicateReduction.MEAN:
+            return groups['Value'].agg(['sum', 'count'])
+        if aggregation == DuplicateReduction.MAX:
+            return groups[['Value']].max()
+        if aggregation == DuplicateReduction.FIRST:
+            return groups[['Value', 'Order']].first()
+        return groups[['Value', 'Order']].last()
+
+    @staticmethod
+    def combinePartials(spec, partials):
+        partials = [p for p in partials if len(p) > 0]
+        if len(partials) == 0:
+            names = [] if spec.nameColumn is not None else list(spec.valueColumns)
+            return pd.DatetimeIndex([], name='Date'), names, np.empty((0, len(names)), order='F')
+
+        df = pd.concat(partials)
+        aggregation = spec.aggregation
+        if aggregation in (DuplicateReduction.FIRST, DuplicateReduction.LAST):
+            df = df.sort_values('Order', kind='stable')
+        groups = df.groupby(level=['Date', 'Name'])
+        if aggregation == DuplicateReduction.SUM:
+            combined = groups['Value'].sum()
+        elif aggregation == DuplicateReduction.MEAN:
+            sums = groups[['sum', 'count']].sum()
+            combined = sums['sum'] / sums['count']
+        elif aggregation == DuplicateReduction.MAX:
+            combined = groups['Value'].max()
+        elif aggregation == DuplicateReduction.FIRST:
+            combined = groups['Value'].first()
+        else:
+            combined = groups['Value'].last()
+
+        wide = combined.unstack('Name').sort_index()
+        if spec.nameColumn is None:
+            wide = wide.reindex(columns=[c for c in spec.valueColumns if c in wide.columns])
+        # Column-major so that each measurement's column is contiguous
+        values = np.asfortranarray(wide.to_numpy(dtype=np.float64))
+        return pd.DatetimeIndex(wide.index, name='Date'), list(wide.columns), values
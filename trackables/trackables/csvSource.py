@@ -0,0 +1,10 @@
+from trackables.trackables.trackable import Trackable
+from abc import ABC
+
+
+# Subclass of Trackable that deals with measurements imported from a CSV export described in the settings
+class CSVTrackable(Trackable, ABC):
+
+    def __init__(self, name, df):
+        # Measurements are combined into one value per day when they're imported
+        super().__init__(name, df)
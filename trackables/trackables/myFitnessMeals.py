@@ -1,41 +1,133 @@
-from util.dbInterface import DBInterface
 from trackables.trackables.trackableFactories import NutrientFactory
 from util.paths import MFPDataPath
 
+import numpy as np
 import pandas as pd
 
 
 # Interface that reads data from the myfitnesspal spreadsheet and stores information in trackables
 class MFPManager():
-    # TODO: REINDEX BY DATE
+
     def __init__(self):
         # If MFP integration is selected but no data is available
         try:
-            df = pd.read_csv(MFPDataPath)
+            self.mealTable = MealTable.fromCSV(MFPDataPath)
         except FileNotFoundError:
-            self.nutrientTrackables = {}
-            self.meals = []
+            self.mealTable = MealTable.empty()
+
+        self.nutrientTrackables = {}
+        self.mealSlotTrackables = {}
+        # Without any meals there's nothing to show, rather than a trackable for each nutrient with no data
+        if len(self.mealTable) == 0:
             return
-        # Data is written the Excel sheet by MFP.py automatically
-        df['Date'] = df['Date'].apply(
-                            lambda x: DBInterface.convertToDateTime(x, '%Y-%m-%d'))
-        df = df.set_index('Date')
-        df.sort_index(inplace=True)
-
-        nutrients = ['Calories', 'Carbohydrates',
-                     'Fat', 'Protein', 'Sodium', 'Sugar']
-        self.nutrientTrackables = {nutrient: NutrientFactory.create(
-            nutrient, df[nutrient].to_frame(name='Score')) for nutrient in nutrients}
-        # Load each row in the spreadsheet into a separate meal object
-        self.meals = [Meal(df.index.to_list()[i], *df.iloc[i].to_list())
-                      for i in range(df.shape[0])]
+
+        # Every nutrient's total for each day and for each meal slot comes from one grouped sum over the meals
+        days, slotTotals, slotCounts = self.mealTable.getSlotTotals()
+        dates = pd.DatetimeIndex(days.astype('datetime64[ns]'), name='Date')
+        with np.errstate(invalid='ignore'):
+            dailyTotals = np.where(slotCounts.sum(axis=1) > 0, slotTotals.sum(axis=1), np.nan)
+            slotTotals = np.where(slotCounts > 0, slotTotals, np.nan)
+
+        for k, nutrient in enumerate(MealTable.nutrients):
+            self.nutrientTrackables[nutrient] = NutrientFactory.create(
+                nutrient, pd.DataFrame(data={'Score': dailyTotals[:, k]}, index=dates))
+            for s, slot in enumerate(self.mealTable.mealNames):
+                # e.g. 'Breakfast Calories'
+                name = '{} {}'.format(slot, nutrient)
+                self.mealSlotTrackables[name] = NutrientFactory.create(
+                    name, pd.DataFrame(data={'Score': slotTotals[:, s, k]}, index=dates))
 
     def getTrackables(self):
-        return list(self.nutrientTrackables.values())
+        return list(self.nutrientTrackables.values()) + list(self.mealSlotTrackables.values())
 
-# Wrap the data describing each meal directly from the spreadsheet
+    def getMeals(self):
+        return self.mealTable
+
+
+# Columnar table of every meal in the spreadsheet, sorted by date.
+# Each column is a NumPy array with one entry per meal: the day, the meal's name as a code into mealNames, the
+# minute of the day it was eaten (-1 if unknown), and a (meals x nutrients) array of the nutrients it contained
+class MealTable:
+
+    nutrients = ['Calories', 'Carbohydrates', 'Fat', 'Protein', 'Sodium', 'Sugar']
+    # Slot for meals saved without a name
+    unknownMealName = 'Unknown'
+
+    def __init__(self, days, mealCodes, mealNames, minutes, nutrientValues):
+        self.days = days
+        self.mealCodes = mealCodes
+        self.mealNames = mealNames
+        self.minutes = minutes
+        self.nutrientValues = nutrientValues
+
+    @staticmethod
+    def empty():
+        return MealTable(np.empty(0, dtype='datetime64[D]'), np.empty(0, dtype=np.int32), [],
+                         np.empty(0, dtype=np.int16), np.empty((0, len(MealTable.nutrients))))
+
+    # @brief reads the spreadsheet written by MFPScraper, with columns Meal, Date, Time and each nutrient
+    @staticmethod
+    def fromCSV(path):
+        df = pd.read_csv(path, usecols=['Meal', 'Date', 'Time'] + MealTable.nutrients,
+                         dtype={'Meal': str, 'Date': str, 'Time': str})
+        return MealTable.fromFrame(df)
 
+    @staticmethod
+    def fromFrame(df):
+        dates = pd.to_datetime(df['Date'], format='%Y-%m-%d')
+        order = np.argsort(dates.to_numpy(), kind='stable')
+        days = dates.to_numpy()[order].astype('datetime64[D]')
 
+        # Missing names would be factorized to -1, which indexes the last slot
+        mealCodes, mealNames = pd.factorize(df['Meal'].fillna(MealTable.unknownMealName).to_numpy()[order])
+        # The scraper writes times as datetimes on 1900-01-01, which are saved without the time when it's midnight
+        times = df['Time'].iloc[order]
+        hoursMinutes = times.str.extract(r'(\d{1,2}):(\d{2})').astype(np.float64).to_numpy()
+        minutes = np.where(np.isnan(hoursMinutes[:, 0]), 0, hoursMinutes[:, 0] * 60 + hoursMinutes[:, 1])
+        minutes = np.where(times.isna().to_numpy(), -1, minutes).astype(np.int16)
+
+        nutrientValues = np.column_stack(
+            [pd.to_numeric(df[n], errors='coerce').to_numpy(dtype=np.float64)[order] for n in MealTable.nutrients]) \
+            if len(df) > 0 else np.empty((0, len(MealTable.nutrients)))
+        return MealTable(days, mealCodes.astype(np.int32), list(mealNames), minutes, nutrientValues)
+
+    def __len__(self):
+        return len(self.days)
+
+    # @brief the values of one nutrient for every meal
+    def getNutrient(self, nutrient):
+        return self.nutrientValues[:, MealTable.nutrients.index(nutrient)]
+
+    # @brief boolean mask of the meals with the given name, e.g. 'Breakfast'
+    def getMealMask(self, mealName):
+        if mealName not in self.mealNames:
+            return np.zeros(len(self), dtype=bool)
+        return self.mealCodes == self.mealNames.index(mealName)
+
+    # @brief sums every nutrient over the meals in each meal slot of each day
+    # Meals missing a nutrient don't count towards it
+    # @return tuple of (sorted unique days, days x slots x nutrients totals, days x slots x nutrients counts of the
+    # meals that had a value)
+    def getSlotTotals(self):
+        days, dayCodes = np.unique(self.days, return_inverse=True)
+        shape = (len(days), len(self.mealNames), len(MealTable.nutrients))
+        totals = np.zeros(shape)
+        counts = np.zeros(shape)
+
+        measured = ~np.isnan(self.nutrientValues)
+        mealIdxs, nutrientIdxs = np.nonzero(measured)
+        cells = (dayCodes.reshape(-1)[mealIdxs], self.mealCodes[mealIdxs], nutrientIdxs)
+        np.add.at(totals, cells, self.nutrientValues[measured])
+        np.add.at(counts, cells, 1)
+        return days, totals, counts
+
+    # @brief the meal at index i as a Meal object
+    def getMeal(self, i):
+        time = None if self.minutes[i] < 0 else '{:02d}:{:02d}'.format(*divmod(int(self.minutes[i]), 60))
+        return Meal(pd.Timestamp(self.days[i]), self.mealNames[self.mealCodes[i]], time, *self.nutrientValues[i])
+
+
+# Wrap the data describing each meal directly from the spreadsheet
 class Meal:
 
     def __init__(self, date, mealName, time, calories, carbs, fat, protein, sodium, sugar):
@@ -6,6 +6,5 @@ class NutrientTrackable(Trackable, ABC):
 
     def __init__(self, name, df):
         # Let's assume for now that we only care about daily reports from MFP
+        # All of the meal entries are combined into a single entry for the day when stored
         super().__init__(name, df)
-        # Combines all of the meal entries into a single entry for the day
-        self.combineDuplicateDates()
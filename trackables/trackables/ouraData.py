@@ -4,11 +4,12 @@ Stores conversions and methods for interfacing with Oura data directly
 """
 from trackables.variableCategories.trackType import TrackType
 import trackables.trackables.trackableFactories as factories
+from trackables.trackables.ouraMergeStore import OuraMergeStore
 from util.paths import integrationDir
 
 import os
+import threading
 from datetime import datetime
-import json
 import pandas as pd
 import numpy as np
 
@@ -16,11 +17,14 @@ import numpy as np
 # Documentation on the API found at: https://cloud.ouraring.com/docs/
 class Oura:  # Make this class a singleton to avoid unecessary painful reloading of JSON data
     __instance = None
+    # Oura may be first used from a loader thread, so only one thread can create the instance
+    __instanceLock = threading.Lock()
 
     @staticmethod
     def instance():
-        if Oura.__instance is None:
-            Oura()
+        with Oura.__instanceLock:
+            if Oura.__instance is None:
+                Oura()
         return Oura.__instance
 
     def __init__(self):
@@ -29,7 +33,14 @@ class Oura:  # Make this class a singleton to avoid unecessary painful reloading
         else:
             Oura.__instance = self
 
-        self.data = self.loadJSON()
+        # Exports are merged into the store the first time a category is needed
+        self.exportPaths = self.findOuraJSONs()
+        self.dataPath = self.exportPaths[-1] if len(self.exportPaths) > 0 else None
+        if self.dataPath is None:
+            print('No Valid Oura Ring JSON Files Found')
+        self.mergeStore = None
+        # Categories may be loaded from several loader threads, which must share one merge store
+        self.mergeStoreLock = threading.Lock()
         self.readinessTrackables = None
         self.sleepTrackables = None
         self.activityTrackables = None
@@ -89,17 +100,12 @@ class Oura:  # Make this class a singleton to avoid unecessary painful reloading
 
     # Loads data from the JSON coresponding to the given category and returns a list of Trackables
     def createGenericTrackables(self, category):
-        if self.data is None:
+        df = self.getCategoryFrame(category)
+        if df is None:
             return []
 
-        entries = self.data[category]
         # One trackable for each datapoint except 'period_id' and 'summary_date'
         # Use most recent measurement because some parameters are not included early
-        df = pd.DataFrame(data=entries)
-        df = df.rename(columns={"summary_date": "Date"})
-        # Convert from string dates to datetime objects
-        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
-        df.set_index("Date", inplace=True)
         trackables = []
 
         for name in df.columns:
@@ -129,56 +135,53 @@ class Oura:  # Make this class a singleton to avoid unecessary painful reloading
         if category == "activity":
             return self.activityTypeDict[name]
 
+    # @brief the category's data from every export indexed by 'Date', with a column for each field of the JSON entries
+    # Only exports that haven't been merged into the store before are read
+    def getCategoryFrame(self, category):
+        if self.dataPath is None:
+            return None
+        with self.mergeStoreLock:
+            if self.mergeStore is None:
+                mergeStore = OuraMergeStore()
+                mergeStore.update(self.exportPaths)
+                # Only published once it's up to date
+                self.mergeStore = mergeStore
+        return self.mergeStore.getFrame(category)
+
     # Fetches data about the given field from the master JSON and returns its value over a range of dates
     def getDataField(self, category, field):
-        dates = []
-        scores = []
-
-        for entry in self.data[category]:
-            try:
-                scores.append(entry[field])
-            except KeyError:
-                raise KeyError(
-                    field + "is is not a valid field name for readiness data"
-                )
-            dates.append(entry["summary_date"])
-        return dates, np.array(scores)
-
-    def loadJSON(self):
-        dataPath = self.findMostRecentOuraJSON()
-        if dataPath is None:
-            return None
-        with open(dataPath, "r") as read_file:
-            data = json.load(read_file)
-            return data
+        df = self.getCategoryFrame(category)
+        if df is None or field not in df.columns:
+            raise KeyError(
+                field + "is is not a valid field name for readiness data"
+            )
+        dates = list(df.index.strftime("%Y-%m-%d"))
+        return dates, df[field].to_numpy()
 
     def ouraJSONExists(self):
-        return self.findMostRecentOuraJSON() is not None
+        return self.dataPath is not None
 
-    # Looks through all the Oura JSONs in the integrationDir and returns the path to the newest one
-    def findMostRecentOuraJSON(self):
+    # Returns the paths to all the Oura JSONs in the integrationDir sorted from oldest to newest
+    def findOuraJSONs(self):
         dirFiles = os.listdir(integrationDir)
-        ouraFiles = [f for f in dirFiles if "oura" in f and ".json" in f]
-        # Remove any files that look like oura JSONs but don't contain valid dates in name
-        for f in ouraFiles:
+        ouraFiles = []
+        for f in dirFiles:
+            if "oura" not in f or ".json" not in f:
+                continue
+            # Skip any files that look like oura JSONs but don't contain valid dates in name
             try:
-                datetime.strptime(
+                date = datetime.strptime(
                     f[5:15], "%Y-%m-%d"
                 )  # Will raise ValueError if invalid
             except ValueError:
-                ouraFiles.remove(f)
                 print(
                     'Invalid JSON file for Oura Ring data found: {}\n'
                     'Make sure the name of this file is in the allowed format'.format(f)
                 )
+                continue
+            ouraFiles.append((date, f))
 
-        if len(ouraFiles) == 0:
-            print('No Valid Oura Ring JSON Files Found')
-            return None
-        relativePath = max(
-            ouraFiles, key=lambda file: datetime.strptime(file[5:15], "%Y-%m-%d")
-        )
-        return os.path.join(integrationDir, relativePath)
+        return [os.path.join(integrationDir, f) for _, f in sorted(ouraFiles)]
 
     def shorthandToName(self, category, abbrev):
         try:
@@ -0,0 +1,203 @@
+"""
+Persistent store that merges every Oura JSON export into one set of records per category
+Exports are read incrementally, one record at a time, and only records for days that aren't stored yet are kept
+"""
+from util.snapshotStore import SnapshotStore
+from util.paths import ouraSnapshotDir
+
+import os
+import json
+import pandas as pd
+
+
+# Reads the records of an export like {"sleep": [{...}, ...], "activity": [...], ...} without loading the
+# whole document.  The file is read in chunks and each record is decoded on its own once all of it has been read,
+# so memory use depends on the size of a record rather than the size of the export
+class OuraExportStream:
+
+    def __init__(self, path, chunkSize=2**16):
+        self.path = path
+        self.chunkSize = chunkSize
+        self.decoder = json.JSONDecoder()
+        self.file = None
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    # @brief yields (category, record) for every element of the export's top level lists
+    # Top level values that aren't lists are skipped
+    def iterRecords(self):
+        with open(self.path, 'r') as self.file:
+            self.buffer, self.pos, self.eof = '', 0, False
+            self.expect('{')
+            if self.peek() == '}':
+                return
+            while True:
+                category = self.decodeValue()
+                self.expect(':')
+                if self.peek() == '[':
+                    self.expect('[')
+                    if self.peek() == ']':
+                        self.expect(']')
+                    else:
+                        while True:
+                            yield category, self.decodeValue()
+                            if self.expect(',', ']') == ']':
+                                break
+                else:
+                    self.decodeValue()
+                if self.expect(',', '}') == '}':
+                    return
+
+    # @brief reads the next chunk of the file into the buffer, dropping what's already been decoded
+    # @return False once the end of the file has been reached
+    def readChunk(self):
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunkSize)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = len(chunk) == 0
+        return not self.eof
+
+    # @brief the next character that isn't whitespace, without consuming it
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.readChunk():
+                raise ValueError('Unexpected end of Oura Ring export {}'.format(self.path))
+
+    # @brief consumes the next character, which must be one of the given characters
+    def expect(self, *chars):
+        char = self.peek()
+        if char not in chars:
+            raise ValueError('Expected {} in Oura Ring export {} but found {}'.format(' or '.join(chars), self.path, char))
+        self.pos += 1
+        return char
+
+    def decodeValue(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number ending at the end of the buffer might continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.readChunk()
+
+
+# Merges the records of every export into one DataFrame per category, indexed by 'Date' like the export's
+# 'summary_date'.  The exports that have been merged are listed in a manifest next to the categories' snapshots,
+# so each export is only read once.  Exports overlap heavily, so for each category only the records from the
+# last stored day onwards are kept -- the last day is replaced since it may not have been complete when exported
+class OuraMergeStore:
+
+    manifestName = 'exports.json'
+    categories = ('readiness', 'sleep', 'activity')
+
+    def __init__(self, snapshotDir=None):
+        self.snapshotDir = ouraSnapshotDir if snapshotDir is None else snapshotDir
+        self.frames = {}
+        self.mergedExports = []
+        self.generation = 0
+        self.load()
+
+    def getManifestPath(self):
+        return os.path.join(self.snapshotDir, OuraMergeStore.manifestName)
+
+    # @brief reads the stored categories, starting from an empty store if any of them are missing or out of date
+    def load(self):
+        try:
+            with open(self.getManifestPath(), 'r') as manifestFile:
+                manifest = json.load(manifestFile)
+            generation, mergedExports = manifest['generation'], manifest['exports']
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+        frames = {}
+        for category in OuraMergeStore.categories:
+            frames[category] = SnapshotStore.load(category, {'generation': generation}, self.snapshotDir)
+            if frames[category] is None:
+                return
+        self.frames, self.mergedExports, self.generation = frames, mergedExports, generation
+
+    # @brief the merged records of the category, or None if no export has had any
+    def getFrame(self, category):
+        df = self.frames.get(category)
+        return df if df is not None and len(df) > 0 else None
+
+    # @brief merges every export that hasn't been merged yet, oldest first, and saves the result
+    # @param exportPaths paths to the exports sorted from oldest to newest
+    # @return whether any export was merged
+    def update(self, exportPaths):
+        keys = [SnapshotStore.makeKey(path) for path in exportPaths]
+        newExports = [(path, key) for path, key in zip(exportPaths, keys) if key not in self.mergedExports]
+        if len(newExports) == 0:
+            return False
+
+        for path, key in newExports:
+            self.mergeExport(path)
+            self.mergedExports.append(key)
+        self.save()
+        return True
+
+    # @brief streams a single export into the store
+    def mergeExport(self, path):
+        # Days are compared as 'YYYY-MM-DD' strings, which sort the same way as the dates
+        lastDays = {}
+        for category in OuraMergeStore.categories:
+            df = self.frames.get(category)
+            lastDays[category] = df.index.max().strftime('%Y-%m-%d') if df is not None and len(df) > 0 else ''
+
+        newRecords = {category: [] for category in OuraMergeStore.categories}
+        for category, record in OuraExportStream(path).iterRecords():
+            if category not in newRecords or not isinstance(record, dict):
+                continue
+            day = record.get('summary_date')
+            if day is not None and day >= lastDays[category]:
+                newRecords[category].append(record)
+
+        for category, records in newRecords.items():
+            if len(records) > 0:
+                self.frames[category] = OuraMergeStore.mergeRecords(self.frames.get(category), records)
+
+    # @brief adds records to the category's merged DataFrame, replacing any stored records for the same days
+    @staticmethod
+    def mergeRecords(df, records):
+        newDf = pd.DataFrame(data=records)
+        newDf = newDf.rename(columns={"summary_date": "Date"})
+        # Convert from string dates to datetime objects
+        newDf["Date"] = pd.to_datetime(newDf["Date"], format="%Y-%m-%d")
+        newDf.set_index("Date", inplace=True)
+        # Keep the last of any records repeated within the export
+        if 'period_id' in newDf.columns:
+            repeated = newDf.reset_index().duplicated(subset=['Date', 'period_id'], keep='last').to_numpy()
+            newDf = newDf[~repeated]
+
+        if df is None or len(df) == 0:
+            return newDf.sort_index(kind='stable')
+        merged = pd.concat([df[~df.index.isin(newDf.index)], newDf])
+        return merged.sort_index(kind='stable')
+
+    # @brief writes every category under a new generation and then the manifest that refers to it
+    def save(self):
+        self.generation += 1
+        for category in OuraMergeStore.categories:
+            df = self.frames.get(category)
+            if df is None:
+                df = pd.DataFrame(index=pd.DatetimeIndex([], name='Date'))
+                self.frames[category] = df
+            SnapshotStore.save(category, {'generation': self.generation}, df, self.snapshotDir)
+
+        try:
+            with open(self.getManifestPath(), 'w') as manifestFile:
+                json.dump({'generation': self.generation, 'exports': self.mergedExports}, manifestFile)
+        except OSError as e:
+            print('Unable to save Oura Ring export manifest: {}'.format(e))
@@ -1,15 +1,29 @@
 from stats.fillStrategy import FillStrategy
 from stats.frequency import Frequency, GroupingMethod
+from stats.duplicateReduction import DuplicateReduction
 
 import pandas as pd
 import numpy as np
-from copy import deepcopy as copy
 from abc import ABC
+import copy
 
 from trackables.variableCategories.trackType import TrackType
+from trackables.resampler import Resampler
+from trackables.rangeStats import RangeStats
+from trackables.dayStore import DayStore
+from trackables.processedCache import ProcessedCache
 
 
 class Trackable(ABC):
+
+    # Precision used to store raw scores.  Subclasses can use np.float32 to halve their memory
+    # (times always use float64 so they can represent seconds exactly)
+    scoreDtype = np.float64
+    # Memory budget for the processed series cached by each trackable
+    processedCacheBytes = 8 * 2**20
+    # How measurements on the same date are combined, or None to use the default for the track type
+    duplicateReduction = None
+
     def __init__(
         self,
         name,
@@ -18,46 +32,171 @@ class Trackable(ABC):
         frequency=Frequency.DAILY,
     ):
         self.name = name
-        # rawData always stays at the finest frequency
-        self.rawData = df.dropna()  # Remove all NaN rows
+        # Raw data always stays at the finest frequency, stored as one combined value per day
+        self.rawStore = DayStore(dtype=self.scoreDtype, isTime=self.getTrackType() == TrackType.TIME)
+        df = self.combineDuplicateDates(df.dropna())  # Remove all NaN rows
+        self.rawStore.setData(df.index, df['Score'].to_numpy())
+        # Incremented each time the raw data changes so that anything derived from it knows when it's stale
+        self.rawVersion = 0
+        self._rawFrame = None
+        self._rawRangeStats = None
+        self._missingMask = None
+        # Processed series for previously requested calculations
+        self.processedCache = ProcessedCache(self.processedCacheBytes)
+
         self.frequency = frequency
         self.grouping = GroupingMethod.AVERAGE
-        # fillEmpty is a tuple of the form (Whether or not to fill, with what value to fill)
         self.fillStrategy = fillStrategy
         # Create a separate entry that will store trimmed sections of the data
-        self.currentDateRange = pd.date_range(self.rawData.index[0], self.rawData.index[-1]) if len(self.rawData) > 0 else None
-        # The last date range that was used when setting frequency
-        # Used to determine when cached frequency calculation is valid
-
-        self.processedData = copy(self.rawData)
-        # Fills in missing dates and combines entries so dates are unique
-        if len(self.getRawScores()) > 0:
-            self.combineDuplicateDates()
+        self.currentDateRange = pd.date_range(self.getStartDate(), self.getEndDate()) if not self.rawStore.isEmpty() else None
+
+        # Processed data is kept as parallel arrays of dates and scores
+        self.resetProcessedData()
+        # Fills in missing dates so there is an entry for every day
+        if not self.rawStore.isEmpty():
             self.fillEmptyDates()
 
+    # ===================== Raw and processed data storage ==================
+
+    # @brief DataFrame view of the raw measurements, built only when requested (e.g. for export)
+    @property
+    def rawData(self):
+        if self._rawFrame is None or self._rawFrame[0] != self.rawVersion:
+            self._rawFrame = (self.rawVersion, self.rawStore.toFrame())
+        return self._rawFrame[1]
+
+    # @brief DataFrame view of processedDates and processedScores, built only when requested (e.g. for export)
+    @property
+    def processedData(self):
+        if self._processedFrame is None:
+            self._processedFrame = pd.DataFrame(data={'Score': self.processedScores},
+                                                index=pd.DatetimeIndex(self.processedDates))
+        return self._processedFrame
+
+    @processedData.setter
+    def processedData(self, df):
+        self.setProcessed(df.index.to_numpy(dtype='datetime64[ns]'), df['Score'].to_numpy())
+
+    # @brief replaces the processed data, invalidating everything derived from it
+    def setProcessed(self, dates, scores):
+        self.processedDates = dates
+        self.processedScores = scores
+        self._processedFrame = None
+        self._rangeStats = None
+        # (start day, end day, fill strategy) while the processed data is the daily fill over every raw date
+        self._filledSpan = None
+        # Over-allocated arrays that processedDates and processedScores are views of, once they've been grown
+        self._processedBuffers = None
+
+    # @brief overwrites the processed data from position pos onwards, growing it if the new values run past the end
+    # The arrays are over-allocated when they grow so that adding days one at a time is amortized O(1)
+    def writeProcessed(self, pos, dates, scores):
+        length = max(len(self.processedDates), pos + len(dates))
+        if self._processedBuffers is None or len(self._processedBuffers[0]) < length:
+            capacity = max(length, 2 * len(self.processedDates))
+            datesBuf = np.empty(capacity, dtype=self.processedDates.dtype)
+            scoresBuf = np.empty(capacity, dtype=self.processedScores.dtype)
+            datesBuf[:len(self.processedDates)] = self.processedDates
+            scoresBuf[:len(self.processedScores)] = self.processedScores
+            self._processedBuffers = (datesBuf, scoresBuf)
+        datesBuf, scoresBuf = self._processedBuffers
+
+        datesBuf[pos:pos + len(dates)] = dates
+        scoresBuf[pos:pos + len(scores)] = scores
+        self.processedDates = datesBuf[:length]
+        self.processedScores = scoresBuf[:length]
+        self._processedFrame = None
+        self._rangeStats = None
+
+    # @brief sets the processed data to the raw measurements without filling any missing dates
+    def resetProcessedData(self):
+        self.setProcessed(self.rawStore.getValidDates().to_numpy(), self.getRawScores())
+
+    # @brief marks that the raw store has been modified
+    def rawDataChanged(self):
+        self.rawVersion += 1
+        self._rawRangeStats = None
+        # Entries for older versions can never be requested again
+        self.processedCache.clear()
+
+    # @brief returns a copy whose processed data can be recalculated on another thread without changing this one
+    # The raw data and the cache of processed series are shared, only the processed data is separate
+    def copyForAnalysis(self):
+        working = copy.copy(self)
+        # Otherwise growing the copy's processed data would write into this trackable's arrays
+        working._processedBuffers = None
+        return working
+
+    # @brief takes the processed data calculated by a copy made with copyForAnalysis
+    def adoptCalculation(self, working):
+        self.frequency = working.frequency
+        self.grouping = working.grouping
+        self.fillStrategy = working.fillStrategy
+        self.processedDates = working.processedDates
+        self.processedScores = working.processedScores
+        self._processedFrame = working._processedFrame
+        self._rangeStats = working._rangeStats
+        self._filledSpan = working._filledSpan
+        self._processedBuffers = working._processedBuffers
+
+    # @brief prefix sums over the processed data used to answer mean / stdev / count queries over any date range
+    # Built lazily the first time they're needed after the processed data changes
+    def getRangeStats(self):
+        if self._rangeStats is None:
+            self._rangeStats = RangeStats(self.processedDates, self.processedScores)
+        return self._rangeStats
+
+    # @brief prefix sums over the raw measurements, used when filling missing dates with the mean
+    def getRawRangeStats(self):
+        if self._rawRangeStats is None:
+            self._rawRangeStats = RangeStats(self.rawStore.getValidDates(), self.rawStore.getValidValues())
+        return self._rawRangeStats
+
     # Raw scores are used internally for maintaining all of the tracked data, even if not used ASAP
     def getRawScores(self):
-        return self.rawData["Score"].to_numpy()
+        return self.rawStore.decode(self.rawStore.getValidValues())
 
     def getRawDates(self):
-        return self.rawData.index.to_list()
+        return self.rawStore.getValidDates()
+
+    # First and last dates with measurements
+    def getStartDate(self):
+        return self.rawStore.getStartDate()
+
+    def getEndDate(self):
+        return self.rawStore.getEndDate()
+
+    # @brief whether each day between the first and last measurement has no data
+    # Computed once per version of the raw data
+    def getMissingMask(self):
+        if self._missingMask is None or self._missingMask[0] != self.rawVersion:
+            self._missingMask = (self.rawVersion, ~self.rawStore.getValidMask())
+        return self._missingMask[1]
 
     # @brief collect the dates for which there is no data
     def getMissingDates(self):
-        wholeRange = pd.date_range(self.rawData.index[0], self.rawData.index[-1])
-        missing = np.array([])
-        for date in wholeRange:
-            if date not in self.rawData.index:
-                missing = np.append(date, missing)
-        return missing[::-1]    # Reverse the array so that it's in ascending order
+        missingIdxs = np.flatnonzero(self.getMissingMask())
+        return DayStore.daysToDates(missingIdxs + self.rawStore.getStartDay())
+
+    # @brief whether each of the given dates falls between the first and last measurement without having any data
+    def getMissingMaskForDates(self, dates):
+        idxs = DayStore.toDays(dates) - self.rawStore.getStartDay()
+        inRange = (idxs >= 0) & (idxs < self.rawStore.length)
+        missing = np.zeros(len(idxs), dtype=bool)
+        missing[inRange] = self.getMissingMask()[idxs[inRange]]
+        return missing
+
+    # @brief positions in getSelectedDates() of the dates without any data
+    def getSelectedMissingIdxs(self):
+        return np.flatnonzero(self.getMissingMaskForDates(self.getSelectedDates()))
 
     # Processed values define the data range that can be accessed from within a trackable group -- stores
     # the limits over which all included trackables overlap
     def getProcessedScores(self):
-        return self.processedData["Score"].to_numpy()
+        return self.processedScores
 
     def getProcessedDates(self):
-        return self.processedData.index.to_list()
+        return pd.DatetimeIndex(self.processedDates)
 
     # Values over the selected dates store the current selection as made from the analyze window's trackDateWidget
     # Used immediately for plotting and analysis
@@ -71,6 +210,9 @@ class Trackable(ABC):
         elif self.frequency == Frequency.MONTHLY:
             return self.getScoresOverDateRange(
                 pd.date_range(start=self.currentDateRange[0] - pd.Timedelta(self.currentDateRange[0].day - 1, unit='d'), end=self.currentDateRange[-1]))
+        elif self.frequency == Frequency.YEARLY:
+            return self.getScoresOverDateRange(
+                pd.date_range(start=self.currentDateRange[0] - pd.Timedelta(self.currentDateRange[0].dayofyear - 1, unit='d'), end=self.currentDateRange[-1]))
 
     def getSelectedDates(self):
         if self.frequency == Frequency.DAILY:
@@ -81,35 +223,40 @@ class Trackable(ABC):
         elif self.frequency == Frequency.MONTHLY:
             return self.getDatesOverRange(
                 pd.date_range(start=self.currentDateRange[0] - pd.Timedelta(self.currentDateRange[0].day, unit='d'), end=self.currentDateRange[-1]))
+        elif self.frequency == Frequency.YEARLY:
+            return self.getDatesOverRange(
+                pd.date_range(start=self.currentDateRange[0] - pd.Timedelta(self.currentDateRange[0].dayofyear, unit='d'), end=self.currentDateRange[-1]))
+
+    # @brief returns the half-open range of positions [lo, hi) in the processed arrays between two dates inclusive
+    def getProcessedIdxRange(self, startDate, endDate):
+        startDate = np.datetime64(pd.Timestamp(startDate).to_datetime64(), 'ns')
+        endDate = np.datetime64(pd.Timestamp(endDate).to_datetime64(), 'ns')
+        lo = np.searchsorted(self.processedDates, startDate, side='left')
+        hi = np.searchsorted(self.processedDates, endDate, side='right')
+        return lo, max(lo, hi)
 
     def getDatesOverRange(self, pdDateRange):
-        return self.processedData.loc[pdDateRange[0]:pdDateRange[-1]].index.to_numpy()
+        lo, hi = self.getProcessedIdxRange(pdDateRange[0], pdDateRange[-1])
+        return self.processedDates[lo:hi]
 
     def getScoresOverDateRange(self, pdDateRange):
-        return self.processedData.loc[pdDateRange[0]:pdDateRange[-1]]['Score'].to_numpy()
+        lo, hi = self.getProcessedIdxRange(pdDateRange[0], pdDateRange[-1])
+        return self.processedScores[lo:hi]
 
     # @brief return true if the processedData in the current date range has any missing data
     # this should only return true when the "Don't Fill" strategy is used to handle missing data
     def selectedRangeHasNaN(self):
-        selData = self.processedData.loc[self.currentDateRange[0]:self.currentDateRange[-1]]
-        return len(selData[selData["Score"].isna()]) > 0
+        return bool(np.any(pd.isna(self.getScoresOverDateRange(self.currentDateRange))))
 
     # @brief returns true if the trackable contains any missing dates in the range nominalDateRange
     # if nominalDateRange is not provided, we look over the trackable's entire date range
     def hasMissingDates(self, nominalDateRange=None):
         if nominalDateRange is None:
-            nominalDateRange = pd.date_range(
-                start=self.rawData.index[0], end=self.rawData.index[-1]
-            )
-            recordedDates = self.rawData.index
+            startDay, endDay = self.rawStore.getStartDay(), self.rawStore.getEndDay()
         else:
-            try:
-                recordedDates = self.rawData.loc[nominalDateRange[0]:nominalDateRange[-1]].index
-            # If the recorded dates are missing part of the nominal date range (causing KeyError),
-            # then it's missing data by definition
-            except KeyError:
-                return True
-        return bool(len(nominalDateRange.difference(recordedDates)))
+            startDay, endDay = DayStore.toDays([nominalDateRange[0], nominalDateRange[-1]])
+        # Any day without a measurement, including days outside of the recorded range, is missing
+        return self.rawStore.countValid(startDay, endDay) < endDay - startDay + 1
 
     def setFillStrategy(self, strat):
         self.fillStrategy = strat
@@ -120,12 +267,8 @@ class Trackable(ABC):
     # Creating the SMALLEST range of dates allowed -- no new entries are created
     @staticmethod
     def alignDatesTrimming(trackableList):
-        # To avoid pointless expansions over empty data after repeated calls, find the first and last NONZERO element
-        startDates = []
-        endDates = []
-        for t in trackableList:
-            startDates.append(t.rawData.index[0])
-            endDates.append(t.rawData.index[-1])
+        startDates = [t.getStartDate() for t in trackableList]
+        endDates = [t.getEndDate() for t in trackableList]
 
         # Look only at the smallest nonzero window
         date_range = pd.date_range(max(startDates), min(endDates))
@@ -142,41 +285,30 @@ class Trackable(ABC):
         endDates = []
         for t in trackableList:
             nonzeroIdxs = np.nonzero(t.getRawScores())[0]
-            startDates.append(t.data.index[nonzeroIdxs[0]])
-            endDates.append(t.data.index[nonzeroIdxs[-1]])
+            startDates.append(t.getRawDates()[nonzeroIdxs[0]])
+            endDates.append(t.getRawDates()[nonzeroIdxs[-1]])
         date_range = pd.date_range(min(startDates), max(endDates))
 
         for t in trackableList:
-            t.setFillStrategy(FillStrategy.ZERO)
+            t.setFillStrategy(FillStrategy.ZEROS)
             t.shiftProcessedDataDates(date_range)
 
     # Combines entries in the dataframe to enforce unique data identifiers
-    def combineDuplicateDates(self):
-        if self.getTrackType() == TrackType.TIME:
-            return
+    # Returns a new dataframe where the scores measured on the same date are combined using getDuplicateReduction()
+    def combineDuplicateDates(self, df):
+        return Resampler.combineDuplicateRows(df, self.getDuplicateReduction())
 
-        df = self.processedData
-        # Dataframe with only rows with duplicate dates
-        duplicates = df[df.index.duplicated()]
-        for duplicate in duplicates.iterrows():
-            duplicateDate = duplicate[0]
-            # Read the values of each duplicate
-            origArr = df.at[duplicateDate, "Score"]
-            numDuplicates = len(origArr)
-            # Combine all entries into a single row and set all others to 0
-            totalCount = np.sum(origArr)
-            combinedArr = np.array([totalCount] + ([0] * (numDuplicates - 1)))
-            df.at[duplicateDate, "Score"] = combinedArr
-
-        # Removes the duplicate rows
-        self.processedData = df.loc[~df.index.duplicated(keep="first")]
+    # @brief how to combine multiple measurements on the same date.  Set duplicateReduction on a subclass to
+    # override the default for its track type
+    def getDuplicateReduction(self):
+        if self.duplicateReduction is not None:
+            return self.duplicateReduction
+        return DuplicateReduction.getDefault(self.getTrackType())
 
     # Do the two trackables' dates overlap at all, or do they occur over disjoint date ranges?
     def overlaps(self, other):
-        d1, d2 = self.getRawDates(), other.getRawDates()
-        start1, end1 = d1[0], d1[-1]
-        start2, end2 = d2[0], d2[-1]
-        # Fast, but assumes that the dates are ordered
+        start1, end1 = self.getStartDate(), self.getEndDate()
+        start2, end2 = other.getStartDate(), other.getEndDate()
         return (start1 < start2 and end1 > end2) or (start1 > start2 and end1 < end2)
 
     # Sets the trackable's currentDateRange property
@@ -207,187 +339,145 @@ class Trackable(ABC):
             self.currentDateRange = monthEnds - np.array(
                 [pd.Timedelta(end.day - 1, unit="d") for end in monthEnds]
             )
+        elif self.frequency == Frequency.YEARLY:
+            # Count each year from January 1st
+            firstOfYear = pd.Timestamp(year=pd.to_datetime(startDate).year, month=1, day=1)
+            self.currentDateRange = pd.date_range(firstOfYear, endDate, freq="YS")
 
-    # Shifts self.processedData to the specified date range and fills missing data using self.fillStrategy
+    # Shifts the processed data to the specified date range and fills missing data using self.fillStrategy
+    # Values are always taken from the raw store, so this is index arithmetic over the requested days
     def shiftProcessedDataDates(self, pdDateRange):
+        if len(pdDateRange) == 0:
+            self.setProcessed(np.empty(0, dtype='datetime64[ns]'), self.rawStore.decode(np.empty(0)))
+            return
+
+        startDay, endDay = DayStore.toDays([pdDateRange[0], pdDateRange[-1]])
+        filled = self.getFilledValues(int(startDay), int(endDay))
+        dates = DayStore.daysToDates(np.arange(startDay, endDay + 1))
+        self.setProcessed(dates, self.rawStore.decode(filled))
+
+    # @brief returns the stored values for every day between startDay and endDay with missing days filled
+    # according to self.fillStrategy
+    def getFilledValues(self, startDay, endDay):
+        values, valid = self.rawStore.getDayRange(startDay, endDay)
+        numDays = len(values)
+        if numDays == 0:
+            return values
+
         # Change how we deal with missing data based on selection
         if self.fillStrategy == FillStrategy.NONE:
-            self.processedData = self.processedData.reindex(
-                pdDateRange, method=None)
+            return values
         elif self.fillStrategy == FillStrategy.ZEROS:
-            self.processedData = self.processedData.reindex(
-                pdDateRange, fill_value=0)
+            values[~valid] = 0
 
-        # Filling with the mean or any method that uses 'fill_value' instead of 'method' must be handled different for times
         elif self.fillStrategy == FillStrategy.MEAN_INCLUSIVE or self.fillStrategy == FillStrategy.MEAN_EXCLUSIVE:
-            dataInRange = self.getScoresOverDateRange(pdDateRange)
-            if self.getTrackType() == TrackType.TIME:
-                meanTimeStr = self.getMeanStrOverDateRange(pdDateRange)
-                baselineDateStr = self.processedData['Score'][0].date().strftime('%Y/%m/%d ')
-                self.processedData = self.processedData.reindex(pdDateRange, fill_value=pd.Timestamp(baselineDateStr + meanTimeStr))
-
-            else:
-                # To get the mean over the entire range, not only days with measurements we first need to fill with zeros
-                if self.fillStrategy == FillStrategy.MEAN_INCLUSIVE:
-                    totalValue = dataInRange.sum()
-                    meanValue = totalValue / (pdDateRange[-1] - pdDateRange[0]).days
-                    self.processedData = self.processedData.reindex(
-                        pdDateRange, fill_value=meanValue)
-                else:
-                    # Default calculation of mean does not consider missing dates
-                    meanValue = self.getMeanOverDateRange(pdDateRange)
-                    self.processedData = self.processedData.reindex(
-                        pdDateRange, fill_value=meanValue)
+            values[~valid] = self.getFillMean(startDay, endDay, values[valid])
 
+        # Missing days take the last measurement before them, even if it's before the start of the range
         elif self.fillStrategy == FillStrategy.FORWARD:
-            self.processedData = self.processedData.reindex(
-                pdDateRange, method='ffill')
+            lastValidIdxs = np.maximum.accumulate(np.where(valid, np.arange(numDays), -1))
+            values = np.where(lastValidIdxs >= 0, values[lastValidIdxs], self.rawStore.getValueBefore(startDay))
         elif self.fillStrategy == FillStrategy.BACKWARD:
-            self.processedData = self.processedData.reindex(
-                pdDateRange, method='bfill')
+            nextValidIdxs = np.minimum.accumulate(np.where(valid, np.arange(numDays), numDays)[::-1])[::-1]
+            values = np.where(nextValidIdxs < numDays, values[np.minimum(nextValidIdxs, numDays - 1)],
+                              self.rawStore.getValueAfter(endDay))
         else:
             raise ValueError(
                 'Attempting to fill values in trackale with invalid strategy {}'.format(self.fillStrategy))
+        return values
+
+    # @brief the stored value used to fill missing days when filling with the mean
+    # Filling with the mean or any method that uses 'fill_value' instead of 'method' must be handled different for times
+    def getFillMean(self, startDay, endDay, measuredValues):
+        if self.getTrackType() == TrackType.TIME:
+            if len(measuredValues) == 0:
+                return np.nan
+            measuredTimes = self.rawStore.decode(measuredValues)
+            meanTimeStr = self.getMeanStrForData(measuredTimes)
+            baselineDateStr = pd.Timestamp(self.getRawScores()[0]).date().strftime('%Y/%m/%d ')
+            return self.rawStore.encode([pd.Timestamp(baselineDateStr + meanTimeStr)])[0]
+
+        startDate, endDate = DayStore.daysToDates([startDay, endDay])
+        if self.fillStrategy == FillStrategy.MEAN_INCLUSIVE:
+            # To get the mean over the entire range, not only days with measurements, divide by the number of days
+            totalValue = self.getRawRangeStats().getSum(startDate, endDate)
+            return totalValue / max(endDay - startDay, 1)
+        # Default calculation of mean does not consider missing dates
+        return self.getRawRangeStats().getMean(startDate, endDate)
 
     # @brief Fill processedData with values according to strategy determined by self.fillStrategy
     # Equivalent to shiftProcessedDataDates called over the entire date range
     def fillEmptyDates(self):
-        date_range = pd.date_range(
-            self.processedData.index[0], self.processedData.index[-1])
-        # Reindex to fill in missing dates with 0's
+        date_range = pd.date_range(self.getStartDate(), self.getEndDate())
         self.shiftProcessedDataDates(date_range)
+        self._filledSpan = (self.rawStore.getStartDay(), self.rawStore.getEndDay(), self.fillStrategy)
 
     # Sets how many measurements to include for each data point in the analysis
     # @param frequency how often to sample data
     # @param grouping whether to sum or average results
-    # @param useCache if True, if the frequency and grouping are unchanged this is a no-op
-    # @param clean set to False if self.processedData has already been copied and cleaned from rawData, else do them now
+    # @param fillStrat how to fill missing dates
+    # @param dateRange the dates to fill, or None to use only the dates with measurements
+    # Results are cached, so repeating a previous calculation doesn't fill or resample again
     def updateCalculation(self, frequency, grouping, fillStrat, dateRange):
         self.fillStrategy = fillStrat
-        self.processedData = copy(self.rawData)
+        key = ProcessedCache.makeKey(frequency, grouping, fillStrat, dateRange, self.rawVersion)
+        cached = self.processedCache.get(key)
+        if cached is not None:
+            self.frequency = frequency
+            self.grouping = grouping
+            self.setProcessed(*cached)
+            return
+
         if dateRange is not None:
-            self.combineDuplicateDates()
             self.shiftProcessedDataDates(dateRange)
+        else:
+            self.resetProcessedData()
 
         self.setFrequency(frequency, grouping)
+        self.processedCache.put(key, self.processedDates, self.processedScores)
 
     def setFrequency(self, frequency, grouping):
         self.frequency = frequency
         self.grouping = grouping
-        if frequency == Frequency.DAILY:
-            pass
-        elif frequency == Frequency.WEEKLY:
-            self.processedData = self.getWeeklyData(grouping=grouping)
-        elif frequency == Frequency.MONTHLY:
-            self.processedData = self.getMonthlyData(grouping=grouping)
-
-    # Perform a running average over each week and returns a new dataframe
-    # With these values
-    # The resulting data is grouped by weeks starting on Monday.  I add padding so that the displayed mean and sum
-    # values for the first and last week are correct
-    # It's the caller's responsibility to set processedData to rawData and clean it first
+        if frequency != Frequency.DAILY:
+            self.setProcessed(*self.groupProcessedData(frequency, grouping))
+
+    # Groups the data into weeks starting on Monday.  The first week is labelled by the Monday prior to the first
+    # measurement, and the displayed mean and sum values for the first and last week only include measured days
+    # It's the caller's responsibility to fill the processed data first
     def getWeeklyData(self, grouping=GroupingMethod.AVERAGE):
-        df = pd.DataFrame()
-        daysPastMonday = self.processedData.index[0].dayofweek
-        dataToSample = copy(self.processedData)
-
-        padDates = pd.date_range(start=(dataToSample.index[0] - pd.Timedelta(daysPastMonday, unit='d')),
-                                 end=dataToSample.index[0] - pd.Timedelta(1, unit='d'))
-
-        # Need to pre-pad data with average value to not change average
-        if daysPastMonday > 0:
-            firstWeekAvg = self.getMeanOverDateRange(pd.date_range(dataToSample.index[0], dataToSample.index[7 - daysPastMonday]))
-            padValue = firstWeekAvg if grouping == GroupingMethod.AVERAGE else 0
-            padding = pd.DataFrame(
-                data={'Score': [padValue] * len(padDates)}, index=padDates)
-            dataToSample = pd.concat([padding, dataToSample])
-
-        # The first of each month included in the range
-        results = []
-        weekFirsts = pd.date_range(
-            start=dataToSample.index[0], end=dataToSample.index[-1], freq='7D')
-        for first in weekFirsts:
-            last = first + pd.Timedelta(6, unit='d')
-            dataInWeek = dataToSample.loc[first:last]
-            if grouping == GroupingMethod.AVERAGE:
-                results.append(self.getMeanForData(dataInWeek['Score']))
-            else:
-                results.append(np.sum(dataInWeek['Score']))
-
-        df = pd.DataFrame(index=weekFirsts, data={'Score': results})
-
-        # NaNs are being implicitly converted to zeros, which is a bug.
-        # Manually replace any entries that contained a NaN with NaN
-        nanDates = dataToSample[np.isnan(dataToSample['Score'])].index
-        # First Monday of each week
-        for date in df.index:
-            thisWeek = pd.date_range(date, date + pd.to_timedelta(6, unit='d'))
-            if np.any([n in thisWeek for n in nanDates]):
-                df['Score'].loc[date] = np.nan
-
-        # Dates after end of range are represented by NaNs followed by a single value
-        # df = df.dropna()
-
-        # NaNs are being implicitly converted to zeros, which is a bug.
-        # This only matters when "Don't Fill" is the grouping strategy
-        # Manually replace any entries that contained a NaN with NaN
-        nanDates = dataToSample[np.isnan(dataToSample['Score'])].index
-        # First Monday of each week
-        for date in df.index:
-            thisWeek = pd.date_range(date, date + pd.to_timedelta(6, unit='d'))
-            if np.any([n in thisWeek for n in nanDates]):
-                df['Score'].loc[date] = np.nan
-
-        # Merge the last two elements if the last one is there by error
-        try:
-            if df.index[-1] - df.index[-2] > pd.to_timedelta(7, unit='d'):
-                df['Score'][-2] += df['Score'][-1]
-                df = df.drop(df.index[-1])
-        except IndexError:
-            pass
-
-        return df
+        return self.getGroupedData(Frequency.WEEKLY, grouping)
 
+    # Groups the data into months labelled by the first of each month
     def getMonthlyData(self, grouping=GroupingMethod.AVERAGE):
-        df = pd.DataFrame()
-        firstDayOfMonth = self.processedData.index[0].day
-        dataToSample = copy(self.processedData)
-
-        padDates = pd.date_range(start=(dataToSample.index[0] - pd.Timedelta(firstDayOfMonth - 1, unit='d')),
-                                 end=dataToSample.index[0] - pd.Timedelta(1, unit='d'))
-
-        # Need to pre-pad data with average value to not change average
-        if firstDayOfMonth > 0:
-            firstMonthDf = dataToSample[(
-                dataToSample.index.month == dataToSample.index[0].month)]
-            padValue = np.mean(firstMonthDf['Score']) if grouping == GroupingMethod.AVERAGE else 0
-            padding = pd.DataFrame(
-                data={'Score': [padValue] * len(padDates)}, index=padDates)
-            dataToSample = pd.concat([padding, dataToSample])
-
-        results = []
-        monthFirsts = pd.date_range(
-            start=dataToSample.index[0], end=dataToSample.index[-1], freq='MS')
-        for first in monthFirsts:
-            last = first + pd.Timedelta(first.days_in_month - 1, unit='d')
-            dataInMonth = dataToSample.loc[first:last]
-            if grouping == GroupingMethod.AVERAGE:
-                results.append(self.getMeanForData(dataInMonth['Score']))
-            else:
-                results.append(np.sum(dataInMonth['Score']))
-        df = pd.DataFrame(index=monthFirsts, data={'Score': results})
-
-        # NaNs are being implicitly converted to zeros, which is a bug.
-        # This only matters when "Don't Fill" is the grouping strategy
-        # Manually replace any entries that contained a NaN with NaN
-        nanDates = dataToSample[np.isnan(dataToSample['Score'])].index
-        # First day of each month
-        for date in df.index:
-            thisMonth = pd.date_range(date, date + pd.to_timedelta(date.daysinmonth - 1, unit='d'))
-            if np.any([n in thisMonth for n in nanDates]):
-                df['Score'].loc[date] = np.nan
-
-        return df
+        return self.getGroupedData(Frequency.MONTHLY, grouping)
+
+    # Groups the data into years labelled by January 1st
+    def getYearlyData(self, grouping=GroupingMethod.AVERAGE):
+        return self.getGroupedData(Frequency.YEARLY, grouping)
+
+    # @brief returns a new dataframe with the processed data grouped into buckets of the given frequency
+    def getGroupedData(self, frequency, grouping=GroupingMethod.AVERAGE):
+        dates, scores = self.groupProcessedData(frequency, grouping)
+        return pd.DataFrame(index=pd.DatetimeIndex(dates), data={'Score': scores})
+
+    # @brief groups the processed data into buckets of the given frequency
+    # Any bucket that contains a NaN is NaN -- this only matters when "Don't Fill" is the fill strategy
+    # @return tuple of (bucket start dates, grouped scores)
+    def groupProcessedData(self, frequency, grouping=GroupingMethod.AVERAGE):
+        dates = self.processedDates
+        scores = self.processedScores
+
+        if self.getTrackType() == TrackType.TIME:
+            # Times can only be averaged, and need the overnight handling done by getMeanForData
+            bucketStarts, bucketIds = Resampler.getBucketIds(dates, frequency)
+            nanMask = np.bincount(bucketIds, weights=pd.isna(scores), minlength=len(bucketStarts)) > 0
+            groups = Resampler.splitByBucket(bucketIds, scores)
+            results = [pd.NaT if hasNaN else self.getMeanForData(group) for group, hasNaN in zip(groups, nanMask)]
+            return bucketStarts.astype('datetime64[ns]'), pd.to_datetime(results).to_numpy()
+
+        index, results = Resampler.resample(dates, scores, frequency, grouping)
+        return index.to_numpy(), results
 
     def isAnalyzable(self):
         return len(self.getProcessedScores()) > 2
@@ -395,19 +485,42 @@ class Trackable(ABC):
     # @brief adds the new entry to the existing trackable
     # @param value to be added in 'Score' field
     # @param date string in format %m/%d/%Y to add
-    # @param time to add, can be None or a string in '%HH:%MM' format
+    # @param time to add, can be None or a string in '%HH:%MM' format.  Raw data is stored per day, so the
+    # time is only kept in the trackable's spreadsheet
     def addEntry(self, value, date, time):
         date = pd.to_datetime(date, format="%m/%d/%Y")
-        if time is None:
-            newEntry = pd.DataFrame({"Date": [date], "Score": [value]})
+        # Only the days around the new entry need to be filled again if the processed data is still the
+        # daily fill over the whole history and the fill doesn't depend on every measurement
+        canPatch = not self.rawStore.isEmpty() and \
+            self._filledSpan == (self.rawStore.getStartDay(), self.rawStore.getEndDay(), self.fillStrategy) and \
+            self.fillStrategy not in (FillStrategy.MEAN_INCLUSIVE, FillStrategy.MEAN_EXCLUSIVE)
+
+        # Multiple entries on the same day are combined the same way as when loading
+        day = self.rawStore.addValue(date, value, self.getDuplicateReduction())
+        self.rawDataChanged()
+
+        if canPatch and day >= self._filledSpan[0]:
+            self.refillAroundDay(day)
         else:
-            time = pd.to_datetime(time, format="%H:%M").time()
-            newEntry = pd.DataFrame({"Date": [date], "Time": [time], "Score": [value]})
-        newEntry = newEntry.set_index("Date")
-        self.rawData = self.rawData.append(newEntry, sort=True)
-        self.processedData = copy(self.rawData)
-
-        # Fills in missing dates and combines entries so dates are unique
-        if len(self.getRawScores()) > 0:
-            self.combineDuplicateDates()
             self.fillEmptyDates()
+
+    # @brief fills the processed data again over the days whose filled value can depend on the given day --
+    # the gaps between the previous and next measurements -- appending any days past the end
+    # Keeps the prefix sums up to date by only re-adding the entries from the first changed day onwards
+    def refillAroundDay(self, day):
+        startDay = self.rawStore.getStartDay()
+        prevDay = self.rawStore.getValidDayBefore(day)
+        nextDay = self.rawStore.getValidDayAfter(day)
+        lo = prevDay + 1 if prevDay is not None else startDay
+        hi = nextDay - 1 if nextDay is not None else self.rawStore.getEndDay()
+
+        filled = self.rawStore.decode(self.getFilledValues(lo, hi))
+        dates = DayStore.daysToDates(np.arange(lo, hi + 1))
+        rangeStats = self._rangeStats
+        self.writeProcessed(lo - startDay, dates, filled)
+        self._filledSpan = (startDay, self.rawStore.getEndDay(), self.fillStrategy)
+
+        if rangeStats is not None and rangeStats.isContiguous and rangeStats.size > 0 and rangeStats.days[0] == startDay:
+            pos = lo - startDay
+            rangeStats.extend(self.processedDates[pos:], self.processedScores[pos:])
+            self._rangeStats = rangeStats
@@ -1,11 +1,14 @@
 from trackables.trackables.trackables import *
 from trackables.variableCategories.trackType import TrackType
 import trackables.trackables.ouraData as OD
+from trackables.trackables.appleHealthImport import AppleHealthImporter
+from trackables.trackables.csvImport import CSVImporter
 
-from util.paths import habitDataPath
-from util.dbInterface import DBInterface
+from util.paths import habitDataPath, appleHealthExportPath
 
+import os
 import pandas as pd
+import numpy as np
 
 
 class UserFactory:
@@ -49,10 +52,12 @@ class HabitFactory:
 
     @staticmethod
     def create(name, df):
+        # Habits may be given every day of the export, with NaN on days they weren't measured
+        scores = df['Score'].dropna()
         trackType = TrackType.CONTINUOUS
-        if len(df['Score']) == 0:
+        if len(scores) == 0:
             trackType = TrackType.EMPTY
-        if len(set(df['Score'])) <= 2:
+        if scores.nunique() <= 2:
             trackType = TrackType.BINARY
 
         if trackType == TrackType.CONTINUOUS:
@@ -60,33 +65,42 @@ class HabitFactory:
         elif trackType == TrackType.BINARY:
             return HabitBinaryTrackable(name, df)
 
+    # @brief pivots HabitBull's long format export (one row per habit per day) into one array for all habits
+    # Multiple values for a habit on the same day are added together, like the habit trackables combine them
+    # @return tuple of (sorted unique dates, sorted habit names, days x habits array with NaN where not measured)
+    @staticmethod
+    def pivotHabits(habitDf):
+        dates = pd.to_datetime(habitDf['CalendarDate'], format='%m/%d/%Y')
+        dayCodes, days = pd.factorize(dates, sort=True)
+        nameCodes, names = pd.factorize(habitDf['HabitName'], sort=True)
+
+        values = habitDf['Value'].to_numpy(dtype=np.float64)
+        measured = ~np.isnan(values)
+        cells = (dayCodes[measured], nameCodes[measured])
+        # Column-major so that each habit's column is contiguous
+        sums = np.zeros((len(days), len(names)), order='F')
+        counts = np.zeros((len(days), len(names)), order='F')
+        np.add.at(sums, cells, values[measured])
+        np.add.at(counts, cells, 1)
+        sums[counts == 0] = np.nan
+        return pd.DatetimeIndex(days), list(names), sums
+
     # Static Methods for loading habit data from existing spreadsheets
     @staticmethod
     def loadAllHabits():
         # Loads data from HabitBull's Excel output
         try:
-            habitDf = pd.read_csv(habitDataPath)
+            habitDf = pd.read_csv(habitDataPath, usecols=['HabitName', 'CalendarDate', 'Value'],
+                                  dtype={'HabitName': str, 'CalendarDate': str, 'Value': np.float64})
         except FileNotFoundError:
             return []
 
-        habitNames = habitDf['HabitName'].tolist()
-        dates = habitDf['CalendarDate'].tolist()
-        scores = habitDf['Value'].tolist()
-
-        DBInterface.makeListDateTimes(dates, '%m/%d/%Y')
-
-        # Create objects for all the unique habit names
-        allDf = pd.DataFrame(data={
-            'Date': dates,
-            'Name': habitNames,
-            'Score': scores
-        })
-        groupedHabits = dict(tuple(allDf.groupby('Name')))
+        dates, names, wide = HabitFactory.pivotHabits(habitDf)
+        # Each habit is given a view of its column rather than a copy, and drops the days it wasn't measured
         allHabits = []
-        for rawDf in list(groupedHabits.values()):
-            rawDf = rawDf.set_index('Date')
-            habitDf = rawDf['Score'].to_frame()
-            name = rawDf['Name'].to_list()[0]
+        for j, name in enumerate(names):
+            habitDf = pd.DataFrame(data={'Score': wide[:, j]}, index=dates, copy=False)
+            habitDf.index.name = 'Date'
             allHabits.append(HabitFactory.create(name, habitDf))
         return allHabits
 
@@ -97,3 +111,49 @@ class NutrientFactory:
     @staticmethod
     def create(name, df):
         return NutrientContinuousTrackable(name, df)
+
+
+class AppleHealthFactory:
+
+    # Creates an Apple Health trackable -- every kind of record is a daily quantity, so all are continuous
+    @staticmethod
+    def create(name, df):
+        if df['Score'].count() == 0:
+            return None
+        return AppleHealthContinuousTrackable(name, df)
+
+    # @brief a trackable for every kind of record in the export, importing it the first time it's seen
+    @staticmethod
+    def loadAllTrackables():
+        if not os.path.exists(appleHealthExportPath):
+            return []
+        dailyDf = AppleHealthImporter.load(appleHealthExportPath)
+        return [AppleHealthFactory.create(name, pd.DataFrame(data={'Score': dailyDf[name]}, index=dailyDf.index))
+                for name in dailyDf.columns]
+
+
+class CSVFactory:
+
+    @staticmethod
+    def create(name, df):
+        # Like HabitBull, the only way to tell whether a measurement is binary is from its values
+        scores = df['Score'].dropna()
+        if len(scores) == 0:
+            return None
+        if scores.nunique() <= 2:
+            return CSVBinaryTrackable(name, df)
+        return CSVContinuousTrackable(name, df)
+
+    # @brief a trackable for every measurement in the export described by the CSVImportSpec
+    @staticmethod
+    def loadAllTrackables(spec):
+        try:
+            dates, names, wide = CSVImporter.read(spec)
+        except FileNotFoundError:
+            return []
+        except ValueError as e:
+            # e.g. a column named in the settings that isn't in the export
+            print('Unable to import {}: {}'.format(spec.name, e))
+            return []
+        return [CSVFactory.create(name, pd.DataFrame(data={'Score': wide[:, j]}, index=dates, copy=False))
+                for j, name in enumerate(names)]
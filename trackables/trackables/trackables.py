@@ -2,6 +2,8 @@ from trackables.trackables.user import UserSource
 from trackables.trackables.ouraRing import OuraTrackable
 from trackables.trackables.habitBull import HabitTrackable
 from trackables.trackables.myFitnessNutrient import NutrientTrackable
+from trackables.trackables.appleHealth import AppleHealthTrackable
+from trackables.trackables.csvSource import CSVTrackable
 from trackables.variableCategories.binaryVariable import BinaryVariable
 from trackables.variableCategories.timeVariable import TimeVariable
 from trackables.variableCategories.continuousVariable import ContinuousVariable
@@ -60,4 +62,21 @@ class HabitBinaryTrackable(HabitTrackable, BinaryVariable):
 # =============== My Fitness Pal Nutrients ========================================
 class NutrientContinuousTrackable(NutrientTrackable, ContinuousVariable):
     def __init__(self, name, df):
-        NutrientTrackable.__init__(self, name, df)
\ No newline at end of file
+        NutrientTrackable.__init__(self, name, df)
+
+
+# =============== Apple Health Records ========================================
+class AppleHealthContinuousTrackable(AppleHealthTrackable, ContinuousVariable):
+    def __init__(self, name, df):
+        AppleHealthTrackable.__init__(self, name, df)
+
+
+# =============== Configured CSV Exports ========================================
+class CSVContinuousTrackable(CSVTrackable, ContinuousVariable):
+    def __init__(self, name, df):
+        CSVTrackable.__init__(self, name, df)
+
+
+class CSVBinaryTrackable(CSVTrackable, BinaryVariable):
+    def __init__(self, name, df):
+        CSVTrackable.__init__(self, name, df)
@@ -1,9 +1,9 @@
-from trackables.variableCategories.variableCategory import VariableCategory
+from trackables.variableCategories.numericVariable import NumericVariable
 from trackables.variableCategories.trackType import TrackType
 import numpy as np
 
 
-class BinaryVariable(VariableCategory):
+class BinaryVariable(NumericVariable):
 
     def getTrackType(self):
         return TrackType.BINARY
@@ -0,0 +1,26 @@
+from trackables.variableCategories.variableCategory import VariableCategory
+from abc import ABC
+
+
+# Categories whose scores are plain numbers can answer range queries from the trackable's prefix sums
+# in constant time instead of slicing processedData each time the selected dates change
+class NumericVariable(VariableCategory, ABC):
+
+    def getMeanOverDateRange(self, pdDateRange):
+        return self.getRangeStats().getMean(pdDateRange[0], pdDateRange[-1])
+
+    def getStdevOverDateRange(self, pdDateRange):
+        return self.getRangeStats().getStdev(pdDateRange[0], pdDateRange[-1])
+
+    def getSumOverDateRange(self, pdDateRange):
+        return self.getRangeStats().getSum(pdDateRange[0], pdDateRange[-1])
+
+    # Number of non-NaN measurements in the range
+    def getCountOverDateRange(self, pdDateRange):
+        return self.getRangeStats().getCount(pdDateRange[0], pdDateRange[-1])
+
+    def getMeanStrOverDateRange(self, pdDateRange):
+        return '{:.2f}'.format(self.getMeanOverDateRange(pdDateRange))
+
+    def getStdevStrOverDateRange(self, pdDateRange):
+        return '{:.2f}'.format(self.getStdevOverDateRange(pdDateRange))
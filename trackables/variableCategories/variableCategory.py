@@ -27,10 +27,10 @@ class VariableCategory(ABC):
         ...
 
     def getMeanOverDateRange(self, pdDateRange):
-        return self.getMeanForData(self.processedData.loc[pdDateRange[0]:pdDateRange[-1]]['Score'])
+        return self.getMeanForData(self.getScoresOverDateRange(pdDateRange))
 
     def getStdevOverDateRange(self, pdDateRange):
-        return self.getStdevForData(self.processedData.loc[pdDateRange[0]:pdDateRange[-1]]['Score'])
+        return self.getStdevForData(self.getScoresOverDateRange(pdDateRange))
 
     def getCurrentMean(self):
         return self.getMeanOverDateRange(self.currentDateRange)
@@ -39,10 +39,10 @@ class VariableCategory(ABC):
         return self.getStdevOverDateRange(self.currentDateRange)
 
     def getMeanStrOverDateRange(self, pdDateRange):
-        return self.getMeanStrForData(self.processedData.loc[pdDateRange[0]:pdDateRange[-1]]['Score'])
+        return self.getMeanStrForData(self.getScoresOverDateRange(pdDateRange))
 
     def getStdevStrOverDateRange(self, pdDateRange):
-        return self.getStdevStrForData(self.processedData.loc[pdDateRange[0]:pdDateRange[-1]]['Score'])
+        return self.getStdevStrForData(self.getScoresOverDateRange(pdDateRange))
 
     def getCurrentMeanStr(self):
         return self.getMeanStrOverDateRange(self.currentDateRange)
@@ -0,0 +1,68 @@
+import importlib
+import threading
+import time
+
+
+# Stand-in for a module that is only imported when one of its attributes is first used
+class LazyModule:
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = LazyImport.importModule(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return '<lazy module {} ({})>'.format(self._name, state)
+
+
+# Facade for the heavy analysis dependencies (scipy, matplotlib, seaborn and the widgets built on them), so that
+# they're imported the first time they're used rather than when the app starts.  Records how long each import took
+# so that the startup cost can be reported with the --import-times flag
+class LazyImport:
+
+    modules = {}
+    # Module name -> seconds taken by its first import, including the modules it imported
+    timings = {}
+    # Whether to print each import as it happens
+    verbose = False
+    lock = threading.Lock()
+
+    # @brief a stand-in that imports the named module on first use
+    @staticmethod
+    def module(name):
+        with LazyImport.lock:
+            if name not in LazyImport.modules:
+                LazyImport.modules[name] = LazyModule(name)
+            return LazyImport.modules[name]
+
+    # @brief imports the named module now, recording how long it took if it wasn't already imported
+    @staticmethod
+    def importModule(name):
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        seconds = time.perf_counter() - start
+        with LazyImport.lock:
+            if name not in LazyImport.timings:
+                LazyImport.record(name, seconds)
+        return module
+
+    @staticmethod
+    def record(name, seconds):
+        LazyImport.timings[name] = seconds
+        if LazyImport.verbose:
+            print('Imported {} in {:.3f}s'.format(name, seconds))
+
+    # @brief prints the time taken by every recorded import, slowest first
+    @staticmethod
+    def report():
+        print('Import times:')
+        for name, seconds in sorted(LazyImport.timings.items(), key=lambda item: -item[1]):
+            print('  {:<40} {:.3f}s'.format(name, seconds))
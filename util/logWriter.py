@@ -0,0 +1,128 @@
+from util.dbInterface import DBInterface
+
+import atexit
+import csv
+import io
+import threading
+
+
+# Writes logged entries to disk on a background thread so that logging never waits on the disk.
+# Lines appended to files (spreadsheet rows, history) and other writes (database inserts) are queued and written
+# together flushInterval seconds after the first of them arrives, with one write per file.  Writes that fail are kept
+# and tried again, waiting twice as long after each failure in a row.  Anything still queued is written on exit, so a
+# crash loses at most one flush interval of entries
+class LogWriter:
+
+    __instance = None
+    __instanceLock = threading.Lock()
+    flushInterval = 0.5
+    # Seconds before failed writes are first tried again, and the most the wait grows to
+    retryDelay = 1.0
+    maxRetryDelay = 30.0
+
+    @staticmethod
+    def instance():
+        with LogWriter.__instanceLock:
+            if LogWriter.__instance is None:
+                LogWriter.__instance = LogWriter()
+        return LogWriter.__instance
+
+    def __init__(self, flushInterval=None):
+        if flushInterval is not None:
+            self.flushInterval = flushInterval
+        # Queued writes in the order they were made, either ('line', path, text) or ('call', function, args)
+        self.pending = []
+        self.lock = threading.Lock()
+        # Only one flush writes at a time, whether from the writer thread or a caller that needs the data on disk
+        self.flushLock = threading.Lock()
+        self.wakeEvent = threading.Event()
+        self.stopEvent = threading.Event()
+        self.thread = None
+        atexit.register(self.stop)
+
+    # @brief queues a line to be appended to the file at path
+    def appendLine(self, path, text):
+        self.enqueue(('line', path, text))
+
+    # @brief queues a spreadsheet row to be appended to the csv at path
+    def appendCsvRow(self, path, values):
+        row = io.StringIO()
+        csv.writer(row, lineterminator='').writerow(values)
+        self.appendLine(path, row.getvalue())
+
+    # @brief queues a call that writes somewhere other than a file, e.g. inserting into the database
+    def call(self, function, *args):
+        self.enqueue(('call', function, args))
+
+    def enqueue(self, item):
+        with self.lock:
+            self.pending.append(item)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='LogWriter', daemon=True)
+                self.thread.start()
+        self.wakeEvent.set()
+
+    def run(self):
+        retryDelay = self.retryDelay
+        while not self.stopEvent.is_set():
+            self.wakeEvent.wait()
+            # Give entries logged in quick succession a chance to be written together
+            self.stopEvent.wait(self.flushInterval)
+            self.wakeEvent.clear()
+            if self.flush():
+                retryDelay = self.retryDelay
+                continue
+            # Try the failed writes again without waiting for something new to be logged, backing off so that
+            # e.g. a spreadsheet left open isn't retried constantly
+            self.stopEvent.wait(retryDelay)
+            retryDelay = min(2 * retryDelay, self.maxRetryDelay)
+            self.wakeEvent.set()
+
+    # @brief writes everything that's queued, blocking until it's on disk
+    # @return whether everything was written, otherwise the writes that failed are queued again
+    def flush(self):
+        with self.flushLock:
+            with self.lock:
+                items, self.pending = self.pending, []
+            if len(items) == 0:
+                return True
+
+            failed = []
+            # Calls are made in order, but all lines for a file go in one write once the calls are done
+            lines = {}
+            for item in items:
+                if item[0] == 'line':
+                    lines.setdefault(item[1], []).append(item[2])
+                    continue
+                try:
+                    item[1](*item[2])
+                except Exception as e:
+                    # e.g. the database is locked by another program
+                    print('Unable to save logged entry, will retry: {}'.format(e))
+                    failed.append(item)
+
+            for path, texts in lines.items():
+                try:
+                    DBInterface.initializeFile(path)
+                    with open(path, 'a') as file:
+                        file.write(''.join(text + '\n' for text in texts))
+                except PermissionError:
+                    print('ERROR! CLOSE THE OPEN SPREADSHEET {} BEFORE LOGGING DATA'.format(path))
+                    failed += [('line', path, text) for text in texts]
+                except OSError as e:
+                    print('Unable to write to {}: {}'.format(path, e))
+                    failed += [('line', path, text) for text in texts]
+
+            # Keep anything that couldn't be written for the next flush
+            if len(failed) > 0:
+                with self.lock:
+                    self.pending = failed + self.pending
+            return len(failed) == 0
+
+    # @brief writes anything still queued and stops the writer thread
+    def stop(self):
+        self.stopEvent.set()
+        self.wakeEvent.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
@@ -7,8 +7,16 @@ projDir = Path(utilDir).parent
 dataDir = os.path.join(projDir, 'rawData')
 processedDataDir = os.path.join(projDir, 'processedData')
 integrationDir = os.path.join(dataDir, 'integrations')
+# Derived files that can always be rebuilt from the raw data
+cacheDir = os.path.join(projDir, 'cache')
+ouraSnapshotDir = os.path.join(cacheDir, 'oura')
+mfpCacheDir = os.path.join(cacheDir, 'mfp')
+appleHealthSnapshotDir = os.path.join(cacheDir, 'appleHealth')
 
 habitDataPath = os.path.join(integrationDir, 'habitBullData.csv')
 MFPDataPath = os.path.join(integrationDir, 'MFPData.csv')
+# Where Apple Health's export.zip is unzipped
+appleHealthExportPath = os.path.join(integrationDir, 'apple_health_export', 'export.xml')
+sqlitePath = os.path.join(dataDir, 'healthData.sqlite')
 settingsPath = os.path.join(utilDir, 'settings.JSON')
 imgPath = os.path.join(projDir, 'images')
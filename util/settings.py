@@ -1,5 +1,7 @@
 import json
 from util.paths import settingsPath
+from util.sqliteStore import SQLiteStore
+from trackables.trackables.csvImport import CSVImportSpec
 
 from widgets.settings.categorySpecifications import CategorySpecifications
 from widgets.settings.panelType import PanelType
@@ -17,7 +19,9 @@ and creates the environment accordingly
 class Settings:
 
     def __init__(self):
-        categorySpecs, self.integrations = self.readSettings()
+        categorySpecs, self.integrations, self.workerCount, self.storageBackend, self.csvImports = self.readSettings()
+        # Panels read and write their entries through the selected backend as soon as they're created
+        SQLiteStore.setEnabled(self.storageBackend == 'SQLite')
         # list of tuples of format (panelSpec, panel class)
 
         self.categoryData = list(
@@ -25,7 +29,7 @@ class Settings:
 
         # The names of all categories, not just the user-defined ones
         self.categoryNames = [category.name for category in
-                              [x[0] for x in self.categoryData]] + self.integrations
+                              [x[0] for x in self.categoryData]] + self.integrations + self.getCSVImportNames()
 
         # Implement lazy loading of windows by only changing when settings
         # have been updated or on first load
@@ -37,8 +41,10 @@ class Settings:
 
 # ======================== Read and Write to / from JSON ========================
     # @brief Reads the data stored in the settings.JSON file
-    # @return tuple containing a list describing each panel and a list with
-    # the name of enabled integratiosn
+    # @return tuple containing a list describing each panel, a list with
+    # the name of enabled integratiosn, the number of worker processes used for analysis
+    # (None to use every core except one), where logged entries are stored ('CSV' or 'SQLite'), and a
+    # CSVImportSpec for each configured CSV export
     def readSettings(self):
         with open(settingsPath, 'r') as read_file:
             data = json.load(read_file)
@@ -58,8 +64,11 @@ class Settings:
 
             # Also check if the user has enabled any extras
             integrations = data['Integrations']
+            workerCount = data.get('Worker Count')
+            storageBackend = data.get('Storage Backend', 'CSV')
+            csvImports = [CSVImportSpec.fromDict(spec) for spec in data.get('CSV Imports', [])]
 
-        return panelSpecList, integrations
+        return panelSpecList, integrations, workerCount, storageBackend, csvImports
 
     # Writes data for the current Settings object to the settings.JSON file
     def writeSettings(self):
@@ -76,7 +85,10 @@ class Settings:
                 }
                 for p in self.getCategorySpecs()
             ],
-            'Integrations': self.integrations
+            'Integrations': self.integrations,
+            'Worker Count': self.workerCount,
+            'Storage Backend': self.storageBackend,
+            'CSV Imports': [spec.toDict() for spec in self.csvImports]
         }
 
         with open(settingsPath, 'w') as write_file:
@@ -130,8 +142,14 @@ class Settings:
     def getPanels(self):
         return [x[1] for x in self.categoryData]
 
+    def getCSVImportNames(self):
+        return [spec.name for spec in self.csvImports]
+
+    def getAllStorageBackends(self):
+        return ['CSV', 'SQLite']
+
     def getAllIntegrations(self):
-        return ['MyFitnessPal', 'Oura Ring', 'HabitBull']
+        return ['MyFitnessPal', 'Oura Ring', 'HabitBull', 'Apple Health']
 
     # @brief marks that the settings have changed
     # and each window needs to be reloaded
@@ -0,0 +1,78 @@
+"""
+Binary cache of the DataFrames parsed from an integration's export (e.g. Oura's JSON or Apple Health's XML)
+Parsing a large export is slow, so the parsed columns are written once as .npy files that later startups load
+(memory-mapping the numeric ones) instead of parsing the export again
+"""
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+
+# Each category is stored in its own directory holding one .npy file per column, the dates as days since the epoch
+# and a meta.json holding the key of the data the columns were built from.  A snapshot is only used when its key
+# matches the one asked for, so that anything stale is transparently rebuilt
+class SnapshotStore:
+
+    metaName = 'meta.json'
+    datesName = 'Date.npy'
+
+    # @brief identifies the export at sourcePath by its name, size and modification time
+    @staticmethod
+    def makeKey(sourcePath):
+        stat = os.stat(sourcePath)
+        return {'source': os.path.basename(sourcePath), 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    @staticmethod
+    def getCategoryDir(category, snapshotDir):
+        return os.path.join(snapshotDir, category)
+
+    # @brief the category's DataFrame (indexed by 'Date') from its snapshot, or None if it's missing or out of date
+    # @param key JSON-serializable value identifying the data, e.g. from makeKey
+    @staticmethod
+    def load(category, key, snapshotDir):
+        categoryDir = SnapshotStore.getCategoryDir(category, snapshotDir)
+        try:
+            with open(os.path.join(categoryDir, SnapshotStore.metaName), 'r') as metaFile:
+                meta = json.load(metaFile)
+            if meta['key'] != key:
+                return None
+
+            days = np.load(os.path.join(categoryDir, SnapshotStore.datesName))
+            columns = {}
+            for i, (name, isNumeric) in enumerate(meta['columns']):
+                path = os.path.join(categoryDir, '{}.npy'.format(i))
+                # Numeric columns are mapped straight from the file, other values (strings, lists) are pickled
+                columns[name] = np.load(path, mmap_mode='r') if isNumeric else np.load(path, allow_pickle=True)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        index = pd.DatetimeIndex(days.astype('datetime64[D]').astype('datetime64[ns]'), name='Date')
+        return pd.DataFrame(data=columns, index=index, columns=[name for name, _ in meta['columns']])
+
+    # @brief writes the category's DataFrame (indexed by 'Date') as its snapshot under the given key
+    # Failing to write only means the data is parsed again next time, so errors are reported and ignored
+    @staticmethod
+    def save(category, key, df, snapshotDir):
+        categoryDir = SnapshotStore.getCategoryDir(category, snapshotDir)
+        try:
+            # Remove the old snapshot first so that a partly written one is never mistaken for a valid one
+            shutil.rmtree(categoryDir, ignore_errors=True)
+            os.makedirs(categoryDir)
+
+            days = df.index.values.astype('datetime64[D]').astype(np.int64)
+            np.save(os.path.join(categoryDir, SnapshotStore.datesName), days)
+            columns = []
+            for i, name in enumerate(df.columns):
+                values = df[name].to_numpy()
+                isNumeric = values.dtype.kind in 'biuf'
+                np.save(os.path.join(categoryDir, '{}.npy'.format(i)), values if isNumeric else values.astype(object),
+                        allow_pickle=not isNumeric)
+                columns.append((name, isNumeric))
+
+            # The meta file is written last and marks the snapshot as complete
+            with open(os.path.join(categoryDir, SnapshotStore.metaName), 'w') as metaFile:
+                json.dump({'key': key, 'columns': columns}, metaFile)
+        except OSError as e:
+            print('Unable to save snapshot {}: {}'.format(categoryDir, e))
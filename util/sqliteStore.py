@@ -0,0 +1,159 @@
+from util.paths import sqlitePath
+
+import os
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+
+
+# Optional storage for the user-logged trackables in a single SQLite file, used instead of one CSV per trackable
+# when the 'Storage Backend' setting is 'SQLite'.
+# Every entry is a row keyed by its trackable's id and the day it was logged (days since the epoch), with an index
+# over both so that a trackable's entries over a range of dates are a single indexed read.  Entries can be edited or
+# deleted in place, and the database runs in WAL mode so reads aren't blocked while an entry is being written.
+# Trackables that still have a CSV from before are imported the first time they're used
+class SQLiteStore:
+
+    __instance = None
+    __instanceLock = threading.Lock()
+    enabled = False
+
+    @staticmethod
+    def instance():
+        with SQLiteStore.__instanceLock:
+            if SQLiteStore.__instance is None:
+                SQLiteStore.__instance = SQLiteStore()
+        return SQLiteStore.__instance
+
+    @staticmethod
+    def setEnabled(enabled):
+        SQLiteStore.enabled = enabled
+
+    @staticmethod
+    def isEnabled():
+        return SQLiteStore.enabled
+
+    def __init__(self, path=sqlitePath):
+        if os.path.dirname(path) and not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        # Panels may be loaded from background threads, so one connection is shared behind a lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        with self.lock, self.connection:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS trackables ('
+                'id INTEGER PRIMARY KEY, panel TEXT NOT NULL, name TEXT NOT NULL, UNIQUE(panel, name))')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'id INTEGER PRIMARY KEY, trackableId INTEGER NOT NULL REFERENCES trackables(id), '
+                'day INTEGER NOT NULL, time TEXT, value REAL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS entriesByDay ON entries(trackableId, day)')
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def toDay(date):
+        return int(np.datetime64(pd.Timestamp(date), 'D').astype(np.int64))
+
+    # @brief the id of the trackable, or None if it isn't stored
+    def getTrackableId(self, panel, name):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT id FROM trackables WHERE panel = ? AND name = ?', (panel, name)).fetchone()
+        return None if row is None else row[0]
+
+    def hasTrackable(self, panel, name):
+        return self.getTrackableId(panel, name) is not None
+
+    # @brief the id of the trackable, adding it if it isn't stored
+    # @param csvPath the trackable's spreadsheet from before, which is imported when the trackable is added
+    def createTrackable(self, panel, name, csvPath=None):
+        with self.lock:
+            trackableId = self.getTrackableId(panel, name)
+            if trackableId is not None:
+                return trackableId
+            with self.connection:
+                trackableId = self.connection.execute(
+                    'INSERT INTO trackables (panel, name) VALUES (?, ?)', (panel, name)).lastrowid
+                if csvPath is not None and os.path.exists(csvPath):
+                    self.importCSV(trackableId, csvPath)
+            return trackableId
+
+    # @brief copies every entry of a trackable's spreadsheet into the database
+    # The spreadsheet itself is left where it is
+    def importCSV(self, trackableId, csvPath):
+        df = pd.read_csv(csvPath, dtype=str)
+        if len(df) == 0:
+            return
+        dates = pd.to_datetime(df.iloc[:, 0], format='%m/%d/%Y', errors='coerce')
+        times = df['Time'] if 'Time' in df.columns else pd.Series([None] * len(df))
+        values = pd.to_numeric(df.iloc[:, -1], errors='coerce')
+        valid = dates.notna().to_numpy()
+        days = dates[valid].to_numpy().astype('datetime64[D]').astype(np.int64)
+        rows = zip([trackableId] * int(valid.sum()), days.tolist(),
+                   [None if pd.isna(t) else t for t in times[valid]],
+                   [None if pd.isna(v) else float(v) for v in values[valid]])
+        with self.lock:
+            self.connection.executemany(
+                'INSERT INTO entries (trackableId, day, time, value) VALUES (?, ?, ?, ?)', rows)
+
+    # @brief stores a single entry
+    # @param date anything pandas can read as a date, e.g. a string in %m/%d/%Y format
+    # @param time string in %H:%M format, or None if only the date is tracked
+    # @return the id of the new entry
+    def addEntry(self, panel, name, date, time, value):
+        with self.lock, self.connection:
+            trackableId = self.createTrackable(panel, name)
+            return self.connection.execute(
+                'INSERT INTO entries (trackableId, day, time, value) VALUES (?, ?, ?, ?)',
+                (trackableId, SQLiteStore.toDay(date), time, value)).lastrowid
+
+    # @brief the trackable's entries from startDate to endDate inclusive, sorted by date
+    # @return tuple of numpy arrays (datetime64[D] dates, times as strings or None, float64 values, entry ids)
+    def readRange(self, panel, name, startDate=None, endDate=None):
+        query = 'SELECT day, time, value, entries.id FROM entries JOIN trackables ON trackables.id = trackableId ' \
+                'WHERE panel = ? AND name = ?'
+        params = [panel, name]
+        if startDate is not None:
+            query += ' AND day >= ?'
+            params.append(SQLiteStore.toDay(startDate))
+        if endDate is not None:
+            query += ' AND day <= ?'
+            params.append(SQLiteStore.toDay(endDate))
+        with self.lock:
+            rows = self.connection.execute(query + ' ORDER BY day, entries.id', params).fetchall()
+
+        days, times, values, ids = zip(*rows) if len(rows) > 0 else ((), (), (), ())
+        return (np.array(days, dtype=np.int64).astype('datetime64[D]'), np.array(times, dtype=object),
+                np.array([np.nan if v is None else v for v in values], dtype=np.float64), np.array(ids, dtype=np.int64))
+
+    # @brief changes the given fields of a stored entry, leaving the rest as they are
+    def updateEntry(self, entryId, date=None, time=None, value=None):
+        changes = {}
+        if date is not None:
+            changes['day'] = SQLiteStore.toDay(date)
+        if time is not None:
+            changes['time'] = time
+        if value is not None:
+            changes['value'] = value
+        if len(changes) == 0:
+            return
+        with self.lock, self.connection:
+            self.connection.execute('UPDATE entries SET {} WHERE id = ?'.format(
+                ', '.join('{} = ?'.format(column) for column in changes)), list(changes.values()) + [entryId])
+
+    def deleteEntry(self, entryId):
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM entries WHERE id = ?', (entryId,))
+
+    # @brief removes the trackable and all of its entries
+    def deleteTrackable(self, panel, name):
+        with self.lock, self.connection:
+            trackableId = self.getTrackableId(panel, name)
+            if trackableId is None:
+                return
+            self.connection.execute('DELETE FROM entries WHERE trackableId = ?', (trackableId,))
+            self.connection.execute('DELETE FROM trackables WHERE id = ?', (trackableId,))
@@ -128,6 +128,11 @@ class AnalysisControlWidget(LightGrayWidget):
     # Called whenever one of the combo boxes is updated -> changes the currentTrackables member
     # That stores the reference that plotWidget and metricWidget reference
     def updateSelectedTrackables(self):
+        # Any analysis still running is for the previous selection
+        self.analyzeWindow.cancelAnalysis()
+        if self.plotUpdateBut.text() == "Updating Analysis...":
+            self.plotUpdateBut.setText("Update Analysis")
+
         if self.variate == Variate.UNIVARIATE:
             curTrackable = self.getSelectedTrackable(ComboType.SINGLE)
             if curTrackable is not None:
@@ -190,6 +195,8 @@ class AnalysisControlWidget(LightGrayWidget):
         self.plotUpdateBut.setText("Update Analysis" if validDates else "Invalid Dates Selected")
         if not validDates:
             return
+        # A running analysis is for the previous dates
+        self.analyzeWindow.cancelAnalysis()
 
         comboTypes = (
             [ComboType.SINGLE]
@@ -253,11 +260,11 @@ class AnalysisControlWidget(LightGrayWidget):
             for g in self.groupingWidgets.values()
         ]
 
-        self.currentTrackables.updateCalculation(
-            freq, groupMethods, fillStrats, dateRange)
-        # Update the rest of the widgets
+        # The calculation and tests run in the background, and analyzeWindow updates the rest of the widgets
+        # once they're done
         # self.updateTrackableDateSelection()
-        self.analyzeWindow.updateAnalysisWidgets()
+        self.plotUpdateBut.setText("Updating Analysis...")
+        self.analyzeWindow.submitAnalysis(freq, groupMethods, fillStrats, dateRange)
 
     # @brief open a file explorer dialog and prompt the user to save
     # the cleaned data that is currently stored in self.currentTrackables
@@ -297,7 +304,7 @@ class AnalysisControlWidget(LightGrayWidget):
             self.updateGroupingOptions(c)
 
         activeCombos = [ComboType.SINGLE] if self.variate == Variate.UNIVARIATE else [ComboType.X, ComboType.Y]
-        showAny = self.getSelectedFrequency() in [Frequency.WEEKLY, Frequency.MONTHLY]
+        showAny = self.getSelectedFrequency() in [Frequency.WEEKLY, Frequency.MONTHLY, Frequency.YEARLY]
         if not showAny:
             for c in ComboType.list():
                 hideWidget(c)
@@ -475,6 +482,10 @@ class AnalysisControlWidget(LightGrayWidget):
         fillToChange.setVisible(True)
 
     def updateFillStrategy(self, comboType):
+        # A running analysis is for the previous fill strategy
+        self.analyzeWindow.cancelAnalysis()
+        if self.plotUpdateBut.text() == "Updating Analysis...":
+            self.plotUpdateBut.setText("Update Analysis")
         trackableToUpdate = self.getSelectedTrackable(comboType)
         stratText = self.fillWidgets[comboType].getSelectedText()
         strat = FillStrategy.mapStratStringToEnum(stratText)
@@ -513,8 +524,8 @@ class AnalysisControlWidget(LightGrayWidget):
         return dateLabel
 
     def updateDateDisplays(self, trackable, comboType):
-        minDateStr = trackable.rawData.index[0].strftime('%m/%d/%Y')
-        maxDateStr = trackable.rawData.index[-1].strftime('%m/%d/%Y')
+        minDateStr = trackable.getStartDate().strftime('%m/%d/%Y')
+        maxDateStr = trackable.getEndDate().strftime('%m/%d/%Y')
         rangeStr = f'{trackable.name} has data between {minDateStr} and {maxDateStr}'
         self.dateDisplays[comboType].setText(rangeStr)
 
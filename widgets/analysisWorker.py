@@ -0,0 +1,81 @@
+from PyQt5.QtCore import *
+
+import traceback
+
+
+# Signals need to belong to a QObject, which QRunnable isn't
+class AnalysisSignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+# A single analysis request run on a thread from the pool
+# The job is passed a function returning whether its request is still the latest one,
+# so that long jobs can stop early once they've been superseded
+class AnalysisTask(QRunnable):
+
+    def __init__(self, generation, job, runner):
+        super().__init__()
+        self.generation = generation
+        self.job = job
+        self.runner = runner
+        self.signals = AnalysisSignals()
+
+    def run(self):
+        if not self.isCurrent():
+            return
+        try:
+            result = self.job(self.isCurrent)
+        except Exception:
+            self.signals.failed.emit(self.generation, traceback.format_exc())
+            return
+        if self.isCurrent():
+            self.signals.finished.emit(self.generation, result)
+
+    def isCurrent(self):
+        return self.runner.isCurrent(self.generation)
+
+
+# Runs analysis requests in the background so the window stays responsive.
+# Every request is given a new generation number -- submitting a new request or cancelling supersedes all of
+# the earlier ones, and only the result of the latest request is passed back on the GUI thread.
+# Requests run one at a time so a superseded request never competes with the latest one for the CPU
+class AnalysisRunner(QObject):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.generation = 0
+
+    # @brief runs job(isCurrent) on the pool and calls onFinished(result) on the GUI thread if it's still the latest
+    # @param onFailed function called on the GUI thread if the latest request raises, or None
+    def submit(self, job, onFinished, onFailed=None):
+        self.cancel()
+        task = AnalysisTask(self.generation, job, self)
+        # Signals emitted from the pool's thread are queued to this object's (the GUI) thread
+        task.signals.finished.connect(lambda generation, result: self.deliver(generation, result, onFinished))
+        task.signals.failed.connect(lambda generation, message: self.reportFailure(generation, message, onFailed))
+        self.pool.start(task)
+
+    # @brief supersedes every request made so far, removing any that haven't started yet
+    def cancel(self):
+        self.generation += 1
+        self.pool.clear()
+
+    def isCurrent(self, generation):
+        return generation == self.generation
+
+    def isBusy(self):
+        return self.pool.activeThreadCount() > 0
+
+    def deliver(self, generation, result, onFinished):
+        # A newer request may have been made after this one finished but before its result arrived
+        if self.isCurrent(generation):
+            onFinished(result)
+
+    def reportFailure(self, generation, message, onFailed):
+        if self.isCurrent(generation):
+            print('Analysis failed:\n' + message)
+            if onFailed is not None:
+                onFailed()
@@ -5,7 +5,9 @@ from PyQt5.QtCore import *
 import pandas as pd
 from xlrd import XLRDError
 import os
+import tempfile
 from abc import abstractmethod
+from collections import deque
 from zipfile import BadZipFile  # Protects against erorr from corrupted spreadsheet
 
 from widgets.dateTimeWidget import DateTimeWidget
@@ -15,10 +17,15 @@ import trackables.trackableManager as manager
 
 from util.paths import dataDir
 from util.dbInterface import DBInterface
+from util.sqliteStore import SQLiteStore
+from util.logWriter import LogWriter
 
 
 class BaseLogWidget(QWidget):
 
+    # Number of the most recent history entries shown in the panel
+    historyLength = 200
+
     # Panel for all kinds of illicit Behaviors
     def __init__(self, panelName, trackableNames, trackedTime, scoreWord, isBinary):
         super().__init__()
@@ -36,6 +43,8 @@ class BaseLogWidget(QWidget):
         self.layout.addWidget(self.label)
 
         # Add label that displays recent history
+        # The history file is only read here, after which new entries are kept in memory as they're logged
+        self.history = self.readHistory()
         self.historyLabel = HistoryLabel(self)
         self.refreshHistoryLabel()
         self.layout.addWidget(self.historyLabel)
@@ -45,6 +54,10 @@ class BaseLogWidget(QWidget):
 
         # Make sure that the logging sheet contains tab for data and create if not
         for i in trackableNames:
+            if SQLiteStore.isEnabled():
+                # Entries already logged to the trackable's spreadsheet are moved over the first time
+                SQLiteStore.instance().createTrackable(panelName, i, self.getSpreadsheetPath(i))
+                continue
             try:
                 pd.read_csv(self.getSpreadsheetPath(i))
             # If the category of trackables or specific trackable within category has not yet been created
@@ -80,6 +93,30 @@ class BaseLogWidget(QWidget):
     def getTrackables(self):
         ...
 
+    # @brief reads every entry of the trackable into a DataFrame indexed by date, with a column for the time (if
+    # tracked) and the panel's score word
+    # Raises FileNotFoundError if the trackable has no spreadsheet
+    def readTrackableDf(self, trackableName):
+        # Entries that were just logged may not have been written yet
+        LogWriter.instance().flush()
+        if SQLiteStore.isEnabled():
+            dates, times, values, _ = SQLiteStore.instance().readRange(self.panelName, trackableName)
+            data = {'Date': dates.astype('datetime64[ns]')}
+            if self.trackedTime == LogTime.DATE_AND_TIME:
+                data['Time'] = [DBInterface.convertToDateTime(t, '%H:%M') for t in times]
+            data[self.scoreWord] = values
+            return pd.DataFrame(data=data).set_index('Date')
+
+        df = pd.read_csv(self.getSpreadsheetPath(trackableName))
+        df['Date'] = df['Date'].apply(
+            lambda x: DBInterface.convertToDateTime(x, '%m/%d/%Y'))
+        if self.trackedTime == LogTime.DATE_AND_TIME:
+            df['Time'] = df['Time'].apply(
+                lambda x: DBInterface.convertToDateTime(x, '%H:%M'))
+        df = df.set_index('Date')
+        df.sort_index(inplace=True)
+        return df
+
     # @brief after logging a trackable, we need to update its current representation for use ASAP
     def updateSavedTrackable(self, trackableName, servings, date, time):
         trackable = manager.TrackableManager.instance().getTrackableFromName(trackableName)
@@ -88,52 +125,59 @@ class BaseLogWidget(QWidget):
     # Default implementation for saving an item in a spreadsheet
     # Works for checkbox and button implementation, where the box/button
     # name corresponds to the the sheet name in a master spreadsheet
+    # The entry is written in the background, so errors are reported (and the write retried) by the LogWriter
     def saveItem(self, name, servings, date, time):
         if time is None:
-            nextRow = pd.DataFrame({
-                'Date': [date],
-                self.scoreWord: [servings]
-            })
+            nextRow = [date, servings]
             msg = '{} logged for {}'.format(name, date)
 
         else:
-            nextRow = pd.DataFrame({
-                'Date': [date],
-                'Time': [time],
-                self.scoreWord: [servings]
-            })
+            nextRow = [date, time, servings]
             msg = '{} logged for {} {}'.format(name, time, date)
 
         self.writeEntry(msg)
-        try:
-            DBInterface.append_df_to_csv(self.getSpreadsheetPath(name), nextRow)
-        except PermissionError:
-            print('ERROR! CLOSE THE OPEN SPREADSHEET BEFORE LOGGING DATA')
-            return False
-        return True
+        if SQLiteStore.isEnabled():
+            LogWriter.instance().call(SQLiteStore.instance().addEntry, self.panelName, name, date, time, servings)
+        else:
+            LogWriter.instance().appendCsvRow(self.getSpreadsheetPath(name), nextRow)
 
     def openSheet(self, trackableName):
-        sheetPath = self.getSpreadsheetPath(trackableName)
+        sheetPath = self.exportSheet(trackableName) if SQLiteStore.isEnabled() else self.getSpreadsheetPath(trackableName)
         try:
             os.startfile(sheetPath)
         except FileNotFoundError:
             print('Unable to open spreadsheet {}'.format(sheetPath))
 
-    def refreshHistoryLabel(self):
+    # @brief writes the trackable's entries in the database to a temporary spreadsheet laid out like the CSV backend's
+    # Edits to the exported spreadsheet aren't read back into the database
+    # @return path to the spreadsheet
+    def exportSheet(self, trackableName):
+        LogWriter.instance().flush()
+        dates, times, values, _ = SQLiteStore.instance().readRange(self.panelName, trackableName)
+        data = {'Date': pd.DatetimeIndex(dates.astype('datetime64[ns]')).strftime('%m/%d/%Y')}
+        if self.trackedTime == LogTime.DATE_AND_TIME:
+            data['Time'] = times
+        data[self.scoreWord] = values
+        sheetPath = os.path.join(tempfile.gettempdir(), '{} {}.csv'.format(self.panelName, trackableName))
+        pd.DataFrame(data=data).to_csv(sheetPath, index=False)
+        return sheetPath
+
+    # @brief the most recent entries of the history file
+    def readHistory(self):
         try:
             with open(self.getHistoryFilePath(), 'r') as file:
-                self.historyLabel.setText(file.read())
+                return deque(file.read().splitlines(), maxlen=self.historyLength)
         except FileNotFoundError:
-            self.historyLabel.setText('')
+            return deque(maxlen=self.historyLength)
+
+    def refreshHistoryLabel(self):
+        self.historyLabel.setText(''.join(line + '\n' for line in self.history))
 
     # Logs the entry that was just made to the history file and
     # tells the history label to refresh with new line
     def writeEntry(self, message):
-        try:
-            with open(self.getHistoryFilePath(), 'a+') as file:
-                file.write(message + '\n')
-        except FileNotFoundError:
-            pass
+        self.history.append(message)
+        LogWriter.instance().appendLine(self.getHistoryFilePath(), message)
         self.refreshHistoryLabel()
 
 
@@ -1,5 +1,7 @@
 from trackables.trackables.trackableFactories import UserFactory
 from trackables.variableCategories.trackType import TrackType
+from trackables.resampler import Resampler
+from stats.duplicateReduction import DuplicateReduction
 from widgets.baseLogWidget import BaseLogWidget
 from widgets.settings.logTime import LogTime
 
@@ -64,17 +66,11 @@ class BinaryLogWidget(BaseLogWidget):
         allTrackables = []
         for name in self.checkboxItems:
             try:
-                df = pd.read_csv(self.getSpreadsheetPath(name))
-                df['Date'] = df['Date'].apply(
-                    lambda x: DBInterface.convertToDateTime(x, '%m/%d/%Y'))
-                if self.trackedTime == LogTime.DATE_AND_TIME:
-                    df['Time'] = df['Time'].apply(
-                        lambda x: DBInterface.convertToDateTime(x, '%H:%M'))
-                df = df.set_index('Date')
-                df.sort_index(inplace=True)
+                df = self.readTrackableDf(name)
 
                 scoreDf = df.rename(columns={self.scoreWord: 'Score'})
                 trackType = TrackType.BINARY if self.isBinary else TrackType.CONTINUOUS
+                scoreDf = Resampler.combineDuplicateRows(scoreDf, DuplicateReduction.getDefault(trackType))
                 nextTrackable = UserFactory.create(name, scoreDf, trackType, self.trackedTime)
                 allTrackables.append(nextTrackable)
 
@@ -1,6 +1,7 @@
-from widgets.settings.logTime import LogTime
 from trackables.trackables.trackableFactories import UserFactory
 from trackables.variableCategories.trackType import TrackType
+from trackables.resampler import Resampler
+from stats.duplicateReduction import DuplicateReduction
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
@@ -63,19 +64,13 @@ class ContinuousLogWidget(BaseLogWidget):
         allTrackables = []
         for name in self.buttonNames:
             try:
-                df = pd.read_csv(self.getSpreadsheetPath(name))
-                df['Date'] = df['Date'].apply(
-                    lambda x: DBInterface.convertToDateTime(x, '%m/%d/%Y'))
-                if self.trackedTime == LogTime.DATE_AND_TIME:
-                    df['Time'] = df['Time'].apply(
-                        lambda x: DBInterface.convertToDateTime(x, '%H:%M'))
-                df = df.set_index('Date')
-                df.sort_index(inplace=True)
+                df = self.readTrackableDf(name)
                 trackType = TrackType.BINARY if self.isBinary else TrackType.CONTINUOUS
 
                 # Everything needs to be tabulated by the general 'Score' column name, not servings
-                nextTrackable = UserFactory.create(name, df.rename(columns={
-                                          self.scoreWord: 'Score'}), trackType, self.trackedTime)
+                scoreDf = df.rename(columns={self.scoreWord: 'Score'})
+                scoreDf = Resampler.combineDuplicateRows(scoreDf, DuplicateReduction.getDefault(trackType))
+                nextTrackable = UserFactory.create(name, scoreDf, trackType, self.trackedTime)
                 allTrackables.append(nextTrackable)
 
             except FileNotFoundError:
@@ -1,18 +1,23 @@
 from trackables.variableCategories.trackType import TrackType
+from stats.correlationMatrix import CorrelationMatrix
+from stats.matrixExecutor import MatrixExecutor
+from util.lazyImport import LazyImport
 
 from matplotlib.backends.backend_qt5agg import FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
 
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 
+plt = LazyImport.module('matplotlib.pyplot')
+sns = LazyImport.module('seaborn')
+
+
 '''
 HeatmapWidget class is responsible for populating the heatmap's matrix using statistical tests
 in TrackableGroup and displaying the resulting heatmap on a FigureCanvas
@@ -49,14 +54,14 @@ class HeatmapWidget(FigureCanvas):
         self.trackablesToHeatmap(
             trackGroup.getTrackables(), test=test, lagDays=lagDays)
 
-    def trackablesToHeatmap(self, trackables, test='Pearson', lagDays=0):
+    def trackablesToHeatmap(self, trackables, test='Pearson', lagDays=0, numWorkers=None, progressCallback=None):
         if len(trackables) < 2:
             print('Cannot make heatmap with less than 2 trackables')
             return
 
         self.ax.clear()
         corrMatrix = self.makeRelationshipMatrix(
-            trackables, test, lagDays=lagDays)
+            trackables, test, lagDays=lagDays, numWorkers=numWorkers, progressCallback=progressCallback)
         names = [t.name for t in trackables]
         corrDf = self.relationshipMatrixToDF(corrMatrix, names)
         self.displayHeatmap(
@@ -123,31 +128,19 @@ class HeatmapWidget(FigureCanvas):
 
         self.draw()
 
-    def makeRelationshipMatrix(self, trackables, test, lagDays=0):
-        # We need some way to index each trackable and compute the 'correlation' value between all elements
-        corrs = np.zeros((len(trackables), len(trackables)))
-        for i in range(len(trackables)):
-            for j in range(len(trackables)):
-
-                # No need to recalculate elements for symmetric tests (correlation with 0 lag)
-                if lagDays == 0 and test.isSymmetric():
-                    if corrs[i][j] != 0:
-                        corrs[j][i] = corrs[i][j]
-                        continue
-                    if corrs[j][i] != 0:
-                        corrs[i][j] = corrs[j][i]
-                        continue
-
-                # I don't currently have a way to deal with times, so skip
-                # (leaves correlation as 0 which is fine)
-                if trackables[i].getTrackType() == TrackType.TIME or \
-                        trackables[j].getTrackType() == TrackType.TIME:
-                    continue
-
-                # compute the correlation for the current elements
-                corrs[i][j] = test.runTestForLag(trackables[i], trackables[j], lag=lagDays)
-
-        return corrs
+    # @brief computes the relationship between every pair of trackables
+    # Pearson correlations are all computed together by CorrelationMatrix, other tests are run pair by pair
+    # in a pool of worker processes
+    # @param numWorkers processes to use for the other tests, or None to use every core except one
+    # @param progressCallback called with (completed pairs, total pairs) as results arrive
+    def makeRelationshipMatrix(self, trackables, test, lagDays=0, numWorkers=None, progressCallback=None):
+        if test == 'Pearson':
+            return CorrelationMatrix.pearsonForTrackables(trackables, lagDays=lagDays)
+
+        # Time trackables are left out of the aligned data, so their relationships stay at 0
+        _, data = CorrelationMatrix.alignTrackables(trackables)
+        binaryColumns = [t.getTrackType() == TrackType.BINARY for t in trackables]
+        return MatrixExecutor(numWorkers).computeMatrix(data, test, lagDays, binaryColumns, progressCallback)
 
     def relationshipMatrixToDF(self, corrMatrix, trackableNames):
         corrDf = pd.DataFrame(
@@ -50,7 +50,8 @@ class MetricWidget(QWidget):
         self.analyzeWindow = analyzeWindow
 
     # @brief Deletes all current UI elements, then creates new ones for currently selected trackable group
-    def updatePanels(self):
+    # @param testResults results computed by TestsHomePanel.computeTestResults, or None to run the tests here
+    def updatePanels(self, testResults=None):
         self.trackableHomePanel.clear()
         self.testsHomePanel.clear()
 
@@ -59,7 +60,7 @@ class MetricWidget(QWidget):
         self.setDateRangeText(trackables[0].getSelectedDates())
 
         self.trackableHomePanel.updateFromGroup(trackableGroup)
-        self.testsHomePanel.updateFromGroup(trackableGroup)
+        self.testsHomePanel.updateFromGroup(trackableGroup, testResults)
 
     # @brief Sets the text of the QLabel displaying the date range over which analysis is being done
     def setDateRangeText(self, dates):
@@ -231,7 +232,8 @@ class TestsHomePanel(AbstractHomePanel):
 
     # @brief For the provided trackable group add UI elements for each test being performed
     # TODO: Automatically select between binary impact and continuous imact based on trackable types
-    def updateFromGroup(self, trackableGroup):
+    # @param testResults dictionary from each test's name to its results for the selected lag range, or None
+    def updateFromGroup(self, trackableGroup, testResults=None):
         for panel in [self.grangerPanel, self.linearRegressionPanel, self.impactPanel]:
             if panel is not None:
                 self.testsLayout.removeWidget(panel)
@@ -242,14 +244,34 @@ class TestsHomePanel(AbstractHomePanel):
 
         if multi:
             lagRange = self.getSelectedRange()
-            self.grangerPanel = GrangerCausalityPanel(lagRange, trackableGroup)
+            testResults = testResults if testResults is not None else {}
+            self.grangerPanel = GrangerCausalityPanel(lagRange, trackableGroup, testResults.get('Granger'))
             self.linearRegressionPanel = LinearRegressionPanel(
-                lagRange, trackableGroup)
+                lagRange, trackableGroup, testResults.get('Pearson'))
             self.impactPanel = ImpactPanel(
-                lagRange, trackableGroup)
+                lagRange, trackableGroup, testResults.get('Impact'))
 
             self.updateActiveTest()
 
+    # @brief runs every test shown for the group over lagRange without creating any widgets,
+    # so that it can be done away from the GUI thread
+    # @param isCurrent function returning False once the results are no longer needed
+    # @return dictionary from each test's name to its (magnitudes, p-values), empty if the tests can't be run
+    @staticmethod
+    def computeTestResults(trackableGroup, lagRange, isCurrent=lambda: True):
+        results = {}
+        if len(trackableGroup.getTrackables()) < 2 or not AbstractTestPanel.canRunTests(trackableGroup):
+            return results
+
+        dep, indep = trackableGroup.dependentT, trackableGroup.independentT
+        for name, panelType in [('Pearson', LinearRegressionPanel), ('Granger', GrangerCausalityPanel),
+                                ('Impact', ImpactPanel)]:
+            if not isCurrent():
+                break
+            test = panelType.createTest(trackableGroup)
+            results[name] = test.runTestOverRange(dep, indep, minLag=lagRange[0], maxLag=lagRange[-1])
+        return results
+
     # Updates which test to display based on combo box selection
     def updateActiveTest(self):
         nameToPanelMap = {'Pearson': self.linearRegressionPanel,
@@ -4,7 +4,6 @@ import numpy as np
 import pandas as pd
 from enum import Enum
 from copy import deepcopy as copy
-from scipy.interpolate import make_interp_spline
 
 from matplotlib.figure import Figure
 import matplotlib.dates as mdates
@@ -16,6 +15,9 @@ from stats.fillStrategy import FillStrategy
 
 from trackables.variableCategories.trackType import TrackType
 from stats.frequency import Frequency
+from util.lazyImport import LazyImport
+
+scipyInterpolate = LazyImport.module('scipy.interpolate')
 
 
 class PlotWidget(FigureCanvas):
@@ -103,27 +105,9 @@ class PlotWidget(FigureCanvas):
             if freq == Frequency.DAILY:
                 # This will be trickier when figuring out weekly or monthly
                 # Add X marks over missing dates
-                missingDates = trackable.getMissingDates()
-                missingVals = np.array([])
-                if y_type == TrackType.TIME:
-                    missingVals.dtype = 'datetime64[ns]'
-                xList = list(x_range)
-                startIdx = 0    # Since missing dates are sorted, constantly update start of searched indices
-
-                for md in missingDates:
-                    try:
-                        idx = xList.index(md, startIdx, len(xList))
-                        startIdx = idx
-                        missingVals = np.append(y_range[idx], missingVals)
-                    except ValueError:
-                        pass
-                    except TypeError:
-                        pass
-
-                if len(missingDates) == len(missingVals):
-                    # Hope that missingVals and missingDates are the same dimensions
-                    # This won't be the case if not filling missing data
-                    ax.plot(missingDates, missingVals, 'x', markersize=12, color=color)
+                missingIdxs = trackable.getSelectedMissingIdxs()
+                if len(missingIdxs) > 0:
+                    ax.plot(np.asarray(x_range)[missingIdxs], np.asarray(y_range)[missingIdxs], 'x', markersize=12, color=color)
 
             if y_type != TrackType.TIME:
                 for tick in ax.get_yticklabels():
@@ -150,14 +134,14 @@ class PlotWidget(FigureCanvas):
                 timeIdxs = pd.DatetimeIndex(y_range)
                 # This stores the number of seconds from the beginning of the given
                 seconds = [(3600 * t.hour) + (60 * t.minute) + t.second for t in timeIdxs]
-                xySpline = make_interp_spline(x_range, seconds)
+                xySpline = scipyInterpolate.make_interp_spline(x_range, seconds)
                 splineSeconds = xySpline(xSpline)
                 # Add a flat number of seconds to bring the measure to the seconds since the epoch, not just the beginning of the day
                 secsFrom1900To1970 = 2208988800
                 splinedTimes = np.array([pd.Timestamp(s - secsFrom1900To1970, unit='s').to_datetime64() for s in splineSeconds], dtype='datetime64[ns]')
                 ax.plot(xSpline, splinedTimes, color=color)
             else:
-                xySpline = make_interp_spline(x_range, y_range)
+                xySpline = scipyInterpolate.make_interp_spline(x_range, y_range)
                 ySpline = xySpline(xSpline)
                 ax.plot(xSpline, ySpline, color=color)   # Plot the spline without markers
 
@@ -63,12 +63,43 @@ class IntegrationSelector(AbstractSelector):
         settings.integrations = integrations
         settings.categoryNames = [
             category.name for category in [x[0] for x in settings.categoryData]
-        ] + integrations
+        ] + integrations + settings.getCSVImportNames()
 
         settings.writeSettings()
         sw.SettingsWindow.updateDisplay()
 
 
+class StorageSelector(AbstractSelector):
+    def __init__(self):
+        super().__init__("Storage")
+
+        self.buttonGroup = QButtonGroup()
+        self.buttonLayout = QVBoxLayout()
+        self.buttonLayout.setAlignment(Qt.AlignCenter)
+        buttonBackground = QWidget()
+        buttonBackground.setLayout(self.buttonLayout)
+        self.layout.addWidget(buttonBackground)
+
+        for idx, backend in enumerate(settings.getAllStorageBackends()):
+            newButton = QRadioButton(backend, self)
+            self.buttonGroup.addButton(newButton, idx)
+            self.buttonLayout.addWidget(newButton)
+            newButton.setChecked(backend == settings.storageBackend)
+            newButton.clicked.connect(self.updateStorageBackend)
+
+        # Panels open their storage when they're created, so switching only applies to the next launch
+        self.restartLabel = CenteredLabel("Restart to use the selected storage")
+        self.restartLabel.setVisible(False)
+        self.layout.addWidget(self.restartLabel)
+        self.layout.addStretch(1)
+
+    def updateStorageBackend(self):
+        settings.storageBackend = self.buttonGroup.checkedButton().text()
+        self.restartLabel.setVisible(True)
+        settings.writeSettings()
+        sw.SettingsWindow.updateDisplay()
+
+
 class CategorySelector(AbstractSelector):
     def __init__(self):
         super().__init__("Categories")
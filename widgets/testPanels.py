@@ -16,12 +16,15 @@ from stats.impactTest import ImpactTest
 # Interface for the UI element wrapping an individual test's results
 class AbstractTestPanel(QWidget):
 
-    def __init__(self, test, lagRange, trackableGroup):
+    # @param results (magnitudes, p-values) already computed for lagRange, e.g. on a background thread,
+    # or None to run the test when the panel is created
+    def __init__(self, test, lagRange, trackableGroup, results=None):
         super().__init__()
         self.test = test
         self.trackableGroup = trackableGroup
 
         self.lagRange = lagRange
+        self.results = results
 
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
@@ -31,23 +34,39 @@ class AbstractTestPanel(QWidget):
         self.layout.addWidget(self.nameLabel)
 
         # Temporarily disable tests when working with times (try this out later)
-        if any([t.getTrackType() == TrackType.TIME for t in trackableGroup.getTrackables()]):
+        if AbstractTestPanel.hasTimeData(trackableGroup):
             failLabel = CenteredLabel('Tests are Disabled for Time Data')
             failLabel.setFont(QFont('Arial', 12))
             self.layout.addWidget(failLabel)
-        elif any([len(t.getSelectedDateScores()) < 5 for t in trackableGroup.getTrackables()]):
+        elif not AbstractTestPanel.hasEnoughData(trackableGroup):
             failLabel = CenteredLabel(f'Not enough data to run {test.displayName} test')
             failLabel.setFont(QFont('Arial', 12))
             self.layout.addWidget(failLabel)
         else:
             self.displayResults()
 
+    @staticmethod
+    def hasTimeData(trackableGroup):
+        return any([t.getTrackType() == TrackType.TIME for t in trackableGroup.getTrackables()])
+
+    @staticmethod
+    def hasEnoughData(trackableGroup):
+        return all([len(t.getSelectedDateScores()) >= 5 for t in trackableGroup.getTrackables()])
+
+    # @brief whether the panel will run its test for the group rather than showing why it can't
+    @staticmethod
+    def canRunTests(trackableGroup):
+        return not AbstractTestPanel.hasTimeData(trackableGroup) and AbstractTestPanel.hasEnoughData(trackableGroup)
+
     def displayResults(self):
         dep = self.trackableGroup.dependentT
         indep = self.trackableGroup.independentT
 
-        r2s, ps = self.test.runTestOverRange(
-            dep, indep, minLag=self.lagRange[0], maxLag=self.lagRange[-1])
+        if self.results is not None:
+            r2s, ps = self.results
+        else:
+            r2s, ps = self.test.runTestOverRange(
+                dep, indep, minLag=self.lagRange[0], maxLag=self.lagRange[-1])
 
         if r2s not in [False, [False]]:
 
@@ -117,20 +136,31 @@ class AbstractTestPanel(QWidget):
 
 class GrangerCausalityPanel(AbstractTestPanel):
 
-    def __init__(self, lagRange, trackableGroup):
-        super().__init__(GrangerTest(), lagRange, trackableGroup)
+    def __init__(self, lagRange, trackableGroup, results=None):
+        super().__init__(GrangerCausalityPanel.createTest(trackableGroup), lagRange, trackableGroup, results)
+
+    @staticmethod
+    def createTest(trackableGroup):
+        return GrangerTest()
 
 
 class LinearRegressionPanel(AbstractTestPanel):
 
-    def __init__(self, lagRange, trackableGroup):
-        super().__init__(PearsonTest(), lagRange, trackableGroup)
+    def __init__(self, lagRange, trackableGroup, results=None):
+        super().__init__(LinearRegressionPanel.createTest(trackableGroup), lagRange, trackableGroup, results)
+
+    @staticmethod
+    def createTest(trackableGroup):
+        return PearsonTest()
 
 
 class ImpactPanel(AbstractTestPanel):
 
-    def __init__(self, lagRange, trackableGroup):
+    def __init__(self, lagRange, trackableGroup, results=None):
+        super().__init__(ImpactPanel.createTest(trackableGroup), lagRange, trackableGroup, results)
+
+    @staticmethod
+    def createTest(trackableGroup):
         testType = 'Binary' if all([t.getTrackType(
         ) == TrackType.BINARY for t in trackableGroup.getTrackables()]) else 'Continuous'
-
-        super().__init__(ImpactTest(testType == 'Binary'), lagRange, trackableGroup)
+        return ImpactTest(testType == 'Binary')
@@ -3,16 +3,22 @@ from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 
 from util.settings import settings
-from widgets.plotWidget import PlotWidget
 from widgets.metricWidget import MetricWidget
 from widgets.analysisControlWidget import AnalysisControlWidget
+from widgets.analysisWorker import AnalysisRunner
+from widgets.metricWidget import TestsHomePanel
 from windows.window import Window
+from util.lazyImport import LazyImport
+
+# The plot pulls in matplotlib, so it's only imported once the window is first created
+plotWidgetModule = LazyImport.module('widgets.plotWidget')
 
 
 class AnalyzeWindow(Window):
 
     def __init__(self, UI):
         super().__init__(UI)
+        self.analysisRunner = AnalysisRunner()
 
     def create(self):
 
@@ -26,10 +32,11 @@ class AnalyzeWindow(Window):
         settings.updated["Analyze"] = False
 
         # In case this window has been created before, we destroy all components to avoid duplication
+        self.cancelAnalysis()
         self.reset()
 
         self.controlWidget = AnalysisControlWidget(self)
-        self.plotWidget = PlotWidget(self)
+        self.plotWidget = plotWidgetModule.PlotWidget(self)
         self.metricWidget = MetricWidget(self)
 
         self.fullLayout.addWidget(self.controlWidget)
@@ -48,11 +55,45 @@ class AnalyzeWindow(Window):
 
     # Tells the plotWidget and metricWidget that there has been a change to the analyzed
     # trackable when the Update Analysis button is hit
-    def updateAnalysisWidgets(self):
+    # @param testResults results from TestsHomePanel.computeTestResults, or None to run the tests here
+    def updateAnalysisWidgets(self, testResults=None):
         # User should be prevented from accessing this method when invalid selection is made
         assert(self.getCurrentTrackables().isValid())
         self.plotWidget.updatePlot()
-        self.metricWidget.updatePanels()
+        self.metricWidget.updatePanels(testResults)
+
+    # @brief recalculates the current trackables and runs the tests on a background thread, then updates the
+    # widgets with the results.  Submitting again before it's done replaces the earlier request
+    def submitAnalysis(self, freq, groupMethods, fillStrats, dateRange):
+        trackableGroup = self.getCurrentTrackables()
+        lagRange = self.metricWidget.testsHomePanel.getSelectedRange()
+        # The job works on copies so the trackables shown here are never changed while it runs
+        workingGroup = trackableGroup.copyForAnalysis()
+
+        def job(isCurrent):
+            workingGroup.updateCalculation(freq, groupMethods, fillStrats, dateRange)
+            if not isCurrent() or not workingGroup.isValid():
+                return {}
+            return TestsHomePanel.computeTestResults(workingGroup, lagRange, isCurrent)
+
+        def onFinished(testResults):
+            self.controlWidget.enableUpdateButtonIfValidSelection()
+            # The selection may have changed while the analysis was running
+            if trackableGroup is not self.getCurrentTrackables():
+                return
+            trackableGroup.adoptCalculation(workingGroup)
+            if trackableGroup.isValid():
+                # Results for a lag range that's since been changed are run again for the new range
+                sameLags = list(lagRange) == list(self.metricWidget.testsHomePanel.getSelectedRange())
+                self.updateAnalysisWidgets(testResults if sameLags else None)
+
+        # Let the user try again if the analysis raised
+        self.analysisRunner.submit(job, onFinished, self.controlWidget.enableUpdateButtonIfValidSelection)
+
+    # @brief drops any analysis that hasn't finished, so its results are never shown
+    # Doesn't wait for a running analysis since it only changes its own copies of the trackables
+    def cancelAnalysis(self):
+        self.analysisRunner.cancel()
 
     def getCurrentTrackables(self):
         return self.controlWidget.getCurrentTrackables()
@@ -5,7 +5,6 @@ from PyQt5.QtCore import *
 
 import os
 
-from widgets.heatmapWidget import HeatmapWidget
 from widgets.util.centeredLabel import CenteredLabel
 from widgets.util.centeredComboBox import CenteredComboBox
 from widgets.util.centeredSpinBox import CenteredSpinBox
@@ -16,6 +15,10 @@ from trackables.trackableManager import TrackableManager as TM
 from stats.test import Test
 
 from util.settings import settings
+from util.lazyImport import LazyImport
+
+# The heatmap pulls in matplotlib and seaborn, so it's only imported once the window is first created
+heatmapWidgetModule = LazyImport.module('widgets.heatmapWidget')
 
 collapsedIcon = QIcon(os.path.join(os.path.dirname(__file__), 'images/dropdownIcon_closed.png'))
 expandedIcon = QIcon(os.path.join(os.path.dirname(__file__), 'images/dropdownIcon_open.png'))
@@ -30,14 +33,14 @@ class HeatmapWindow(Window):
         if not settings.updated["Heatmap"]:
             return
         settings.updated["Heatmap"] = False
-        self.heatmapWidget = HeatmapWidget()
+        self.heatmapWidget = heatmapWidgetModule.HeatmapWidget()
 
         # Layout defining the control panels on the left side with buttons
         self.controlLayout = QVBoxLayout()
         self.controlLayout.setAlignment(Qt.AlignTop)
-        backgroundPanel = QWidget()
-        backgroundPanel.setLayout(self.controlLayout)
-        self.fullLayout.addWidget(backgroundPanel)
+        self.controlPanel = QWidget()
+        self.controlPanel.setLayout(self.controlLayout)
+        self.fullLayout.addWidget(self.controlPanel)
 
         self.mapLayout = QVBoxLayout()
 
@@ -56,6 +59,10 @@ class HeatmapWindow(Window):
             'Update Heatmap', self)
         updateButton.clicked.connect(self.updateHeatmap)
         self.controlLayout.addWidget(updateButton)
+        # Shows how many of the pairs have been tested while slower tests are running
+        self.progressBar = QProgressBar(self)
+        self.progressBar.setVisible(False)
+        self.controlLayout.addWidget(self.progressBar)
         self.addTestControlWidgets()
         for category in TM.instance().getCategories():
 
@@ -118,7 +125,24 @@ class HeatmapWindow(Window):
         testName = self.testCombo.currentText()
         lagDays = self.lagSpinner.value()
         # Display the gathered trackables in the heatmap widget
-        self.heatmapWidget.trackablesToHeatmap(selectedTrackables, testName, lagDays)
+        # Events are processed while the matrix is computed, so lock the controls to stop a second update starting
+        # inside this one
+        self.controlPanel.setEnabled(False)
+        self.progressBar.setValue(0)
+        self.progressBar.setVisible(True)
+        try:
+            self.heatmapWidget.trackablesToHeatmap(selectedTrackables, testName, lagDays,
+                                                   numWorkers=settings.workerCount,
+                                                   progressCallback=self.updateProgress)
+        finally:
+            self.progressBar.setVisible(False)
+            self.controlPanel.setEnabled(True)
+
+    def updateProgress(self, completed, total):
+        self.progressBar.setMaximum(total)
+        self.progressBar.setValue(completed)
+        # Keep the window responsive while results arrive
+        QApplication.processEvents()
 
 
 # Drop-down list that toggles whether the OuraRadioButtons are displayed
@@ -5,7 +5,7 @@ from PyQt5.QtCore import *
 from util.paths import *
 
 from windows.window import Window
-from widgets.settings.selectors import IntegrationSelector, CategorySelector
+from widgets.settings.selectors import IntegrationSelector, StorageSelector, CategorySelector
 
 
 # @brief this is the window where we can modify the settings.JSON file to control program flow
@@ -23,6 +23,7 @@ class SettingsWindow(Window):
                 self.fullLayout.addWidget(SettingsWindow.JSONPanel)
 
         self.fullLayout.addWidget(IntegrationSelector())
+        self.fullLayout.addWidget(StorageSelector())
         self.fullLayout.addWidget(CategorySelector())
 
     # Only display the JSON file in the settings window in debug setting